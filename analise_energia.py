@@ -1,17 +1,22 @@
 # Importação das bibliotecas necessárias para a análise de dados e machine learning.
 # pandas: Usado para manipulação e análise de dados em formato de tabela (DataFrame).
 import pandas as pd
-# Módulos do scikit-learn para divisão de dados, treinamento do modelo e avaliação.
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
-# Módulos para visualização de dados.
-# matplotlib.pyplot: Para a criação de gráficos (como a matriz de confusão).
-import matplotlib.pyplot as plt
-# seaborn: Baseado no matplotlib, cria gráficos estatísticos mais bonitos e informativos.
-import seaborn as sns
-# Biblioteca padrão do Python para lidar com avisos.
+# numpy: Usado nas operações vetorizadas da classificação.
+import numpy as np
+# O scikit-learn (treinamento e avaliação do modelo), o joblib (avaliação
+# em paralelo), o matplotlib e o seaborn (gráfico da matriz de confusão)
+# são bibliotecas pesadas: são importados apenas dentro das funções que os
+# usam, para que o relatório de console não pague o tempo de importação delas.
+# Bibliotecas padrão do Python para avisos, linha de comando, arquivos e medição de tempo.
 import warnings
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import time
+from importlib.metadata import version
 
 # Ignora todos os avisos (warnings) para manter a saída do console limpa,
 # o que é útil para demonstrações ou scripts de uso único.
@@ -49,6 +54,18 @@ def classificar_tensao_trifasica(row):
     else:
         return 'Adequada'
 
+def classificar_tensoes(df):
+    """
+    Versão vetorizada de 'classificar_tensao_trifasica', com as mesmas regras,
+    aplicada a todas as linhas de uma vez (usada na avaliação de históricos longos).
+    """
+    tensoes = df[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']].to_numpy()
+    inativo = (tensoes < 5).all(axis=1)
+    critica = ((tensoes > 233) | (tensoes < 191)).any(axis=1)
+    precaria = ((tensoes > 231) | (tensoes < 202)).any(axis=1)
+    return pd.Series(np.select([inativo, critica, precaria], ['Inativo', 'Crítica', 'Precária'], default='Adequada'),
+                     index=df.index)
+
 def adicionar_sugestao_detalhada(row):
     """
     Gera sugestões de ação detalhadas e específicas para cada tipo de alerta de tensão
@@ -133,6 +150,8 @@ def treinar_modelo_ia(df):
              Retorna None para todos em caso de falha.
     """
     if df is None: return None, None, None
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
     
     # Adiciona a coluna de classes de tensão ao DataFrame.
     df['Classe_Tensao'] = df.apply(classificar_tensao_trifasica, axis=1)
@@ -173,6 +192,9 @@ def avaliar_modelo(model, X_test, y_test):
     - y_test (pandas.Series): Os rótulos de teste.
     """
     if model is None: return
+    from sklearn.metrics import classification_report, confusion_matrix
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     # Faz previsões no conjunto de teste.
     y_pred = model.predict(X_test)
@@ -238,19 +260,200 @@ def gerar_relatorio_console(df, model, data_str):
     except Exception as e:
         print(f"Erro ao gerar relatório: {e}")
 
+# --- Modo de Avaliação: Validação Cruzada e Busca de Hiperparâmetros ---
+
+# Colunas de entrada do modelo, as mesmas usadas no treinamento simples.
+FEATURES = ['Dem_Ativa', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']
+
+# Grade padrão de hiperparâmetros do Random Forest avaliada no modo --avaliar.
+GRADE_PADRAO = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 12],
+    'min_samples_leaf': [1, 5],
+}
+
+# Diretório onde o resultado de cada dobra já avaliada é guardado.
+DIRETORIO_CACHE_AVALIACAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cache_avaliacao')
+
+def impressao_digital_dados(X, y):
+    """
+    Gera um identificador do conteúdo dos dados de treino (features e rótulos).
+    Qualquer mudança nos dados muda a impressão digital e invalida o cache.
+    """
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+def versoes_bibliotecas():
+    """
+    Versões do scikit-learn e do joblib, obtidas sem importá-los. Fazem parte
+    da chave do cache: uma atualização pode mudar o modelo e as métricas.
+    """
+    return {'scikit-learn': version('scikit-learn'), 'joblib': version('joblib')}
+
+def _chave_dobra(impressao, k, dobra, parametros, bibliotecas):
+    """Nome do arquivo de cache de uma dobra: dados, divisão, hiperparâmetros e bibliotecas."""
+    texto = json.dumps({'dados': impressao, 'k': k, 'dobra': dobra, 'parametros': parametros,
+                        'bibliotecas': bibliotecas}, sort_keys=True)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:20]
+
+def avaliar_dobra(X_treino, y_treino, X_teste, y_teste, parametros):
+    """
+    Treina um Random Forest com os 'parametros' numa dobra e mede acurácia,
+    F1 macro, tempos de treino e de previsão e tamanho do modelo serializado.
+    Cada dobra usa um único núcleo; o paralelismo é entre dobras.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score
+
+    modelo = RandomForestClassifier(random_state=42, n_jobs=1, **parametros)
+    inicio = time.perf_counter()
+    modelo.fit(X_treino, y_treino)
+    tempo_treino = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    y_pred = modelo.predict(X_teste)
+    tempo_previsao = time.perf_counter() - inicio
+    return {
+        'acuracia': float(accuracy_score(y_teste, y_pred)),
+        'f1_macro': float(f1_score(y_teste, y_pred, average='macro')),
+        'tempo_treino_s': tempo_treino,
+        'tempo_previsao_s': tempo_previsao,
+        'tamanho_modelo_bytes': len(pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+def avaliar_com_validacao_cruzada(df, grade=None, k=5, n_jobs=-1, diretorio_cache=DIRETORIO_CACHE_AVALIACAO):
+    """
+    Avalia cada combinação da grade de hiperparâmetros com validação cruzada
+    estratificada em 'k' dobras. As dobras de todas as combinações são
+    executadas em paralelo (joblib) em 'n_jobs' processos. O resultado de
+    cada dobra é guardado em 'diretorio_cache', identificado pela impressão
+    digital dos dados, pela dobra, pelos hiperparâmetros e pelas versões do
+    scikit-learn e do joblib: uma nova execução só treina as combinações
+    ainda não avaliadas com as mesmas bibliotecas.
+
+    Retorna um dicionário com os metadados da execução e, para cada
+    combinação, a média e o desvio das métricas, ordenadas pelo F1 macro.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import StratifiedKFold
+
+    inicio_total = time.perf_counter()
+    grade = grade or GRADE_PADRAO
+    df = df.copy()
+    df['Classe_Tensao'] = classificar_tensoes(df)
+    df_treino = df[df['Classe_Tensao'] != 'Inativo']
+    X, y = df_treino[FEATURES], df_treino['Classe_Tensao']
+    impressao = impressao_digital_dados(X, y)
+    bibliotecas = versoes_bibliotecas()
+
+    combinacoes = [dict(zip(grade, valores)) for valores in itertools.product(*grade.values())]
+    dobras = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=42).split(X, y))
+    os.makedirs(diretorio_cache, exist_ok=True)
+
+    # Separa as dobras já avaliadas (lidas do cache) das que precisam ser treinadas.
+    resultados, pendentes = {}, []
+    for c, parametros in enumerate(combinacoes):
+        for d, (treino, teste) in enumerate(dobras):
+            caminho = os.path.join(diretorio_cache, _chave_dobra(impressao, k, d, parametros, bibliotecas) + '.json')
+            if os.path.exists(caminho):
+                with open(caminho) as f:
+                    resultados[(c, d)] = {**json.load(f), 'em_cache': True}
+            else:
+                pendentes.append((c, d, caminho))
+
+    print(f"Avaliando {len(combinacoes)} combinações x {k} dobras: {len(pendentes)} a treinar, "
+          f"{len(resultados)} no cache.")
+    novos = Parallel(n_jobs=n_jobs)(
+        delayed(avaliar_dobra)(X.iloc[dobras[d][0]], y.iloc[dobras[d][0]], X.iloc[dobras[d][1]], y.iloc[dobras[d][1]],
+                               combinacoes[c])
+        for c, d, _ in pendentes
+    )
+    for (c, d, caminho), resultado in zip(pendentes, novos):
+        with open(caminho, 'w') as f:
+            json.dump(resultado, f)
+        resultados[(c, d)] = {**resultado, 'em_cache': False}
+
+    linhas = []
+    for c, parametros in enumerate(combinacoes):
+        por_dobra = pd.DataFrame([resultados[(c, d)] for d in range(k)])
+        linhas.append({
+            'parametros': parametros,
+            'acuracia_media': por_dobra['acuracia'].mean(), 'acuracia_desvio': por_dobra['acuracia'].std(ddof=0),
+            'f1_macro_media': por_dobra['f1_macro'].mean(), 'f1_macro_desvio': por_dobra['f1_macro'].std(ddof=0),
+            'tempo_treino_medio_s': por_dobra['tempo_treino_s'].mean(),
+            'tempo_previsao_medio_s': por_dobra['tempo_previsao_s'].mean(),
+            'tamanho_modelo_mb': por_dobra['tamanho_modelo_bytes'].mean() / 1024 ** 2,
+            'dobras_em_cache': int(por_dobra['em_cache'].sum()),
+        })
+    linhas.sort(key=lambda linha: linha['f1_macro_media'], reverse=True)
+
+    return {
+        'metadados': {
+            'amostras': len(X), 'impressao_digital_dados': impressao, 'bibliotecas': bibliotecas,
+            'dobras': k, 'n_jobs': n_jobs,
+            'combinacoes': len(combinacoes), 'dobras_treinadas': len(pendentes),
+            'duracao_total_s': time.perf_counter() - inicio_total,
+        },
+        'resultados': linhas,
+    }
+
+def gravar_relatorio_avaliacao(relatorio, caminho):
+    """
+    Grava o relatório da avaliação sem abrir janelas: em JSON se o arquivo
+    terminar em '.json', ou em uma tabela Markdown nos demais casos.
+    """
+    if caminho.endswith('.json'):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        return caminho
+
+    meta = relatorio['metadados']
+    linhas = [
+        "# Avaliação do Modelo de IA",
+        "",
+        f"- Amostras: {meta['amostras']} (impressão digital `{meta['impressao_digital_dados']}`)",
+        f"- Validação cruzada estratificada com {meta['dobras']} dobras, {meta['combinacoes']} combinações "
+        f"({meta['dobras_treinadas']} dobras treinadas, as demais lidas do cache)",
+        f"- Duração total: {meta['duracao_total_s']:.1f} s (n_jobs={meta['n_jobs']})",
+        "",
+        "| Hiperparâmetros | Acurácia | F1 macro | Treino (s) | Previsão (s) | Modelo (MB) |",
+        "|---|---|---|---|---|---|",
+    ]
+    for r in relatorio['resultados']:
+        parametros = ", ".join(f"{nome}={valor}" for nome, valor in r['parametros'].items())
+        linhas.append(f"| {parametros} | {r['acuracia_media']:.4f} ± {r['acuracia_desvio']:.4f} "
+                      f"| {r['f1_macro_media']:.4f} ± {r['f1_macro_desvio']:.4f} | {r['tempo_treino_medio_s']:.2f} "
+                      f"| {r['tempo_previsao_medio_s']:.3f} | {r['tamanho_modelo_mb']:.1f} |")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho
+
 # --- Bloco Principal de Execução ---
 
 if __name__ == "__main__":
     # Este bloco de código só é executado quando o script é rodado diretamente.
     # Ele define a sequência de operações para a análise.
-    
-    # Define o caminho do arquivo de dados.
-    file_path = 'dados_exemplo.csv'
+    parser = argparse.ArgumentParser(description="Análise offline dos dados de energia.")
+    parser.add_argument('--dados', default='dados_exemplo.csv', help="Arquivo CSV com as leituras.")
+    parser.add_argument('--avaliar', action='store_true',
+                        help="Executa a validação cruzada com busca de hiperparâmetros, sem gráficos.")
+    parser.add_argument('--dobras', type=int, default=5, help="Número de dobras da validação cruzada.")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Processos paralelos da avaliação (-1 = todos os núcleos).")
+    parser.add_argument('--saida', default='avaliacao_modelo.md', help="Relatório da avaliação (.json ou .md).")
+    parser.add_argument('--cache', default=DIRETORIO_CACHE_AVALIACAO, help="Diretório do cache das dobras avaliadas.")
+    args = parser.parse_args()
 
     # 1. Carrega e prepara os dados
-    df = carregar_e_preparar_dados(file_path)
+    df = carregar_e_preparar_dados(args.dados)
 
-    if df is not None:
+    if df is not None and args.avaliar:
+        # Modo de avaliação: métricas, tempos e tamanhos de cada combinação de hiperparâmetros.
+        relatorio = avaliar_com_validacao_cruzada(df, k=args.dobras, n_jobs=args.n_jobs, diretorio_cache=args.cache)
+        melhor = relatorio['resultados'][0]
+        print(f"Melhor combinação: {melhor['parametros']} (F1 macro {melhor['f1_macro_media']:.4f})")
+        print(f"Relatório gravado em '{gravar_relatorio_avaliacao(relatorio, args.saida)}'.")
+    elif df is not None:
         # 2. Treina o modelo de IA
         model, X_test, y_test = treinar_modelo_ia(df)
 
@@ -261,4 +464,3 @@ if __name__ == "__main__":
             # 4. Gera relatório de risco para uma data específica
             data_para_analise = '2023-01-01'
             gerar_relatorio_console(df, model, data_para_analise)
-
@@ -0,0 +1,481 @@
+# ======================================================================
+
+# Módulo de Armazenamento das Leituras
+# ------------------------------------------------------------------------------
+# Define a interface comum dos backends de armazenamento e duas
+# implementações:
+#
+# - BackendCSV: compatível com o formato original. Carrega 'data/data.csv'
+#   (e os CSVs gravados pelo coletor) em memória e recorta os intervalos
+#   por busca binária no índice de tempo.
+# - BackendSQLite: banco embutido com uma tabela indexada por
+#   (usina, instante). Filtros de data e agregações são executados pelo
+#   próprio banco, de modo que cada consulta lê apenas as linhas de que precisa.
+#
+# Uso pela linha de comando (importação/exportação CSV):
+#   python -m api.armazenamento importar data/data.csv --usina IFG
+#   python -m api.armazenamento exportar saida.csv --usina IFG
+# ======================================================================
+
+import argparse
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (USINA_PADRAO, DIRETORIO_COLETA, BACKEND_ARMAZENAMENTO, ARQUIVO_SQLITE,
+                             PROJECT_ROOT)
+
+# --- 1. Esquema das Leituras ---
+# -------------------------------
+
+DATA_FILE_PATH = os.path.join(PROJECT_ROOT, "data", "data.csv")
+
+# Colunas de medição no esquema do arquivo de dados original.
+COLUNAS_MEDICAO = ['Dem_Ativa', 'Dem_Reat', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3',
+                   'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Fat_Pot', 'Fat_Carga']
+COLUNAS_CSV = ['DateTime', 'Data', 'Hora'] + COLUNAS_MEDICAO
+
+# As leituras são registradas a cada 5 minutos.
+INTERVALO_LEITURA_H = 5 / 60
+
+# Na memória, as medições ficam em float32: os sensores informam no máximo
+# uma ou duas casas decimais e o RandomForest converte as entradas para
+# float32 de qualquer forma. Ao devolver as leituras no esquema do CSV, os
+# valores voltam a float64, arredondados para eliminar o ruído da conversão.
+DTYPE_MEDICAO = np.float32
+CASAS_DECIMAIS = 4
+
+
+def normalizar_leituras(leituras):
+    """
+    Converte uma lista de dicionários (ou um DataFrame) de leituras no
+    esquema padrão: índice 'DateTime' ordenado, colunas 'Data' e 'Hora'
+    como texto e colunas de medição numéricas, com ausências preenchidas com 0.
+    """
+    df = pd.DataFrame(leituras)
+    if df.empty:
+        return pd.DataFrame(columns=COLUNAS_CSV[1:], index=pd.DatetimeIndex([], name='DateTime'))
+
+    if 'DateTime' not in df.columns:
+        df = df.reset_index()
+    df['DateTime'] = pd.to_datetime(df['DateTime'])
+    df = df.drop_duplicates(subset='DateTime', keep='last').set_index('DateTime').sort_index()
+    for col in COLUNAS_MEDICAO:
+        valores = df[col] if col in df.columns else 0
+        df[col] = pd.to_numeric(valores, errors='coerce')
+    df[COLUNAS_MEDICAO] = df[COLUNAS_MEDICAO].fillna(0)
+    df['Data'] = df.index.strftime('%d/%m/%Y')
+    df['Hora'] = df.index.strftime('%H:%M')
+    return df[COLUNAS_CSV[1:]]
+
+
+def compactar_leituras(df):
+    """
+    Converte leituras no esquema do CSV para o formato compacto mantido em
+    memória: apenas as colunas de medição, em float32. 'Data' e 'Hora' são
+    descartadas, pois repetem o índice 'DateTime' como texto.
+    """
+    return df[COLUNAS_MEDICAO].astype(DTYPE_MEDICAO)
+
+
+def expandir_leituras(df):
+    """Reconstrói o esquema completo do CSV a partir de leituras compactas."""
+    df = df[COLUNAS_MEDICAO].astype(np.float64).round(CASAS_DECIMAIS)
+    df.insert(0, 'Data', df.index.strftime('%d/%m/%Y'))
+    df.insert(1, 'Hora', df.index.strftime('%H:%M'))
+    return df
+
+
+def ler_csv_compacto(caminho):
+    """
+    Lê um arquivo no formato de 'data/data.csv' diretamente no formato
+    compacto, sem carregar as colunas de texto 'Data' e 'Hora'. As colunas
+    são convertidas uma a uma para manter baixo o pico de memória.
+    """
+    df = pd.read_csv(caminho, sep=',', decimal='.', parse_dates=['DateTime'], index_col='DateTime',
+                     usecols=lambda col: col not in ('Data', 'Hora'))
+    for col in COLUNAS_MEDICAO:
+        valores = df[col] if col in df.columns else 0
+        df[col] = pd.to_numeric(valores, errors='coerce').fillna(0).astype(DTYPE_MEDICAO)
+    df = df[COLUNAS_MEDICAO]
+    if not df.index.is_monotonic_increasing or df.index.has_duplicates:
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df
+
+
+def _limites_do_dia(dia):
+    """Retorna o intervalo [início, fim) que cobre o dia informado."""
+    inicio = pd.Timestamp(dia)
+    return inicio, inicio + timedelta(days=1)
+
+
+def _nova_versao(*partes):
+    """Gera um identificador curto para uma nova versão dos dados."""
+    return hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()[:12]
+
+
+# --- 2. Interface Comum ---
+# -------------------------
+
+class BackendArmazenamento(ABC):
+    """
+    Interface dos backends de armazenamento. Todas as leituras retornadas
+    são DataFrames indexados por 'DateTime' (ordenado), no esquema de
+    colunas de 'data/data.csv'.
+    """
+
+    @abstractmethod
+    def inserir(self, usina, df):
+        """Insere (ou substitui, para instantes já existentes) as leituras da usina."""
+
+    @abstractmethod
+    def ler_intervalo(self, usina, inicio=None, fim=None, colunas=None):
+        """Lê as leituras da usina no intervalo [inicio, fim)."""
+
+    @abstractmethod
+    def agregar_diario(self, usina, inicio=None, fim=None):
+        """
+        Resumo diário da usina no intervalo [inicio, fim): número de leituras,
+        energia gerada (kWh), pico de potência (kW) e maior tensão de fase (V).
+        """
+
+    @abstractmethod
+    def intervalo_datas(self, usina):
+        """Retorna (primeiro, último) instante com leituras da usina, ou None."""
+
+    @abstractmethod
+    def usinas(self):
+        """Lista as usinas com leituras armazenadas."""
+
+    @abstractmethod
+    def obter_versao(self):
+        """
+        Retorna (versao, ultima_modificacao) dos dados armazenados. A versão
+        muda a cada inserção e identifica o conteúdo nas ETags da API.
+        """
+
+    @abstractmethod
+    def versao_usina(self, usina):
+        """
+        Retorna a versão das leituras de uma única usina. Muda apenas com
+        inserções nessa usina, ao contrário da versão global de 'obter_versao'.
+        """
+
+    @abstractmethod
+    def assinatura_dia(self, usina, dia):
+        """
+        Retorna (número de leituras, último instante) de um dia da usina, sem
+        ler as medições; (0, None) se o dia não tiver leituras.
+        """
+
+    def ler_dia(self, usina, dia, colunas=None):
+        """Lê as leituras de um único dia da usina."""
+        inicio, fim = _limites_do_dia(dia)
+        return self.ler_intervalo(usina, inicio, fim, colunas)
+
+    def importar_csv(self, caminho, usina=USINA_PADRAO):
+        """Importa um arquivo CSV no formato de 'data/data.csv'."""
+        df = pd.read_csv(caminho, sep=',', decimal='.')
+        self.inserir(usina, normalizar_leituras(df))
+        return len(df)
+
+    def exportar_csv(self, caminho, usina=USINA_PADRAO):
+        """Exporta as leituras da usina para um arquivo CSV no formato de 'data/data.csv'."""
+        df = self.ler_intervalo(usina)
+        df.reset_index()[COLUNAS_CSV].to_csv(caminho, index=False)
+        return len(df)
+
+
+def _agregar_diario_df(df):
+    """Calcula o resumo diário (ver 'agregar_diario') de um DataFrame de leituras."""
+    tensao_max = df[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']].max(axis=1).astype(np.float64)
+    grupos = pd.DataFrame({'Dem_Ativa': df['Dem_Ativa'].astype(np.float64), 'tensao_max_v': tensao_max}).groupby(df.index.date)
+    resumo = pd.DataFrame({
+        'n_leituras': grupos.size(),
+        'energia_kwh': grupos['Dem_Ativa'].sum() * INTERVALO_LEITURA_H,
+        'pico_kw': grupos['Dem_Ativa'].max(),
+        'tensao_max_v': grupos['tensao_max_v'].max(),
+    })
+    resumo.index.name = 'dia'
+    return resumo
+
+
+# --- 3. Backend CSV (em memória) ---
+# -----------------------------------
+
+class BackendCSV(BackendArmazenamento):
+    """
+    Mantém as leituras de cada usina em um DataFrame ordenado por tempo,
+    no formato compacto (ver 'compactar_leituras'). A usina padrão é
+    carregada de 'data/data.csv' e as demais dos arquivos '<usina>.csv' do
+    diretório de coleta. Novas leituras são acrescentadas ao CSV da usina
+    no diretório de coleta, preservando o formato original.
+
+    Como a chave primária (usina, ts) do BackendSQLite, cada instante tem
+    uma única leitura: leituras idênticas às armazenadas são ignoradas e
+    as que mudam o valor de um instante existente o substituem.
+    """
+
+    def __init__(self, arquivo_principal=DATA_FILE_PATH, diretorio=DIRETORIO_COLETA, usina_principal=USINA_PADRAO):
+        self.diretorio = diretorio
+        self._dfs = {}
+        self._lock = threading.Lock()
+
+        partes_versao, partes_usina = [], {}
+        arquivos = [(usina_principal, arquivo_principal)]
+        arquivos += [(os.path.splitext(os.path.basename(c))[0], c) for c in sorted(glob.glob(os.path.join(diretorio, "*.csv")))]
+        ultima = 0
+        for usina, caminho in arquivos:
+            if not os.path.exists(caminho):
+                continue
+            df = ler_csv_compacto(caminho)
+            if usina in self._dfs:
+                df = pd.concat([self._dfs[usina], df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+            self._dfs[usina] = df
+            stat = os.stat(caminho)
+            partes_versao.append((caminho, stat.st_size, stat.st_mtime_ns))
+            partes_usina.setdefault(usina, []).append(partes_versao[-1])
+            ultima = max(ultima, int(stat.st_mtime))
+
+        self._versao = _nova_versao(*partes_versao)
+        self._versoes_usina = {usina: _nova_versao(*partes) for usina, partes in partes_usina.items()}
+        self._ultima_modificacao = datetime.fromtimestamp(ultima, tz=timezone.utc)
+
+    def inserir(self, usina, df):
+        if df.empty:
+            return
+        novas = compactar_leituras(df)
+        with self._lock:
+            atual = self._dfs.get(usina)
+            substituidas = np.zeros(len(novas), dtype=bool)
+            if atual is not None:
+                existentes = novas.index.isin(atual.index)
+                iguais = np.zeros(len(novas), dtype=bool)
+                iguais[existentes] = (atual.reindex(novas.index[existentes]).to_numpy()
+                                      == novas[existentes].to_numpy()).all(axis=1)
+                alteradas = ~iguais
+                substituidas = (existentes & alteradas)[alteradas]
+                df, novas = df[alteradas], novas[alteradas]
+                if novas.empty:
+                    return
+
+            os.makedirs(self.diretorio, exist_ok=True)
+            caminho = os.path.join(self.diretorio, f"{usina}.csv")
+            if substituidas.any() and os.path.exists(caminho):
+                # Instantes já gravados: o arquivo é reescrito sem duplicatas,
+                # em vez de acumular uma cópia de cada leitura substituída.
+                arquivo = pd.concat([ler_csv_compacto(caminho), novas])
+                arquivo = arquivo[~arquivo.index.duplicated(keep='last')].sort_index()
+                temporario = f"{caminho}.{os.getpid()}.tmp"
+                expandir_leituras(arquivo).reset_index()[COLUNAS_CSV].to_csv(temporario, index=False)
+                os.replace(temporario, caminho)
+            else:
+                df.reset_index()[COLUNAS_CSV].to_csv(caminho, mode='a', header=not os.path.exists(caminho), index=False)
+
+            df = novas
+            if atual is not None:
+                df = pd.concat([atual, df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+            self._dfs[usina] = df
+            self._versao = _nova_versao(self._versao, usina, len(df), df.index.max())
+            self._versoes_usina[usina] = _nova_versao(self._versoes_usina.get(usina), len(df), df.index.max())
+            self._ultima_modificacao = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def ler_intervalo(self, usina, inicio=None, fim=None, colunas=None):
+        df = self._dfs.get(usina)
+        if df is None:
+            df = compactar_leituras(normalizar_leituras([]))
+        # Busca binária no índice ordenado: custo proporcional ao tamanho do
+        # recorte, não ao histórico inteiro.
+        i = df.index.searchsorted(pd.Timestamp(inicio)) if inicio is not None else 0
+        j = df.index.searchsorted(pd.Timestamp(fim)) if fim is not None else len(df)
+        recorte = df.iloc[i:j]
+        return expandir_leituras(recorte) if colunas is None else recorte[colunas]
+
+    def assinatura_dia(self, usina, dia):
+        df = self._dfs.get(usina)
+        if df is None:
+            return 0, None
+        inicio, fim = _limites_do_dia(dia)
+        i, j = df.index.searchsorted(inicio), df.index.searchsorted(fim)
+        return j - i, df.index[j - 1] if j > i else None
+
+    def agregar_diario(self, usina, inicio=None, fim=None):
+        return _agregar_diario_df(self.ler_intervalo(usina, inicio, fim, ['Dem_Ativa', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']))
+
+    def intervalo_datas(self, usina):
+        df = self._dfs.get(usina)
+        if df is None or df.empty:
+            return None
+        return df.index[0], df.index[-1]
+
+    def usinas(self):
+        return sorted(self._dfs)
+
+    def obter_versao(self):
+        return self._versao, self._ultima_modificacao
+
+    def versao_usina(self, usina):
+        return self._versoes_usina.get(usina, 'vazio')
+
+
+# --- 4. Backend SQLite ---
+# ------------------------
+
+class BackendSQLite(BackendArmazenamento):
+    """
+    Armazena as leituras em um banco SQLite, em uma tabela cuja chave
+    primária (e índice agrupado) é (usina, ts). Os instantes são gravados
+    como segundos desde a época, o que torna os filtros de intervalo simples
+    comparações de inteiros sobre o índice.
+    """
+
+    def __init__(self, caminho=ARQUIVO_SQLITE):
+        self.caminho = caminho
+        self._local = threading.local()
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        colunas = ", ".join(f"{col} REAL" for col in COLUNAS_MEDICAO)
+        with self._conexao() as con:
+            con.execute(f"CREATE TABLE IF NOT EXISTS leituras (usina TEXT NOT NULL, ts INTEGER NOT NULL, {colunas}, "
+                        "PRIMARY KEY (usina, ts)) WITHOUT ROWID")
+            con.execute("CREATE TABLE IF NOT EXISTS metadados (chave TEXT PRIMARY KEY, valor TEXT)")
+
+    def _conexao(self):
+        """Cada thread usa a sua própria conexão (o sqlite3 não as compartilha)."""
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            # O modo WAL permite leituras concorrentes enquanto o coletor grava.
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    @staticmethod
+    def _para_ts(instante):
+        return (pd.Timestamp(instante) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+    def inserir(self, usina, df):
+        if df.empty:
+            return
+        ts = df.index.as_unit('s').asi8.tolist()
+        valores = df[COLUNAS_MEDICAO].astype(float).itertuples(index=False, name=None)
+        linhas = [(usina, t, *v) for t, v in zip(ts, valores)]
+        marcadores = ", ".join("?" * (len(COLUNAS_MEDICAO) + 2))
+        con = self._conexao()
+        with con:
+            con.executemany(f"INSERT OR REPLACE INTO leituras (usina, ts, {', '.join(COLUNAS_MEDICAO)}) "
+                            f"VALUES ({marcadores})", linhas)
+            versao_anterior, _ = self.obter_versao()
+            versao_usina_anterior = self.versao_usina(usina)
+            agora = datetime.now(timezone.utc).replace(microsecond=0)
+            con.executemany("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)", [
+                ('versao', _nova_versao(versao_anterior, usina, len(linhas), ts[-1])),
+                (f'versao:{usina}', _nova_versao(versao_usina_anterior, len(linhas), ts[-1])),
+                ('ultima_modificacao', agora.isoformat()),
+            ])
+
+    def _filtro(self, usina, inicio, fim):
+        condicoes, parametros = ["usina = ?"], [usina]
+        if inicio is not None:
+            condicoes.append("ts >= ?")
+            parametros.append(self._para_ts(inicio))
+        if fim is not None:
+            condicoes.append("ts < ?")
+            parametros.append(self._para_ts(fim))
+        return " AND ".join(condicoes), parametros
+
+    def ler_intervalo(self, usina, inicio=None, fim=None, colunas=None):
+        medicoes = colunas or COLUNAS_MEDICAO
+        medicoes = [c for c in medicoes if c in COLUNAS_MEDICAO]
+        where, parametros = self._filtro(usina, inicio, fim)
+        linhas = self._conexao().execute(
+            f"SELECT ts, {', '.join(medicoes)} FROM leituras WHERE {where} ORDER BY ts", parametros).fetchall()
+
+        df = pd.DataFrame.from_records(linhas, columns=['ts'] + medicoes)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('ts'), unit='s'), name='DateTime')
+        if colunas is None:
+            # Data e Hora são derivadas do instante, em vez de ocuparem espaço no banco.
+            df['Data'] = df.index.strftime('%d/%m/%Y')
+            df['Hora'] = df.index.strftime('%H:%M')
+            return df[COLUNAS_CSV[1:]]
+        return df[colunas]
+
+    def assinatura_dia(self, usina, dia):
+        where, parametros = self._filtro(usina, *_limites_do_dia(dia))
+        n, ultimo = self._conexao().execute(f"SELECT COUNT(*), MAX(ts) FROM leituras WHERE {where}", parametros).fetchone()
+        return n, pd.to_datetime(ultimo, unit='s') if ultimo is not None else None
+
+    def agregar_diario(self, usina, inicio=None, fim=None):
+        where, parametros = self._filtro(usina, inicio, fim)
+        linhas = self._conexao().execute(
+            "SELECT date(ts, 'unixepoch') AS dia, COUNT(*), SUM(Dem_Ativa) * ?, MAX(Dem_Ativa), "
+            "MAX(MAX(Tensao_L1, Tensao_L2, Tensao_L3)) "
+            f"FROM leituras WHERE {where} GROUP BY dia ORDER BY dia", [INTERVALO_LEITURA_H] + parametros).fetchall()
+        resumo = pd.DataFrame.from_records(linhas, columns=['dia', 'n_leituras', 'energia_kwh', 'pico_kw', 'tensao_max_v'])
+        resumo['dia'] = pd.to_datetime(resumo['dia']).dt.date
+        return resumo.set_index('dia')
+
+    def intervalo_datas(self, usina):
+        minimo, maximo = self._conexao().execute(
+            "SELECT MIN(ts), MAX(ts) FROM leituras WHERE usina = ?", [usina]).fetchone()
+        if minimo is None:
+            return None
+        return pd.to_datetime(minimo, unit='s'), pd.to_datetime(maximo, unit='s')
+
+    def usinas(self):
+        return [u for (u,) in self._conexao().execute("SELECT DISTINCT usina FROM leituras ORDER BY usina")]
+
+    def obter_versao(self):
+        # A versão fica no próprio banco, para que todos os processos que o
+        # compartilham (API, dashboard, coletor) enxerguem as mesmas alterações.
+        meta = dict(self._conexao().execute("SELECT chave, valor FROM metadados"))
+        ultima = meta.get('ultima_modificacao')
+        return meta.get('versao', 'vazio'), datetime.fromisoformat(ultima) if ultima else None
+
+    def versao_usina(self, usina):
+        linha = self._conexao().execute("SELECT valor FROM metadados WHERE chave = ?", [f'versao:{usina}']).fetchone()
+        return linha[0] if linha else 'vazio'
+
+
+# --- 5. Criação do Backend Configurado ---
+# -----------------------------------------
+
+def criar_backend(tipo=BACKEND_ARMAZENAMENTO):
+    """
+    Cria o backend configurado em 'BACKEND_ARMAZENAMENTO'. Um banco SQLite
+    vazio é inicializado com o conteúdo de 'data/data.csv'.
+    """
+    if tipo == 'csv':
+        return BackendCSV()
+    if tipo == 'sqlite':
+        backend = BackendSQLite()
+        if backend.intervalo_datas(USINA_PADRAO) is None and os.path.exists(DATA_FILE_PATH):
+            backend.importar_csv(DATA_FILE_PATH, USINA_PADRAO)
+        return backend
+    raise ValueError(f"Backend de armazenamento desconhecido: {tipo}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Importação e exportação CSV do armazenamento de leituras.")
+    parser.add_argument('acao', choices=['importar', 'exportar'])
+    parser.add_argument('arquivo', help="Arquivo CSV no formato de 'data/data.csv'.")
+    parser.add_argument('--usina', default=USINA_PADRAO)
+    parser.add_argument('--backend', default=BACKEND_ARMAZENAMENTO, choices=['csv', 'sqlite'])
+    args = parser.parse_args()
+
+    backend = BackendSQLite() if args.backend == 'sqlite' else BackendCSV()
+    if args.acao == 'importar':
+        print(f"{backend.importar_csv(args.arquivo, args.usina)} leituras importadas para a usina {args.usina}.")
+    else:
+        print(f"{backend.exportar_csv(args.arquivo, args.usina)} leituras exportadas da usina {args.usina}.")
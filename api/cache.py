@@ -0,0 +1,124 @@
+# ======================================================================
+
+# Módulo de Cache HTTP
+# ------------------------------------------------------------------------------
+# Reúne as peças que permitem servir os relatórios diários com custo
+# mínimo: um cache de respostas em memória (LRU), a geração de ETags
+# fortes (uma por codificação do corpo) e a negociação/compressão do corpo
+# da resposta.
+# ======================================================================
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+# O brotli é opcional: se não estiver instalado, usamos apenas gzip.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Codificações que o servidor pode produzir.
+CODIFICACOES = ("br", "gzip", "identity")
+
+
+# --- 1. Cache de Respostas em Memória ---
+# ----------------------------------------
+
+class CacheRespostas:
+    """
+    Cache LRU (Least Recently Used) simples e seguro para múltiplas threads.
+    Guarda os corpos já serializados (e comprimidos) das respostas, de modo
+    que uma requisição repetida não precise reprocessar o dia nem refazer
+    a compressão.
+    """
+
+    def __init__(self, max_itens=256):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        """Retorna o valor guardado para a chave, ou None se não existir."""
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        """Guarda um valor, descartando o item menos usado se o cache estiver cheio."""
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        """Remove todos os itens do cache e zera as estatísticas."""
+        with self._lock:
+            self._itens.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+
+# --- 2. ETags e Negociação de Conteúdo ---
+# -----------------------------------------
+
+def gerar_etag(*partes):
+    """
+    Gera uma ETag forte a partir das partes que identificam o conteúdo
+    (ex.: data, versão dos dados e versão do modelo). Se qualquer uma
+    delas mudar, a ETag também muda.
+    """
+    chave = "|".join(str(parte) for parte in partes)
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:24]
+
+
+def etag_da_codificacao(etag, codificacao):
+    """
+    ETag de uma representação da resposta. Corpos comprimidos são bytes
+    diferentes do original e, como validadores fortes, recebem ETags próprias.
+    """
+    return etag if codificacao == "identity" else f"{etag}-{codificacao}"
+
+
+def negociar_codificacao(accept_encoding):
+    """
+    Escolhe a codificação de compressão a partir do cabeçalho
+    'Accept-Encoding' do cliente. Preferimos 'br' (quando disponível),
+    depois 'gzip' e, por fim, a resposta sem compressão ('identity').
+    """
+    aceitas = set()
+    for item in (accept_encoding or "").split(","):
+        partes = item.strip().split(";")
+        nome = partes[0].strip().lower()
+        # Ignora codificações explicitamente recusadas (q=0).
+        if any(p.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000") for p in partes[1:]):
+            continue
+        if nome:
+            aceitas.add(nome)
+
+    if brotli is not None and ("br" in aceitas or "*" in aceitas):
+        return "br"
+    if "gzip" in aceitas or "*" in aceitas:
+        return "gzip"
+    return "identity"
+
+
+def comprimir(corpo, codificacao):
+    """Comprime o corpo (bytes) na codificação negociada."""
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=5)
+    if codificacao == "gzip":
+        return gzip.compress(corpo, compresslevel=6)
+    return corpo
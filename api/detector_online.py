@@ -0,0 +1,167 @@
+# ======================================================================
+
+# Módulo do Detector Online de Anomalias
+# ------------------------------------------------------------------------------
+# Analisa as leituras à medida que são ingeridas (observador da ingestão),
+# sem executar o modelo de IA. Para cada usina são mantidas apenas
+# estatísticas móveis de tamanho fixo, atualizadas em O(1) por leitura:
+# - média e variância móveis exponenciais (EWMA) de cada fase de tensão e
+#   de corrente, usadas para detectar desvios bruscos de tensão;
+# - razão de desequilíbrio entre as fases (maior desvio em relação à média
+#   das três fases, dividido por essa média), para tensão e corrente.
+# Um alerta é emitido quando uma condição começa (e não a cada leitura em
+# que ela persiste). Os alertas ficam numa fila limitada por usina.
+# ======================================================================
+
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+from .ingestao import registrar_observador
+from .metricas import REGISTRO
+from config.settings import (DETECTOR_ALFA, DETECTOR_AQUECIMENTO, DETECTOR_Z_LIMITE, DETECTOR_DESVIO_MIN,
+                             DETECTOR_DESEQUILIBRIO_TENSAO, DETECTOR_DESEQUILIBRIO_CORRENTE, DETECTOR_CORRENTE_MIN,
+                             DETECTOR_ALERTAS_MAX)
+
+GRANDEZAS = ['Tensao_L1', 'Tensao_L2', 'Tensao_L3', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3']
+# Tensão média (V) abaixo da qual o sistema é considerado inativo.
+TENSAO_INATIVO = 5.0
+
+logger = logging.getLogger(__name__)
+
+ALERTAS = REGISTRO.contador("tcc_detector_alertas_total", "Alertas emitidos pelo detector online, por tipo.", ("tipo",))
+
+
+def razao_desequilibrio(valores):
+    """Maior desvio das fases em relação à média, dividido pela média."""
+    media = valores.mean()
+    return float(np.abs(valores - media).max() / media) if media > 0 else 0.0
+
+
+class EstadoUsina:
+    """Estatísticas móveis de uma usina: memória constante, qualquer que seja o histórico."""
+
+    __slots__ = ('media', 'variancia', 'leituras', 'ultimo_instante', 'desequilibrio', 'ativos', 'alertas', 'lock')
+
+    def __init__(self, max_alertas):
+        self.media = np.zeros(len(GRANDEZAS))
+        self.variancia = np.zeros(len(GRANDEZAS))
+        self.leituras = 0
+        self.ultimo_instante = None
+        self.desequilibrio = {'tensao': 0.0, 'corrente': 0.0}
+        # Condições em andamento (para alertar apenas no início de cada uma).
+        self.ativos = set()
+        self.alertas = deque(maxlen=max_alertas)
+        # Cada usina tem o seu lock: lotes de usinas diferentes, entregues
+        # em paralelo pelo coletor, não esperam uns pelos outros.
+        self.lock = threading.Lock()
+
+
+class DetectorOnline:
+    """Detector incremental de desvios e desequilíbrios, com um estado por usina."""
+
+    def __init__(self, alfa=DETECTOR_ALFA, aquecimento=DETECTOR_AQUECIMENTO, z_limite=DETECTOR_Z_LIMITE,
+                 desvio_min=DETECTOR_DESVIO_MIN, limite_tensao=DETECTOR_DESEQUILIBRIO_TENSAO, limite_corrente=DETECTOR_DESEQUILIBRIO_CORRENTE,
+                 corrente_min=DETECTOR_CORRENTE_MIN, max_alertas=DETECTOR_ALERTAS_MAX):
+        self.alfa, self.aquecimento, self.z_limite, self.desvio_min = alfa, aquecimento, z_limite, desvio_min
+        self.limite_tensao, self.limite_corrente, self.corrente_min = limite_tensao, limite_corrente, corrente_min
+        self.max_alertas = max_alertas
+        self._estados = {}
+        # Protege apenas o dicionário de estados; o processamento usa o lock da usina.
+        self._lock = threading.Lock()
+
+    def processar(self, usina, df_novas):
+        """
+        Atualiza o estado da usina com as novas leituras (em ordem
+        cronológica) e retorna os alertas emitidos. Leituras anteriores à
+        última já processada são ignoradas.
+        """
+        valores = df_novas[GRANDEZAS].to_numpy(dtype=np.float64)
+        novos_alertas = []
+        with self._lock:
+            estado = self._estados.get(usina)
+            if estado is None:
+                estado = self._estados[usina] = EstadoUsina(self.max_alertas)
+        with estado.lock:
+            for instante, leitura in zip(df_novas.index, valores):
+                if estado.ultimo_instante is not None and instante <= estado.ultimo_instante:
+                    continue
+                estado.ultimo_instante = instante
+                novos_alertas.extend(self._atualizar(usina, estado, instante, leitura))
+            estado.alertas.extend(novos_alertas)
+        for alerta in novos_alertas:
+            ALERTAS.inc(tipo=alerta['tipo'])
+            logger.warning("Alerta %s na usina %s: %s = %.3f (referência %.3f)", alerta['tipo'], usina,
+                           alerta['grandeza'], alerta['valor'], alerta['referencia'])
+        return novos_alertas
+
+    def _atualizar(self, usina, estado, instante, leitura):
+        tensoes, correntes = leitura[:3], leitura[3:]
+        # Leituras com o sistema desligado (à noite) não alteram as estatísticas.
+        if tensoes.mean() < TENSAO_INATIVO:
+            estado.ativos.clear()
+            return []
+
+        condicoes = {}
+        if estado.leituras >= self.aquecimento:
+            # Desvio de cada fase de tensão em relação à média móvel, antes de incorporá-la.
+            desvio_padrao = np.maximum(np.sqrt(estado.variancia[:3]), self.desvio_min)
+            z = np.abs(tensoes - estado.media[:3]) / desvio_padrao
+            for i in np.flatnonzero(z > self.z_limite):
+                condicoes[('desvio', GRANDEZAS[i])] = (tensoes[i], estado.media[i], float(z[i]))
+
+        # Média e variância móveis exponenciais (atualização incremental),
+        # iniciadas pela primeira leitura ativa da usina.
+        if estado.leituras == 0:
+            estado.media = leitura.copy()
+        diferenca = leitura - estado.media
+        incremento = self.alfa * diferenca
+        estado.media += incremento
+        estado.variancia = (1 - self.alfa) * (estado.variancia + diferenca * incremento)
+        estado.leituras += 1
+
+        estado.desequilibrio['tensao'] = razao_desequilibrio(tensoes)
+        if estado.desequilibrio['tensao'] > self.limite_tensao:
+            condicoes[('desequilibrio_tensao', 'Tensao')] = (estado.desequilibrio['tensao'], self.limite_tensao, None)
+        estado.desequilibrio['corrente'] = razao_desequilibrio(correntes) if correntes.mean() >= self.corrente_min else 0.0
+        if estado.desequilibrio['corrente'] > self.limite_corrente:
+            condicoes[('desequilibrio_corrente', 'Corrente')] = (estado.desequilibrio['corrente'], self.limite_corrente, None)
+
+        alertas = [
+            {'usina': usina, 'instante': instante.isoformat(), 'tipo': tipo, 'grandeza': grandeza,
+             'valor': round(float(valor), 4), 'referencia': round(float(referencia), 4),
+             'z': None if z is None else round(z, 2)}
+            for (tipo, grandeza), (valor, referencia, z) in condicoes.items() if (tipo, grandeza) not in estado.ativos
+        ]
+        estado.ativos = set(condicoes)
+        return alertas
+
+    def obter_estado(self, usina):
+        """Retorna as estatísticas atuais e os alertas recentes da usina (ou None)."""
+        with self._lock:
+            estado = self._estados.get(usina)
+        if estado is None:
+            return None
+        with estado.lock:
+            return {
+                'usina': usina,
+                'leituras': estado.leituras,
+                'ultimo_instante': estado.ultimo_instante.isoformat() if estado.ultimo_instante is not None else None,
+                'media': dict(zip(GRANDEZAS, np.round(estado.media, 3).tolist())),
+                'desvio_padrao': dict(zip(GRANDEZAS, np.round(np.sqrt(estado.variancia), 3).tolist())),
+                'desequilibrio': {k: round(v, 4) for k, v in estado.desequilibrio.items()},
+                'alertas': list(estado.alertas),
+            }
+
+
+# Detector do processo, alimentado pelas leituras ingeridas neste processo.
+# Para que a API o consulte, o coletor deve rodar dentro dela (COLETOR_NA_API).
+detector = DetectorOnline()
+
+
+@registrar_observador
+def processar_leituras(usina, df_novas):
+    """Observador da ingestão: entrega cada lote de leituras ao detector."""
+    detector.processar(usina, df_novas)
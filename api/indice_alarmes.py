@@ -0,0 +1,148 @@
+# ======================================================================
+
+# Módulo do Índice Histórico de Alarmes
+# ------------------------------------------------------------------------------
+# Mantém, para cada usina, um resumo diário dos alarmes previstos pela IA:
+# número de episódios Crítica e Precária (ver services.rotular_episodios),
+# leituras de risco e fases afetadas. O índice é construído uma única vez
+# sobre todo o histórico, com uma previsão em lote, e atualizado a cada
+# lote ingerido (apenas os dias que receberam leituras). Assim, meses de
+# histórico são consultados sem executar o modelo dia a dia.
+# ======================================================================
+
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import services
+from .ingestao import registrar_observador
+from .metricas import medir_etapa
+from config.settings import USINA_PADRAO
+
+COLUNAS_INDICE = ['criticos', 'precarios', 'leituras_risco', 'mascara_fases']
+
+logger = logging.getLogger(__name__)
+
+# Índice de cada usina (um DataFrame por dia) e as versões do modelo e das
+# leituras da usina (ver versao_usina) que o geraram.
+_indices = {}
+_versoes_modelo = {}
+_versoes_dados = {}
+_lock = threading.Lock()
+# Serializa construções e atualizações incrementais: um lote ingerido durante
+# uma construção espera a publicação do índice e é aplicado em seguida.
+_lock_construcao = threading.RLock()
+
+
+def calcular_indice(df):
+    """
+    Calcula o resumo diário de alarmes a partir das leituras de um intervalo
+    (em ordem cronológica). Todos os dias com leituras aparecem no
+    resultado, inclusive os sem alarmes.
+    """
+    dias = pd.DatetimeIndex(df.index.normalize().unique(), name='dia')
+    indice = pd.DataFrame(0, index=dias, columns=COLUNAS_INDICE, dtype=np.int64)
+
+    df_operacao = df[(df.index.hour >= 6) & (df.index.hour < 19)]
+    if df_operacao.empty:
+        return indice
+    # Previsão em lote sobre todo o intervalo, como em 'obter_dados_para_api'.
+    classes = services.model_global.predict(df_operacao[services.feature_columns_global])
+    risco = np.isin(classes, ['Crítica', 'Precária'])
+    df_risco = df_operacao[risco].assign(Previsao_Classe_Tensao=classes[risco])
+    if df_risco.empty:
+        return indice
+
+    inicio_episodio, mascara_fases, _ = services.rotular_episodios(df_risco)
+    dia_leitura = df_risco.index.normalize()
+    episodios = pd.DataFrame({
+        'dia': dia_leitura[inicio_episodio],
+        'classe': df_risco['Previsao_Classe_Tensao'].to_numpy()[inicio_episodio],
+    })
+    contagens = pd.crosstab(episodios['dia'], episodios['classe'])
+    indice['criticos'] = contagens.get('Crítica', pd.Series(dtype=np.int64)).reindex(dias, fill_value=0)
+    indice['precarios'] = contagens.get('Precária', pd.Series(dtype=np.int64)).reindex(dias, fill_value=0)
+    por_dia = pd.Series(mascara_fases, index=dia_leitura).groupby(level=0)
+    indice['leituras_risco'] = por_dia.size().reindex(dias, fill_value=0)
+    indice['mascara_fases'] = por_dia.agg(np.bitwise_or.reduce).reindex(dias, fill_value=0)
+    return indice.astype(np.int64)
+
+
+def _esta_atualizado(usina):
+    """Indica se o índice da usina corresponde ao modelo e aos dados atuais."""
+    with _lock:
+        if usina not in _indices:
+            return False
+        versao_modelo, versao_dados = _versoes_modelo.get(usina), _versoes_dados.get(usina)
+    return (versao_modelo == services.versao_modelo_global
+            and versao_dados == services.backend_global.versao_usina(usina))
+
+
+def construir_indice(usina=USINA_PADRAO):
+    """Constrói o índice de todo o histórico da usina e o guarda em memória."""
+    with _lock_construcao:
+        # A versão é lida antes dos dados: uma inserção feita durante a
+        # leitura deixa o índice com uma versão antiga e é reprocessada.
+        versao_dados = services.backend_global.versao_usina(usina)
+        with medir_etapa("construir_indice_alarmes"):
+            df = services.backend_global.ler_intervalo(usina, colunas=services.feature_columns_global)
+            indice = calcular_indice(df)
+        with _lock:
+            _indices[usina] = indice
+            _versoes_modelo[usina] = services.versao_modelo_global
+            _versoes_dados[usina] = versao_dados
+    logger.info("Índice de alarmes da usina %s construído (%d dias).", usina, len(indice))
+    return indice
+
+
+def obter_indice(usina=USINA_PADRAO, inicio=None, fim=None):
+    """
+    Retorna o índice da usina no intervalo de dias [inicio, fim], construindo-o
+    na primeira consulta ou quando o modelo ou os dados mudam sem passar pela
+    ingestão deste processo (ex.: outro processo gravando no mesmo SQLite).
+    Retorna None se os dados ou o modelo ainda não foram carregados.
+    """
+    if services.backend_global is None or services.model_global is None:
+        return None
+    if not _esta_atualizado(usina):
+        with _lock_construcao:
+            # Outra requisição pode ter reconstruído o índice enquanto esta esperava.
+            if not _esta_atualizado(usina):
+                construir_indice(usina)
+    with _lock:
+        indice = _indices[usina]
+    return indice.loc[inicio:fim].copy()
+
+
+@registrar_observador
+def atualizar_indice(usina, df_novas):
+    """
+    Observador da ingestão: recalcula apenas os dias que receberam novas
+    leituras. Usinas cujo índice ainda não foi construído são ignoradas
+    (serão indexadas por completo na primeira consulta).
+    """
+    with _lock_construcao:
+        with _lock:
+            if usina not in _indices or services.model_global is None:
+                return
+        versao_dados = services.backend_global.versao_usina(usina)
+        primeiro_dia = df_novas.index.min().normalize()
+        fim = df_novas.index.max().normalize() + pd.Timedelta(days=1)
+        df = services.backend_global.ler_intervalo(usina, primeiro_dia, fim, colunas=services.feature_columns_global)
+        novos = calcular_indice(df)
+        with _lock:
+            indice = _indices[usina]
+            restante = indice[(indice.index < primeiro_dia) | (indice.index >= fim)]
+            _indices[usina] = pd.concat([restante, novos]).sort_index()
+            _versoes_dados[usina] = versao_dados
+
+
+def indice_para_registros(indice):
+    """Converte o índice no formato da API (um dicionário por dia)."""
+    return [
+        {'dia': dia.date().isoformat(), 'criticos': int(criticos), 'precarios': int(precarios),
+         'leituras_risco': int(leituras), 'fases': services.FASES_POR_MASCARA[int(mascara)]}
+        for dia, criticos, precarios, leituras, mascara in indice[COLUNAS_INDICE].itertuples()
+    ]
@@ -0,0 +1,69 @@
+# ======================================================================
+
+# Módulo de Ingestão de Leituras
+# ------------------------------------------------------------------------------
+# Ponto único de entrada para novas leituras vindas dos inversores (por
+# exemplo, pelo coletor da API Sungrow). As leituras são normalizadas para
+# o mesmo esquema de colunas de 'data/data.csv' e gravadas no backend de
+# armazenamento do serviço (ver api/armazenamento.py), o que atualiza a
+# versão dos dados e, com ela, as ETags da API. Outros módulos podem se
+# registrar como observadores para reagir a cada lote ingerido; o detector
+# online e o índice de alarmes são carregados na primeira ingestão, qualquer
+# que seja o processo (API ou coletor executado à parte).
+# ======================================================================
+
+import importlib
+import logging
+import threading
+
+from . import services
+from .armazenamento import normalizar_leituras
+
+# Funções chamadas após cada lote ingerido, com a assinatura (usina, df_novas).
+_observadores = []
+# Módulos que se registram como observadores de toda ingestão. São importados
+# na primeira ingestão, pois importá-los aqui criaria um ciclo (eles
+# importam este módulo para se registrar).
+MODULOS_OBSERVADORES = ('api.detector_online', 'api.indice_alarmes')
+# Serializa as escritas, já que o coletor ingere a partir de várias threads.
+_lock_ingestao = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def registrar_observador(funcao):
+    """Registra uma função a ser chamada a cada lote de leituras ingerido."""
+    if funcao not in _observadores:
+        _observadores.append(funcao)
+    return funcao
+
+
+def ultima_leitura_armazenada(usina):
+    """
+    Retorna o instante da última leitura armazenada da usina, ou None se
+    ela ainda não tem leituras. O coletor parte deste instante ao reiniciar.
+    """
+    intervalo = services.obter_backend().intervalo_datas(usina)
+    return intervalo[1] if intervalo else None
+
+
+def ingerir_leituras(usina, leituras):
+    """
+    Ingere um lote de leituras de uma usina. Retorna o número de leituras
+    aceitas após a normalização.
+    """
+    df_novas = normalizar_leituras(leituras)
+    if df_novas.empty:
+        return 0
+    for modulo in MODULOS_OBSERVADORES:
+        importlib.import_module(modulo)
+
+    with _lock_ingestao:
+        services.obter_backend().inserir(usina, df_novas)
+
+    for observador in list(_observadores):
+        try:
+            observador(usina, df_novas)
+        except Exception:
+            logger.exception("Observador %s falhou.", getattr(observador, '__name__', observador))
+    return len(df_novas)
@@ -0,0 +1,196 @@
+# ======================================================================
+
+# Módulo de Métricas e Instrumentação
+# ------------------------------------------------------------------------------
+# Registro de métricas de baixo custo (contadores, medidores e
+# histogramas) exportadas no formato de texto do Prometheus pela rota
+# '/metrics'. Inclui a medição do tempo de cada etapa do processamento
+# ('medir_etapa') e da latência de cada endpoint da aplicação Flask.
+# ======================================================================
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Limites (em segundos) dos histogramas de latência: de 0,5 ms a 10 s.
+LIMITES_PADRAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    pares = list(zip(nomes, valores)) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    texto = ",".join(f'{nome}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for nome, valor in pares)
+    return "{" + texto + "}"
+
+
+class _MetricaSimples:
+    """
+    Contador ou medidor com rótulos. Se 'funcao' for informada, os valores
+    são obtidos dela no momento da exportação (um número, ou um dicionário
+    {tupla_de_rotulos: valor}).
+    """
+
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=(), funcao=None):
+        self.nome, self.ajuda, self.rotulos, self.funcao = nome, ajuda, tuple(rotulos), funcao
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor=1, **rotulos):
+        chave = tuple(rotulos.get(r, "") for r in self.rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def definir(self, valor, **rotulos):
+        chave = tuple(rotulos.get(r, "") for r in self.rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+    def _amostras(self):
+        if self.funcao is None:
+            with self._lock:
+                return list(self._valores.items())
+        valor = self.funcao()
+        return list(valor.items()) if isinstance(valor, dict) else [((), valor)]
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for chave, valor in self._amostras():
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {float(valor)}")
+        return linhas
+
+
+class Contador(_MetricaSimples):
+    tipo = "counter"
+
+
+class Medidor(_MetricaSimples):
+    tipo = "gauge"
+
+
+class Histograma:
+    """
+    Histograma com rótulos. Cada observação incrementa apenas o seu
+    intervalo; as contagens acumuladas exigidas pelo Prometheus são
+    calculadas somente na exportação.
+    """
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_PADRAO):
+        self.nome, self.ajuda, self.rotulos, self.limites = nome, ajuda, tuple(rotulos), tuple(limites)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(rotulos.get(r, "") for r in self.rotulos)
+        indice = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = [(chave, list(contagens), soma, total) for chave, (contagens, soma, total) in self._series.items()]
+        for chave, contagens, soma, total in series:
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, chave, ('le', le))} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, chave)} {soma}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas juntas pela rota '/metrics'."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, classe, nome, *args, **kwargs):
+        with self._lock:
+            if nome not in self._metricas:
+                self._metricas[nome] = classe(nome, *args, **kwargs)
+            return self._metricas[nome]
+
+    def contador(self, nome, ajuda, rotulos=(), funcao=None):
+        return self._registrar(Contador, nome, ajuda, rotulos, funcao)
+
+    def medidor(self, nome, ajuda, rotulos=(), funcao=None):
+        return self._registrar(Medidor, nome, ajuda, rotulos, funcao)
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_PADRAO):
+        return self._registrar(Histograma, nome, ajuda, rotulos, limites)
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+# Registro global do processo.
+REGISTRO = RegistroMetricas()
+
+DURACAO_ETAPA = REGISTRO.histograma(
+    "tcc_etapa_duracao_segundos", "Duração de cada etapa do processamento do relatório diário.", ("etapa",))
+DURACAO_REQUISICAO = REGISTRO.histograma(
+    "tcc_http_requisicao_duracao_segundos", "Latência das requisições HTTP por endpoint.", ("endpoint", "metodo"))
+REQUISICOES = REGISTRO.contador(
+    "tcc_http_requisicoes_total", "Requisições HTTP atendidas, por endpoint e código de status.", ("endpoint", "status"))
+
+
+@contextmanager
+def medir_etapa(etapa):
+    """Mede o tempo do bloco 'with' e o registra no histograma de etapas."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        DURACAO_ETAPA.observar(time.perf_counter() - inicio, etapa=etapa)
+
+
+def instrumentar_app(app):
+    """
+    Registra, na aplicação Flask, a medição de latência de todos os endpoints,
+    incluindo as requisições encerradas por uma exceção não tratada (status 500).
+    """
+
+    @app.before_request
+    def _iniciar_cronometro():
+        g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def _registrar_latencia(response):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            endpoint = request.endpoint or "desconhecido"
+            DURACAO_REQUISICAO.observar(time.perf_counter() - inicio, endpoint=endpoint, metodo=request.method)
+            REQUISICOES.inc(endpoint=endpoint, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def _registrar_falha(exc):
+        # Quando a exceção é propagada (modo de teste ou depuração), o
+        # after_request não chega a rodar e o cronômetro ainda está em 'g'.
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None and exc is not None:
+            endpoint = request.endpoint or "desconhecido"
+            DURACAO_REQUISICAO.observar(time.perf_counter() - inicio, endpoint=endpoint, metodo=request.method)
+            REQUISICOES.inc(endpoint=endpoint, status=500)
+
+    return app
@@ -0,0 +1,194 @@
+# ======================================================================
+
+# Módulo de Perfilamento de Requisições
+# ------------------------------------------------------------------------------
+# Perfila, sob demanda, uma requisição da API ou um callback do dashboard.
+# Uma thread auxiliar amostra periodicamente a pilha da thread que atende
+# a requisição (sys._current_frames) e, ao final, grava as pilhas no
+# formato "colapsado" (uma linha 'a;b;c contagem' por pilha), aceito pelo
+# flamegraph.pl e pelo speedscope (https://www.speedscope.app).
+#
+# A requisição perfilada não é instrumentada: o custo fica na thread
+# auxiliar, e a gravação do arquivo (com a limpeza dos perfis antigos) é
+# feita por uma thread dedicada, depois que a requisição já terminou. Isso
+# permite deixar a amostragem ligada em produção.
+# Um perfil é gerado quando:
+# - PERFIL_HABILITADO está ligado e a requisição pede com o cabeçalho
+#   'X-Perfil: 1' ou o parâmetro '?perfil=1'; ou
+# - PERFIL_AMOSTRAGEM_N > 0, para 1 a cada N requisições.
+# ======================================================================
+
+import atexit
+import functools
+import itertools
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import has_request_context, request
+
+from config.settings import (PERFIL_HABILITADO, PERFIL_AMOSTRAGEM_N, PERFIL_INTERVALO_S,
+                             PERFIL_DURACAO_MAX_S, PERFIL_MAX_ARQUIVOS, DIRETORIO_PERFIS)
+
+logger = logging.getLogger(__name__)
+
+_contador_requisicoes = itertools.count(1)
+_sequencia_arquivos = itertools.count(1)
+
+# Perfis aguardando gravação, consumidos por uma única thread: as requisições
+# perfiladas não esperam pelo disco nem umas pelas outras.
+_fila_gravacao = queue.Queue()
+_gravador = None
+_lock_gravador = threading.Lock()
+
+
+class AmostradorPilhas:
+    """
+    Amostra a pilha de uma thread a cada 'intervalo' segundos, até que
+    'parar' seja chamado ou 'duracao_max' seja atingida.
+    """
+
+    def __init__(self, thread_id, intervalo=PERFIL_INTERVALO_S, duracao_max=PERFIL_DURACAO_MAX_S):
+        self.thread_id, self.intervalo, self.duracao_max = thread_id, intervalo, duracao_max
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='perfil', daemon=True)
+        # Cache dos rótulos por objeto de código, para amostrar com pouco custo.
+        self._rotulos = {}
+
+    def _rotulo(self, codigo):
+        rotulo = self._rotulos.get(codigo)
+        if rotulo is None:
+            rotulo = f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+            self._rotulos[codigo] = rotulo
+        return rotulo
+
+    def _executar(self):
+        limite = time.monotonic() + self.duracao_max
+        while not self._parar.wait(self.intervalo) and time.monotonic() < limite:
+            quadro = sys._current_frames().get(self.thread_id)
+            if quadro is None:
+                break
+            pilha = []
+            while quadro is not None:
+                pilha.append(self._rotulo(quadro.f_code))
+                quadro = quadro.f_back
+            self.pilhas[';'.join(reversed(pilha))] += 1
+            self.amostras += 1
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        return self
+
+    def gravar_colapsado(self, caminho):
+        """Grava as pilhas amostradas no formato colapsado."""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, contagem in self.pilhas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+        return caminho
+
+
+def _limitar_arquivos(diretorio, maximo):
+    """Remove os perfis mais antigos quando o diretório passa do limite."""
+    arquivos = sorted((os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.endswith('.collapsed')),
+                      key=os.path.getmtime)
+    for caminho in arquivos[:max(0, len(arquivos) - maximo)]:
+        os.remove(caminho)
+
+
+def _gravar_perfis():
+    """Laço da thread de gravação: grava cada perfil enfileirado e limpa o diretório."""
+    while True:
+        amostrador, caminho, nome, duracao = _fila_gravacao.get()
+        try:
+            diretorio = os.path.dirname(caminho)
+            os.makedirs(diretorio, exist_ok=True)
+            amostrador.gravar_colapsado(caminho)
+            _limitar_arquivos(diretorio, PERFIL_MAX_ARQUIVOS)
+            logger.info("Perfil de '%s' (%.1f ms, %d amostras) gravado em %s", nome, duracao * 1000,
+                        amostrador.amostras, caminho)
+        except OSError:
+            logger.exception("Não foi possível gravar o perfil de '%s'.", nome)
+        finally:
+            _fila_gravacao.task_done()
+
+
+def _enfileirar_gravacao(amostrador, caminho, nome, duracao):
+    """Entrega o perfil à thread de gravação, iniciando-a na primeira vez."""
+    global _gravador
+    with _lock_gravador:
+        if _gravador is None:
+            _gravador = threading.Thread(target=_gravar_perfis, name='perfil-gravacao', daemon=True)
+            _gravador.start()
+            # Grava os perfis pendentes ao encerrar o processo.
+            atexit.register(aguardar_gravacoes)
+    _fila_gravacao.put((amostrador, caminho, nome, duracao))
+
+
+def aguardar_gravacoes():
+    """Bloqueia até que todos os perfis enfileirados tenham sido gravados."""
+    _fila_gravacao.join()
+
+
+@contextmanager
+def perfilar(nome, diretorio=None):
+    """
+    Perfila o bloco 'with' (executado na thread atual) e enfileira a gravação
+    do resultado em '<diretorio>/<nome>-<data>-<n>.collapsed'. O objeto
+    retornado recebe o atributo 'arquivo' ao final; o arquivo existe depois
+    que a thread de gravação o processa (ver 'aguardar_gravacoes').
+    """
+    diretorio = diretorio or DIRETORIO_PERFIS
+    amostrador = AmostradorPilhas(threading.get_ident()).iniciar()
+    inicio = time.perf_counter()
+    try:
+        yield amostrador
+    finally:
+        amostrador.parar()
+        duracao = time.perf_counter() - inicio
+        caminho = os.path.join(diretorio, f"{nome}-{datetime.now():%Y%m%d-%H%M%S}-{next(_sequencia_arquivos)}.collapsed")
+        amostrador.arquivo = caminho
+        _enfileirar_gravacao(amostrador, caminho, nome, duracao)
+
+
+def perfil_solicitado():
+    """Indica se a requisição HTTP atual pediu o perfil (cabeçalho ou parâmetro)."""
+    if not has_request_context():
+        return False
+    return request.headers.get('X-Perfil') == '1' or request.args.get('perfil') == '1'
+
+
+def deve_perfilar():
+    """Decide se a execução atual deve ser perfilada, conforme a configuração."""
+    if PERFIL_HABILITADO and perfil_solicitado():
+        return True
+    return PERFIL_AMOSTRAGEM_N > 0 and next(_contador_requisicoes) % PERFIL_AMOSTRAGEM_N == 0
+
+
+def perfilavel(nome):
+    """
+    Decorador para endpoints Flask e callbacks Dash: executa a função sob o
+    perfilador quando 'deve_perfilar' permitir; caso contrário, a chama
+    diretamente.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not deve_perfilar():
+                return funcao(*args, **kwargs)
+            with perfilar(nome):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
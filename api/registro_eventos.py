@@ -0,0 +1,40 @@
+# ======================================================================
+
+# Módulo de Registro de Eventos (Logging)
+# ------------------------------------------------------------------------------
+# Configura o logging do processo de forma assíncrona: as mensagens são
+# apenas enfileiradas pela thread que as produz (QueueHandler) e gravadas
+# no terminal por uma thread dedicada (QueueListener). Assim, uma
+# requisição nunca espera pela escrita no terminal.
+# ======================================================================
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+from config.settings import LOG_NIVEL, LOG_FORMATO
+
+_ouvinte = None
+
+
+def configurar_logging(nivel=LOG_NIVEL):
+    """
+    Direciona o logger raiz para uma fila consumida em segundo plano.
+    Pode ser chamada várias vezes; apenas a primeira instala os handlers.
+    """
+    global _ouvinte
+    raiz = logging.getLogger()
+    raiz.setLevel(nivel)
+    if _ouvinte is not None:
+        return _ouvinte
+
+    fila = queue.SimpleQueue()
+    saida = logging.StreamHandler()
+    saida.setFormatter(logging.Formatter(LOG_FORMATO))
+    _ouvinte = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    _ouvinte.start()
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    # Esvazia a fila ao encerrar o processo, para não perder as últimas mensagens.
+    atexit.register(_ouvinte.stop)
+    return _ouvinte
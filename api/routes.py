@@ -1,24 +1,234 @@
-from flask import Blueprint, jsonify, request
+import logging
+
+import pandas as pd
+from flask import Blueprint, current_app, jsonify, request
 # Importamos a função de lógica de negócio do nosso módulo de serviços
+from . import detector_online, indice_alarmes, services
 from .services import obter_dados_para_api
+from .cache import CODIFICACOES, CacheRespostas, comprimir, etag_da_codificacao, gerar_etag, negociar_codificacao
+from .metricas import REGISTRO, medir_etapa
+from .perfil import perfilavel
+from config.settings import USINA_PADRAO, CACHE_RESPOSTAS_MAX_ITENS, CACHE_DIA_FECHADO_MAX_AGE, COMPRESSAO_MIN_BYTES
 
 # Criamos um "Blueprint". É a forma organizada do Flask de agrupar rotas relacionadas.
 # O primeiro argumento, 'api', é o nome do blueprint.
 main_bp = Blueprint('main_bp', __name__)
 
+# Cache em memória das respostas já serializadas, compartilhado por todas as
+# requisições do processo. A chave é a ETag; cada item guarda o corpo JSON e
+# as codificações já comprimidas dele, de modo que cada requisição conta
+# exatamente um acerto ou uma falha.
+cache_respostas = CacheRespostas(max_itens=CACHE_RESPOSTAS_MAX_ITENS)
+
+logger = logging.getLogger(__name__)
+
+# Métricas do cache de respostas, lidas dos contadores do próprio cache
+# no momento da exportação.
+REGISTRO.contador("tcc_cache_respostas_acertos_total", "Consultas ao cache de respostas que encontraram o corpo.",
+                  funcao=lambda: cache_respostas.acertos)
+REGISTRO.contador("tcc_cache_respostas_falhas_total", "Consultas ao cache de respostas sem o corpo guardado.",
+                  funcao=lambda: cache_respostas.falhas)
+REGISTRO.medidor("tcc_cache_respostas_taxa_acerto", "Fração das consultas ao cache de respostas que foram acertos.",
+                 funcao=lambda: cache_respostas.acertos / max(1, cache_respostas.acertos + cache_respostas.falhas))
+
+
+def _aplicar_cabecalhos_cache(response, etag, fechado, ultima_modificacao):
+    """
+    Adiciona os cabeçalhos de cache HTTP à resposta. Dias fechados podem ser
+    reutilizados por CACHE_DIA_FECHADO_MAX_AGE segundos e depois revalidados
+    pela ETag; o dia corrente precisa ser revalidado a cada uso.
+    """
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    if ultima_modificacao is not None:
+        response.last_modified = ultima_modificacao
+    if fechado:
+        response.headers['Cache-Control'] = f"public, max-age={CACHE_DIA_FECHADO_MAX_AGE}, must-revalidate"
+    else:
+        response.headers['Cache-Control'] = "no-cache"
+    return response
+
+
+def _versao_do_cliente(etag, ultima_modificacao):
+    """
+    Verifica se o cliente já possui a versão atual da resposta, através dos
+    cabeçalhos condicionais 'If-None-Match' (prioritário) ou 'If-Modified-Since'.
+    Retorna a ETag a devolver no 304, ou None se a resposta precisa ser enviada.
+
+    Em 'If-None-Match' vale a comparação fraca (RFC 9110, 13.1.2): aceitamos
+    a ETag de qualquer codificação do corpo, com ou sem o prefixo 'W/'.
+    """
+    if request.if_none_match:
+        for codificacao in CODIFICACOES:
+            variante = etag_da_codificacao(etag, codificacao)
+            if request.if_none_match.contains_weak(variante):
+                return variante
+        return None
+    if request.if_modified_since and ultima_modificacao is not None \
+            and ultima_modificacao <= request.if_modified_since:
+        return etag
+    return None
+
 
 @main_bp.route('/api/dados-usina', methods=['GET'])
+@perfilavel('dados_usina')
 def endpoint_dados_usina():
     """
     Este é o endpoint principal que o Dashboard Dash irá chamar.
-    Ele recebe a data como um parâmetro na URL.
+    Ele recebe a data (e, opcionalmente, a usina) como parâmetros na URL.
+
+    O parâmetro 'relatorio' escolhe o formato do relatório de IA: 'episodios'
+    (padrão, um registro por evento) ou 'leituras' (um registro por leitura).
+
+    As respostas são identificadas por uma ETag derivada da data, do formato
+    do relatório, da versão das leituras do dia (ver services.obter_versao_dia)
+    e da versão do modelo, acrescida da codificação do corpo. Clientes que já
+    possuem essa versão recebem um 304 sem corpo; os demais recebem o corpo
+    comprimido, servido a partir do cache em memória sempre que possível.
+
+    A requisição pode ser perfilada com 'X-Perfil: 1' (ver api/perfil.py).
     """
     # Pega o parâmetro 'data' da URL (ex: ?data=2025-01-14)
     data_str = request.args.get('data')
-    print(f"DEBUG ROUTES: Requisição recebida para data: {data_str}")
-    
-    # Chama a função do nosso serviço para obter os dados já formatados
-    dados = obter_dados_para_api(data_str)
-    
+    usina = request.args.get('usina') or USINA_PADRAO
+    # Formato do relatório de IA: por episódio (padrão) ou por leitura.
+    modo = request.args.get('relatorio') or services.MODOS_RELATORIO[0]
+    logger.debug("Requisição recebida para data: %s (usina %s, relatório por %s)", data_str, usina, modo)
+    if modo not in services.MODOS_RELATORIO:
+        response = jsonify({"erro": f"Formato de relatório inválido: {modo}. Use um de {list(services.MODOS_RELATORIO)}."})
+        response.headers['Cache-Control'] = "no-store"
+        return response, 400
+
+    try:
+        dia = services.resolver_dia_solicitado(data_str, usina)
+    except (ValueError, TypeError):
+        dia = None
+
+    # Sem dia resolvido (dados não carregados ou data inválida) não há o que
+    # cachear: delegamos ao serviço, que devolve a mensagem de erro adequada.
+    if dia is None:
+        response = jsonify(obter_dados_para_api(data_str, usina, modo))
+        response.headers['Cache-Control'] = "no-store"
+        return response
+
+    _, ultima_modificacao_dados = services.obter_versao_dados()
+    # O corpo depende também do modelo: um retreino conta como modificação.
+    ultima_modificacao = services.obter_ultima_modificacao(ultima_modificacao_dados)
+    fechado, versao_dia = services.obter_versao_dia(dia, usina)
+    etag = gerar_etag(usina, dia.isoformat(), modo, versao_dia, services.versao_modelo_global)
+
+    etag_cliente = _versao_do_cliente(etag, ultima_modificacao)
+    if etag_cliente is not None:
+        return _aplicar_cabecalhos_cache(current_app.response_class(status=304), etag_cliente, fechado, ultima_modificacao)
+
+    codificacao = negociar_codificacao(request.headers.get('Accept-Encoding'))
+    corpos = cache_respostas.obter(etag)
+
+    if corpos is None:
+        # Chama a função do nosso serviço para obter os dados já formatados
+        dados = obter_dados_para_api(data_str, usina, modo)
+        with medir_etapa("codificar"):
+            corpo_json = current_app.json.dumps(dados).encode('utf-8')
+        if 'erro' in dados:
+            # Erros internos nunca são guardados em cache.
+            response = current_app.response_class(corpo_json, mimetype='application/json')
+            response.headers['Cache-Control'] = "no-store"
+            return response
+        # O corpo sem compressão fica no cache, para que outra codificação
+        # do mesmo dia não precise reprocessar os dados.
+        corpos = {'identity': corpo_json}
+        cache_respostas.guardar(etag, corpos)
+
+    if len(corpos['identity']) < COMPRESSAO_MIN_BYTES:
+        codificacao = 'identity'
+    corpo = corpos.get(codificacao)
+    if corpo is None:
+        with medir_etapa("comprimir"):
+            corpo = comprimir(corpos['identity'], codificacao)
+        corpos[codificacao] = corpo
+
     # Retorna os dados como uma resposta JSON
-    return jsonify(dados)
\ No newline at end of file
+    response = current_app.response_class(corpo, mimetype='application/json')
+    if codificacao != 'identity':
+        response.headers['Content-Encoding'] = codificacao
+    return _aplicar_cabecalhos_cache(response, etag_da_codificacao(etag, codificacao), fechado, ultima_modificacao)
+
+
+@main_bp.route('/api/resumo-diario', methods=['GET'])
+def endpoint_resumo_diario():
+    """
+    Retorna o resumo diário (leituras, energia, pico e tensão máxima) de uma
+    usina no intervalo [inicio, fim] informado na URL. A agregação é feita
+    pelo backend de armazenamento, sem carregar as leituras individuais.
+    """
+    usina = request.args.get('usina') or USINA_PADRAO
+    backend = services.backend_global
+    if backend is None:
+        return jsonify({"erro": "Dados não carregados no servidor."})
+    try:
+        inicio = pd.Timestamp(request.args['inicio']) if request.args.get('inicio') else None
+        fim = pd.Timestamp(request.args['fim']) + pd.Timedelta(days=1) if request.args.get('fim') else None
+    except ValueError as e:
+        return jsonify({"erro": f"Data inválida: {e}"}), 400
+
+    resumo = backend.agregar_diario(usina, inicio, fim).round(2)
+    resumo.index = [dia.isoformat() for dia in resumo.index]
+    return jsonify({"usina": usina, "dias": resumo.reset_index(names='dia').to_dict('records')})
+
+
+@main_bp.route('/api/indice-alarmes', methods=['GET'])
+def endpoint_indice_alarmes():
+    """
+    Retorna, para cada dia do intervalo [inicio, fim] informado na URL, o
+    número de episódios Crítica e Precária previstos pela IA, as leituras de
+    risco e as fases afetadas. A consulta usa o índice pré-calculado (ver
+    api/indice_alarmes.py), sem executar o modelo dia a dia.
+    """
+    usina = request.args.get('usina') or USINA_PADRAO
+    try:
+        inicio = pd.Timestamp(request.args['inicio']) if request.args.get('inicio') else None
+        fim = pd.Timestamp(request.args['fim']) if request.args.get('fim') else None
+    except ValueError as e:
+        return jsonify({"erro": f"Data inválida: {e}"}), 400
+
+    versao_dados, ultima_modificacao_dados = services.obter_versao_dados()
+    ultima_modificacao = services.obter_ultima_modificacao(ultima_modificacao_dados)
+    etag = gerar_etag('indice-alarmes', usina, request.args.get('inicio'), request.args.get('fim'),
+                      versao_dados, services.versao_modelo_global)
+    etag_cliente = _versao_do_cliente(etag, ultima_modificacao)
+    if etag_cliente is not None:
+        return _aplicar_cabecalhos_cache(current_app.response_class(status=304), etag_cliente, False, ultima_modificacao)
+
+    indice = indice_alarmes.obter_indice(usina, inicio, fim)
+    if indice is None:
+        return jsonify({"erro": "Dados ou modelo de IA não carregados no servidor."})
+    response = jsonify({"usina": usina, "dias": indice_alarmes.indice_para_registros(indice)})
+    return _aplicar_cabecalhos_cache(response, etag, False, ultima_modificacao)
+
+
+@main_bp.route('/api/alertas-online', methods=['GET'])
+def endpoint_alertas_online():
+    """
+    Retorna as estatísticas móveis e os alertas recentes do detector online
+    (ver api/detector_online.py) para a usina informada na URL. O detector
+    só recebe leituras quando o coletor roda no processo da API
+    (TCC_COLETOR_NA_API=1); caso contrário, nenhuma leitura é reportada.
+    """
+    usina = request.args.get('usina') or USINA_PADRAO
+    estado = detector_online.detector.obter_estado(usina)
+    if estado is None:
+        estado = {"usina": usina, "leituras": 0, "alertas": []}
+    response = jsonify(estado)
+    response.headers['Cache-Control'] = "no-store"
+    return response
+
+
+@main_bp.route('/metrics', methods=['GET'])
+def endpoint_metricas():
+    """
+    Expõe as métricas do processo (latência por endpoint, duração das etapas
+    do relatório, cache e versão do modelo) no formato de texto do Prometheus.
+    """
+    response = current_app.response_class(REGISTRO.exportar(), mimetype='text/plain; version=0.0.4')
+    response.headers['Cache-Control'] = "no-store"
+    return response
@@ -2,13 +2,21 @@
 
 # Módulo de Backend
 # ------------------------------------------------------------------------------
-======================================================================
+# ======================================================================
 
+import numpy as np
 import pandas as pd
 import os
-from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
-import traceback
+import hashlib
+import logging
+import pickle
+import threading
+from datetime import datetime, timezone
+from importlib.metadata import version
+
+from .armazenamento import INTERVALO_LEITURA_H, criar_backend
+from .metricas import REGISTRO, medir_etapa
+from config.settings import USINA_PADRAO, DIRETORIO_MODELOS, MODELOS_MANTIDOS
 
 # --- 1. Configuração e Inicialização do Ambiente ---
 # ---------------------------------------------------
@@ -32,10 +40,27 @@ except NameError:
 DATA_FILE_PATH = os.path.join(PROJECT_ROOT, "data", "data.csv")
 
 # Declaração das variáveis globais que serão preenchidas na inicialização.
-df_usina_global = None
+# O backend de armazenamento (ver api/armazenamento.py) fornece as leituras
+# sob demanda: cada requisição lê apenas o dia de que precisa.
+backend_global = None
 model_global = None
 feature_columns_global = []
 
+# Versão do modelo atualmente carregado. Junto com a versão dos dados
+# (fornecida pelo backend), identifica o conteúdo das respostas da API e é
+# usada na geração das ETags HTTP.
+versao_modelo_global = None
+# Instante (UTC) em que o modelo carregado foi treinado. Entra no
+# 'Last-Modified' das respostas, que dependem dos dados e do modelo.
+modelo_treinado_em = None
+
+logger = logging.getLogger(__name__)
+
+# Expõe a versão do modelo carregado em '/metrics' (valor 1 com a versão no rótulo).
+REGISTRO.medidor(
+    "tcc_modelo_info", "Versão do modelo de IA carregado.", ("versao",),
+    funcao=lambda: {(versao_modelo_global,): 1} if versao_modelo_global else {})
+
 # --- 2. Núcleo de Inteligência e Análise ---
 # ------------------------------------------
 # Funções responsáveis pela lógica de classificação e geração de sugestões,
@@ -61,6 +86,23 @@ def classificar_tensao_trifasica(row):
     else:
         return 'Inativo'
 
+# Categorias da classificação de tensão. A posição de cada classe é o seu
+# código int8 na coluna categórica 'Classe_Tensao'.
+CLASSES_TENSAO = ['Adequada', 'Precária', 'Crítica', 'Inativo']
+
+def classificar_tensoes(df):
+    """
+    Versão vetorizada de 'classificar_tensao_trifasica', aplicada a todas as
+    linhas de uma vez. Retorna uma coluna categórica (um código int8 por
+    leitura) em vez de uma string Python por linha.
+    """
+    tensoes = df[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']].to_numpy()
+    critica = ((tensoes > 233) | (tensoes < 191)).any(axis=1)
+    precaria = ((tensoes > 231) | (tensoes < 202)).any(axis=1)
+    adequada = (tensoes > 0).all(axis=1)
+    codigos = np.select([critica, precaria, adequada], [2, 1, 0], default=3).astype(np.int8)
+    return pd.Categorical.from_codes(codigos, categories=CLASSES_TENSAO)
+
 def adicionar_sugestao_detalhada(row):
     """
     Gera sugestões de diagnóstico e ações específicas para cada tipo de
@@ -106,81 +148,336 @@ def adicionar_sugestao_detalhada(row):
 
     return mensagem_final if mensagem_final else "Anomalia detectada. Realizar inspeção geral no sistema."
 
+# Formatos do relatório de IA: 'episodios' agrupa as leituras de risco
+# consecutivas em eventos; 'leituras' mantém um registro por leitura.
+MODOS_RELATORIO = ('episodios', 'leituras')
+
+# Intervalo entre leituras consecutivas de uma mesma série.
+INTERVALO_LEITURA = pd.Timedelta(minutes=round(INTERVALO_LEITURA_H * 60))
+
+# Nomes das fases afetadas para cada uma das 8 máscaras de fases possíveis.
+FASES_POR_MASCARA = [[f for bit, f in zip((1, 2, 4), ('L1', 'L2', 'L3')) if m & bit] for m in range(8)]
+
+def rotular_episodios(df_risco):
+    """
+    Codificação por comprimento de sequência (run-length) vetorizada das
+    leituras de risco, que devem estar em ordem cronológica. Um novo
+    episódio começa quando a classe prevista ou as fases fora da faixa
+    adequada mudam, ou quando há uma lacuna de tempo entre as leituras.
+
+    Retorna (inicio_episodio, mascara_fases, desvios): um booleano por
+    leitura indicando o início de um episódio, a máscara de bits das fases
+    afetadas (L1=1, L2=2, L3=4) e a distância (V) de cada fase à faixa
+    adequada de 202 V a 231 V.
+    """
+    tensoes = df_risco[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']].to_numpy()
+    desvios = np.maximum(tensoes - 231, 202 - tensoes).clip(min=0)
+    mascara_fases = ((desvios > 0) * np.array([1, 2, 4])).sum(axis=1)
+    classes = df_risco['Previsao_Classe_Tensao'].to_numpy()
+    instantes = df_risco.index.to_numpy()
+
+    inicio_episodio = np.ones(len(df_risco), dtype=bool)
+    inicio_episodio[1:] = ((classes[1:] != classes[:-1])
+                           | (mascara_fases[1:] != mascara_fases[:-1])
+                           | (np.diff(instantes) != INTERVALO_LEITURA.to_timedelta64()))
+    return inicio_episodio, mascara_fases, desvios
+
+def construir_episodios(df_risco, sugestao=adicionar_sugestao_detalhada):
+    """
+    Agrupa as leituras de risco em episódios: sequências de leituras
+    consecutivas (sem lacunas de tempo) com a mesma classe prevista e as
+    mesmas fases fora da faixa adequada (ver 'rotular_episodios').
+
+    Para cada episódio são calculados o início, o fim, a duração, o número de
+    leituras, a pior tensão (a mais distante da faixa adequada de 202 V a
+    231 V) e a sugestão, gerada uma única vez a partir da leitura com essa
+    pior tensão. Retorna um DataFrame com um episódio por linha.
+    """
+    colunas = ['Previsao_Classe_Tensao', 'Fases', 'Inicio', 'Fim', 'Duracao_min', 'N_Leituras',
+               'Pior_Tensao', 'Fase_Pior_Tensao', 'Horario_Pior_Tensao', 'Sugestao']
+    if df_risco.empty:
+        return pd.DataFrame(columns=colunas)
+
+    df_risco = df_risco.sort_index()
+    inicio_episodio, mascara_fases, desvios = rotular_episodios(df_risco)
+    tensoes = df_risco[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']].to_numpy()
+    classes = df_risco['Previsao_Classe_Tensao'].to_numpy()
+    instantes = df_risco.index.to_numpy()
+    episodio = np.cumsum(inicio_episodio) - 1
+
+    fase_pior = desvios.argmax(axis=1)
+    linhas = np.arange(len(df_risco))
+    auxiliar = pd.DataFrame({
+        'episodio': episodio, 'instante': instantes, 'desvio': desvios[linhas, fase_pior], 'linha': linhas,
+    })
+    grupos = auxiliar.groupby('episodio', sort=True)
+    inicios, fins = grupos['instante'].min(), grupos['instante'].max()
+    n_leituras = grupos.size()
+    # Linha (posição em df_risco) com a pior tensão de cada episódio.
+    piores = auxiliar.loc[grupos['desvio'].idxmax(), 'linha'].to_numpy()
+
+    primeiras = np.flatnonzero(inicio_episodio)
+    nomes_fases = np.array(['L1', 'L2', 'L3'])
+    episodios = pd.DataFrame({
+        'Previsao_Classe_Tensao': classes[primeiras],
+        'Fases': [FASES_POR_MASCARA[m] for m in mascara_fases[primeiras]],
+        'Inicio': inicios.dt.strftime('%H:%M:%S').to_numpy(),
+        'Fim': fins.dt.strftime('%H:%M:%S').to_numpy(),
+        'Duracao_min': (n_leituras.to_numpy() * INTERVALO_LEITURA.total_seconds() / 60).astype(int),
+        'N_Leituras': n_leituras.to_numpy(),
+        'Pior_Tensao': tensoes[piores, fase_pior[piores]],
+        'Fase_Pior_Tensao': nomes_fases[fase_pior[piores]],
+        'Horario_Pior_Tensao': df_risco.index[piores].strftime('%H:%M:%S'),
+    })
+    episodios['Sugestao'] = [sugestao(df_risco.iloc[i]) for i in piores]
+    return episodios[colunas]
+
 # --- 3. Funções Principais da API ---
 # ------------------------------------
 # Funções que orquestram o fluxo de dados, do carregamento à geração
 # do relatório final.
 
+def obter_backend():
+    """
+    Retorna o backend de armazenamento do serviço, criando-o na primeira
+    chamada. Permite que a ingestão funcione mesmo antes do treinamento.
+    """
+    global backend_global
+    if backend_global is None:
+        backend_global = criar_backend()
+    return backend_global
+
+# Hiperparâmetros do modelo de IA. Fazem parte da versão do modelo.
+PARAMETROS_MODELO = {'n_estimators': 100, 'random_state': 42}
+
+class ModeloEmDisco:
+    """
+    Modelo gravado no cache em disco. O arquivo (e, com ele, o scikit-learn)
+    só é carregado na primeira previsão, o que deixa a inicialização de um
+    processo novo rápida quando o modelo já foi treinado antes.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._modelo = None
+        self._lock = threading.Lock()
+
+    def carregar(self):
+        if self._modelo is None:
+            with self._lock:
+                if self._modelo is None:
+                    with open(self.caminho, 'rb') as f:
+                        self._modelo = pickle.load(f)
+                    logger.info("Modelo de IA carregado de %s.", self.caminho)
+        return self._modelo
+
+    def __getattr__(self, nome):
+        # Chamado apenas para atributos do modelo (predict, classes_, ...).
+        if nome.startswith('_'):
+            raise AttributeError(nome)
+        return getattr(self.carregar(), nome)
+
+def _caminho_modelo(versao):
+    return os.path.join(DIRETORIO_MODELOS, f"modelo-{versao}.pkl")
+
+def _gravar_modelo(modelo, caminho):
+    """Grava o modelo no cache de forma atômica (arquivo temporário + rename)."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as f:
+        pickle.dump(modelo, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, caminho)
+    _remover_modelos_antigos(caminho)
+
+def _remover_modelos_antigos(caminho_atual, mantidos=MODELOS_MANTIDOS):
+    """
+    Apaga do cache os modelos de versões antigas, mantendo o atual e os
+    mais recentes até o total de 'mantidos' arquivos.
+    """
+    outros = []
+    with os.scandir(os.path.dirname(caminho_atual)) as entradas:
+        for entrada in entradas:
+            if entrada.name.startswith("modelo-") and entrada.name.endswith(".pkl") \
+                    and entrada.path != caminho_atual:
+                try:
+                    outros.append((entrada.stat().st_mtime, entrada.path))
+                except OSError:
+                    # Removido por outro processo durante a listagem.
+                    continue
+    outros.sort(reverse=True)
+    for _, caminho in outros[max(0, mantidos - 1):]:
+        try:
+            os.remove(caminho)
+            logger.info("Modelo antigo removido do cache: %s.", caminho)
+        except OSError:
+            logger.warning("Não foi possível remover o modelo antigo %s.", caminho, exc_info=True)
+
 def carregar_dados_e_treinar_modelo():
     """
     Função de inicialização do serviço.
-    Carrega o arquivo CSV, pré-processa os dados, cria a variável alvo 'Classe_Tensao'
-    e treina o modelo de IA (Random Forest Classifier).
-    Os dados e o modelo treinados são armazenados em variáveis globais para
+    Abre o backend de armazenamento, lê o histórico da usina, cria a variável
+    alvo 'Classe_Tensao' e treina o modelo de IA (Random Forest Classifier).
+    O backend e o modelo treinado são armazenados em variáveis globais para
     acesso eficiente por outras funções.
+
+    Se um modelo com a mesma versão (dados, hiperparâmetros e versão do
+    scikit-learn) já estiver no cache em disco, ele é reaproveitado sem
+    treinar, e o scikit-learn só é importado na primeira previsão.
     """
-    global df_usina_global, model_global, feature_columns_global
-    print("DEBUG SERVICES: --------------- INÍCIO DO CARREGAMENTO E TREINAMENTO DA IA ---------------")
+    global model_global, feature_columns_global, versao_modelo_global, modelo_treinado_em
+    logger.info("Início do carregamento dos dados e do treinamento da IA.")
     
     try:
-        # Lê o arquivo CSV com configurações de separador e tratamento de datas.
-        df = pd.read_csv(DATA_FILE_PATH, sep=',', decimal='.', parse_dates=['DateTime'])
-        df = df.set_index('DateTime')
-
-        # Converte colunas numéricas e preenche valores ausentes (NaN) com 0.
-        numeric_cols = ['Dem_Ativa', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Aplica a função de classificação para criar a variável 'Classe_Tensao'.
-        df['Classe_Tensao'] = df.apply(classificar_tensao_trifasica, axis=1)
-        df_treino = df[df['Classe_Tensao'] != 'Inativo'].copy()
-        
+        backend = obter_backend()
+
         # Define as colunas de entrada (features) e a coluna alvo para o modelo.
+        # Apenas essas colunas são lidas do armazenamento para o treino.
         feature_columns_global = ['Dem_Ativa', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']
         target = 'Classe_Tensao'
+
+        # A versão do modelo combina os hiperparâmetros com a versão dos dados
+        # usados no treino e identifica o arquivo no cache em disco.
+        versao_dados, _ = backend.obter_versao()
+        versao = _gerar_versao('RandomForestClassifier', sorted(PARAMETROS_MODELO.items()), feature_columns_global,
+                               version('scikit-learn'), versao_dados)
+        caminho = _caminho_modelo(versao)
+        if os.path.exists(caminho):
+            model_global, versao_modelo_global = ModeloEmDisco(caminho), versao
+            modelo_treinado_em = datetime.fromtimestamp(int(os.path.getmtime(caminho)), tz=timezone.utc)
+            logger.info("Modelo de IA encontrado no cache (versão %s).", versao)
+            return
+
+        from sklearn.ensemble import RandomForestClassifier
+
+        df = backend.ler_intervalo(USINA_PADRAO, colunas=feature_columns_global)
+        
+        # Aplica a classificação (vetorizada) para criar a variável 'Classe_Tensao'.
+        df['Classe_Tensao'] = classificar_tensoes(df)
+        df_treino = df[df['Classe_Tensao'] != 'Inativo']
         
         X = df_treino[feature_columns_global]
         y = df_treino[target]
         
         # Inicializa e treina o modelo de classificação.
-        model_rf = RandomForestClassifier(n_estimators=100, random_state=42)
+        model_rf = RandomForestClassifier(**PARAMETROS_MODELO)
         model_rf.fit(X, y)
         
-        # Atribui o modelo e o DataFrame às variáveis globais.
-        model_global = model_rf
-        df_usina_global = df.copy()
+        # Atribui o modelo à variável global e o grava no cache em disco.
+        model_global, versao_modelo_global = model_rf, versao
+        modelo_treinado_em = datetime.now(timezone.utc).replace(microsecond=0)
+        try:
+            _gravar_modelo(model_rf, caminho)
+        except OSError:
+            logger.warning("Não foi possível gravar o modelo no cache em %s.", caminho, exc_info=True)
         
-        print("DEBUG SERVICES: --------------- MODELO DE IA TREINADO E PRONTO ---------------")
-    except Exception as e:
-        print(f"ERRO FATAL SERVICES ao carregar/treinar: {e}")
-        print(traceback.format_exc())
+        logger.info("Modelo de IA treinado e pronto (versão %s, %d leituras).", versao_modelo_global, len(X))
+    except Exception:
+        logger.exception("Erro fatal ao carregar os dados ou treinar o modelo.")
+
+def _gerar_versao(*partes):
+    """Gera um identificador curto e estável a partir das partes informadas."""
+    return hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()[:12]
 
-def obter_dados_para_api(data_solicitada_str=None):
+def obter_versao_dados():
+    """
+    Retorna (versao, ultima_modificacao) dos dados armazenados, ou
+    (None, None) se o backend ainda não foi aberto.
+    """
+    if backend_global is None:
+        return None, None
+    return backend_global.obter_versao()
+
+def obter_ultima_modificacao(ultima_modificacao_dados):
+    """
+    Retorna o instante da última mudança de uma resposta que depende dos
+    dados e do modelo: o mais recente entre a modificação dos dados e o
+    treinamento do modelo carregado (ou None, se nenhum for conhecido).
+    """
+    instantes = [i for i in (ultima_modificacao_dados, modelo_treinado_em) if i is not None]
+    return max(instantes) if instantes else None
+
+def resolver_dia_solicitado(data_solicitada_str=None, usina=USINA_PADRAO):
+    """
+    Converte a data recebida na requisição no dia a ser analisado. Se nenhuma
+    data for fornecida, usa o dia mais recente disponível nos dados da usina.
+    Retorna None se os dados ainda não foram carregados ou se a usina não
+    possui leituras.
+    """
+    if backend_global is None:
+        return None
+    if data_solicitada_str:
+        return pd.to_datetime(data_solicitada_str).date()
+    intervalo = backend_global.intervalo_datas(usina)
+    return intervalo[1].date() if intervalo else None
+
+def dia_esta_fechado(dia, usina=USINA_PADRAO, assinatura=None):
+    """
+    Indica se o dia já está "fechado", isto é, se possui leituras e é
+    anterior ao último dia presente nos dados. Dias fechados não recebem novas
+    leituras, então o relatório deles só muda com uma nova versão do modelo.
+    Dias sem leituras (por exemplo, anteriores ao início dos dados) não são
+    fechados, pois ainda podem receber leituras importadas.
+
+    A verificação usa apenas o índice de tempo do backend (ver
+    'assinatura_dia'), sem ler as medições do dia; 'assinatura' evita
+    repetir a consulta quando já é conhecida.
+    """
+    intervalo = backend_global.intervalo_datas(usina) if backend_global is not None else None
+    if intervalo is None or not intervalo[0].date() <= dia < intervalo[1].date():
+        return False
+    n_leituras, _ = assinatura or backend_global.assinatura_dia(usina, dia)
+    return n_leituras > 0
+
+def obter_versao_dia(dia, usina=USINA_PADRAO):
+    """
+    Retorna (fechado, versao) das leituras que compõem o relatório de um dia.
+    Para dias fechados bastam o número de leituras e o último instante do
+    dia: leituras novas de outros dias (como as do coletor) não mudam a ETag
+    nem invalidam o cache das respostas. Os demais dias usam a versão das
+    leituras da usina.
+    """
+    assinatura = backend_global.assinatura_dia(usina, dia)
+    if dia_esta_fechado(dia, usina, assinatura):
+        n_leituras, ultimo = assinatura
+        return True, f"{n_leituras}@{ultimo}"
+    return False, backend_global.versao_usina(usina)
+
+def obter_dados_para_api(data_solicitada_str=None, usina=None, modo_relatorio='episodios'):
     """
     Função principal da API. Recebe uma data (opcionalmente) e processa os dados
     desse dia para gerar um relatório completo, que inclui:
     - Dados de todas as medições do dia.
     - Informações sobre o pico de geração.
-    - Um relatório de IA com alertas de tensão e sugestões detalhadas.
+    - Um relatório de IA com alertas de tensão e sugestões detalhadas, com um
+      registro por episódio (padrão) ou por leitura ('modo_relatorio').
     """
     # Verifica se os dados e o modelo globais foram carregados com sucesso.
-    if df_usina_global is None or model_global is None:
+    if backend_global is None or model_global is None:
         return {"erro": "Dados ou modelo de IA não carregados no servidor."}
+    usina = usina or USINA_PADRAO
     
     try:
         # Determina o dia a ser analisado. Se nenhuma data for fornecida,
         # usa a data mais recente disponível nos dados.
-        dia_para_analise = pd.to_datetime(data_solicitada_str).date() if data_solicitada_str else df_usina_global.index.date.max()
-        df_dia = df_usina_global[df_usina_global.index.date == dia_para_analise].copy()
+        dia_para_analise = resolver_dia_solicitado(data_solicitada_str, usina)
+        if dia_para_analise is None:
+            return {"erro": f"Nenhum dado disponível para a usina {usina}."}
+
+        # Lê do armazenamento apenas as leituras do dia solicitado.
+        # Cada etapa é cronometrada e exposta em '/metrics' (ver api/metricas.py).
+        with medir_etapa("carregar"):
+            df_dia = backend_global.ler_dia(usina, dia_para_analise).copy()
+            if not df_dia.empty:
+                df_dia['Classe_Tensao'] = classificar_tensoes(df_dia)
         
         # Estrutura o dicionário de resposta com valores padrão.
-        dados_formatados = {
-            "leituras_dia_selecionado": df_dia.reset_index().to_dict('records'),
-            "relatorio_ia": [], 
-            "erro_dia_selecionado": None, 
-            "dados_pico_dia": {},
-        }
+        with medir_etapa("serializar_leituras"):
+            dados_formatados = {
+                "leituras_dia_selecionado": df_dia.reset_index().to_dict('records'),
+                "relatorio_ia": [], 
+                "erro_dia_selecionado": None, 
+                "dados_pico_dia": {},
+            }
         
         if df_dia.empty:
             # Retorna uma mensagem de erro se não houver dados para o dia solicitado.
@@ -194,23 +491,32 @@ def obter_dados_para_api(data_solicitada_str=None):
         
         # --- Execução do Modelo de IA e Geração de Relatório ---
         # Filtra os dados apenas para o horário de operação diurna (6h às 19h).
-        df_operacao = df_dia[(df_dia.index.hour >= 6) & (df_dia.index.hour < 19)].copy()
+        with medir_etapa("recortar"):
+            df_operacao = df_dia[(df_dia.index.hour >= 6) & (df_dia.index.hour < 19)].copy()
         
         if not df_operacao.empty:
             # Usa o modelo de IA para prever a classe de tensão para cada medição.
-            X_pred = df_operacao[feature_columns_global]
-            df_operacao['Previsao_Classe_Tensao'] = model_global.predict(X_pred)
-            
-            # Aplica a função de sugestão para gerar o relatório detalhado.
-            df_operacao['Sugestao'] = df_operacao.apply(adicionar_sugestao_detalhada, axis=1)
+            with medir_etapa("prever"):
+                X_pred = df_operacao[feature_columns_global]
+                df_operacao['Previsao_Classe_Tensao'] = model_global.predict(X_pred)
             
             # Filtra apenas os registros que requerem atenção (Crítica ou Precária).
             df_risco = df_operacao[df_operacao['Previsao_Classe_Tensao'].isin(['Crítica', 'Precária'])].copy()
             
-            if not df_risco.empty:
+            if not df_risco.empty and modo_relatorio == 'leituras':
+                # Aplica a função de sugestão a cada leitura de risco.
+                with medir_etapa("sugerir"):
+                    df_risco['Sugestao'] = df_risco.apply(adicionar_sugestao_detalhada, axis=1)
                 # Formata o horário para o relatório final.
-                df_risco['Horario'] = df_risco.index.strftime('%H:%M:%S')
-                dados_formatados["relatorio_ia"] = df_risco.reset_index().to_dict('records')
+                with medir_etapa("serializar_relatorio"):
+                    df_risco['Horario'] = df_risco.index.strftime('%H:%M:%S')
+                    dados_formatados["relatorio_ia"] = df_risco.reset_index().to_dict('records')
+            elif not df_risco.empty:
+                # Agrupa as leituras de risco em episódios, com uma sugestão por episódio.
+                with medir_etapa("sugerir"):
+                    episodios = construir_episodios(df_risco)
+                with medir_etapa("serializar_relatorio"):
+                    dados_formatados["relatorio_ia"] = episodios.to_dict('records')
 
         # Adiciona cálculo de geração total do dia (kWh).
         # A Dem_Ativa é uma leitura a cada 5 minutos, então multiplicamos por 5/60.
@@ -221,6 +527,5 @@ def obter_dados_para_api(data_solicitada_str=None):
         return dados_formatados
 
     except Exception as e:
-        print(f"ERRO SERVICES na API: {e}")
-        print(traceback.format_exc())
+        logger.exception("Erro ao processar os dados da usina %s.", usina)
         return {"erro": f"Erro interno no servidor ao processar dados: {e}"}
\ No newline at end of file
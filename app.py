@@ -1,8 +1,20 @@
+import logging
+import threading
+
 from flask import Flask
 from flask_cors import CORS
 
 # Importamos o nosso blueprint que contém as rotas da API
 from api.routes import main_bp
+from api.metricas import instrumentar_app
+from api.registro_eventos import configurar_logging
+from config.settings import COLETOR_NA_API
+
+logger = logging.getLogger(__name__)
+
+# Coletor executado dentro do processo da API (ver COLETOR_NA_API).
+coletor_global = None
+_lock_coletor = threading.Lock()
 
 # --- 1. Criação e Configuração da Aplicação ---
 
@@ -11,6 +23,9 @@ def create_app():
     Cria e configura uma instância da aplicação Flask.
     Esta é uma factory function, uma boa prática para aplicações Flask.
     """
+    # Ativa o registro de eventos assíncrono (ver api/registro_eventos.py).
+    configurar_logging()
+
     # Cria a instância da aplicação
     app = Flask(__name__)
     
@@ -23,20 +38,46 @@ def create_app():
     # Todas as rotas definidas em 'main_bp' (em api/routes.py)
     # agora fazem parte da nossa aplicação.
     app.register_blueprint(main_bp)
+
+    # Mede a latência de todos os endpoints, exposta em '/metrics'.
+    instrumentar_app(app)
     
-    print("DEBUG APP: Aplicação Flask criada e rotas registadas.")
+    # Com o coletor no mesmo processo, as leituras coletadas passam pela
+    # ingestão da API (armazenamento, índice de alarmes e detector online).
+    if COLETOR_NA_API:
+        iniciar_coletor()
+
+    logger.info("Aplicação Flask criada e rotas registadas.")
     return app
 
 
+def iniciar_coletor(**opcoes):
+    """
+    Inicia o coletor de leituras em uma thread em segundo plano, uma única
+    vez por processo (create_app pode ser chamada várias vezes). As opções
+    são repassadas a ColetorSungrow. Retorna o coletor em execução.
+    """
+    global coletor_global
+    from coletor import ColetorSungrow
+
+    with _lock_coletor:
+        if coletor_global is None:
+            coletor_global = ColetorSungrow(**opcoes)
+            coletor_global.iniciar()
+            logger.info("Coletor iniciado no processo da API (%d usinas).", len(coletor_global.usinas))
+    return coletor_global
+
+
 # --- 2. Bloco de Execução Principal ---
 
 if __name__ == '__main__':
     # Criamos a nossa aplicação chamando a factory function
     app = create_app()
     
-    print("DEBUG APP: A iniciar o servidor Flask...")
+    logger.info("A iniciar o servidor Flask...")
     
     # Executa a aplicação.
     # 'host="0.0.0.0"' permite que o servidor seja acessível na sua rede.
     # 'debug=True' ativa o modo de depuração para vermos os erros facilmente.
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # O recarregamento automático executaria create_app (e o coletor) em dois processos.
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=not COLETOR_NA_API)
\ No newline at end of file
@@ -0,0 +1,11 @@
+# ======================================================================
+
+# Suíte de Benchmarks
+# ------------------------------------------------------------------------------
+# Mede os caminhos críticos do sistema (carregamento, classificação,
+# treino, relatório diário da API, codificação JSON e callbacks do
+# dashboard) sobre os dados reais e sobre dados sintéticos maiores.
+# Os resultados são gravados em JSON para comparação entre branches.
+#
+# Uso: python -m benchmarks --help
+# ======================================================================
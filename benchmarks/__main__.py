@@ -0,0 +1,163 @@
+# ======================================================================
+
+# Execução da Suíte de Benchmarks
+# ------------------------------------------------------------------------------
+# python -m benchmarks                                 -> executa e grava o JSON
+# python -m benchmarks --conjuntos real -k api         -> apenas alguns casos
+# python -m benchmarks --comparar base.json novo.json  -> compara dois resultados
+# ======================================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from .casos import CASOS
+from .dados import preparar_dados_sinteticos
+from api import services
+from api.armazenamento import BackendCSV, DATA_FILE_PATH, DIRETORIO_COLETA
+from config.settings import PROJECT_ROOT, USINA_PADRAO
+
+PASTA_RESULTADOS = os.path.join(PROJECT_ROOT, "benchmarks", "resultados")
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def criar_contexto(nome, arquivo_csv, diretorio_coleta, n_dias=10):
+    """
+    Abre o backend do conjunto de dados, treina o modelo da API e do
+    dashboard e escolhe 'n_dias' dias espaçados ao longo do histórico.
+    """
+    import dashboard_app
+    from app import create_app
+
+    backend = BackendCSV(arquivo_principal=arquivo_csv, diretorio=diretorio_coleta)
+    with contextlib.redirect_stdout(io.StringIO()):
+        services.backend_global = backend
+        services.carregar_dados_e_treinar_modelo()
+        flask_app = create_app()
+    dashboard_app.backend_global, dashboard_app.model_global = backend, services.model_global
+
+    inicio, fim = backend.intervalo_datas(USINA_PADRAO)
+    dias = pd.date_range(inicio.normalize(), fim.normalize(), periods=n_dias).strftime('%Y-%m-%d').tolist()
+    return SimpleNamespace(nome=nome, arquivo_csv=arquivo_csv, backend=backend, usina=USINA_PADRAO,
+                           dias=dias, flask_app=flask_app, dashboard=dashboard_app,
+                           n_leituras=len(backend.ler_intervalo(USINA_PADRAO, colunas=['Dem_Ativa'])))
+
+
+def medir(funcao, repeticoes):
+    """Executa a função uma vez para aquecimento e depois 'repeticoes' vezes, medindo cada execução."""
+    tempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        if repeticoes > 1:
+            funcao()
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def executar(conjuntos, filtro=None, n_usinas=4, anos=1):
+    """Executa os casos sobre os conjuntos pedidos e retorna os resultados."""
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for conjunto in conjuntos:
+            if conjunto == 'real':
+                ctx = criar_contexto('real', DATA_FILE_PATH, DIRETORIO_COLETA)
+            else:
+                print(f"Gerando dados sintéticos ({n_usinas} usinas x {anos} ano(s))...")
+                arquivo, diretorio = preparar_dados_sinteticos(tmp, n_usinas, anos)
+                # O modelo dos dados sintéticos não é reaproveitado: fica fora do cache do projeto.
+                diretorio_modelos = services.DIRETORIO_MODELOS
+                services.DIRETORIO_MODELOS = os.path.join(tmp, 'modelos')
+                try:
+                    ctx = criar_contexto('sintetico', arquivo, diretorio)
+                finally:
+                    services.DIRETORIO_MODELOS = diretorio_modelos
+
+            print(f"\n--- Conjunto '{ctx.nome}' ({ctx.n_leituras} leituras na usina principal) ---")
+            for nome, repeticoes, preparar in CASOS:
+                if filtro and filtro not in nome:
+                    continue
+                tempos = medir(preparar(ctx), repeticoes)
+                resultado = {
+                    'conjunto': ctx.nome, 'caso': nome, 'repeticoes': repeticoes, 'n_leituras': ctx.n_leituras,
+                    'min_s': min(tempos), 'mediana_s': statistics.median(tempos), 'media_s': statistics.fmean(tempos),
+                    'desvio_s': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+                }
+                resultados.append(resultado)
+                print(f"{nome:<32}{resultado['mediana_s'] * 1000:>12.1f} ms (mín. {resultado['min_s'] * 1000:.1f} ms)")
+    return resultados
+
+
+def comparar(arquivo_base, arquivo_novo, limite):
+    """
+    Compara as medianas de dois arquivos de resultado. Retorna o número de
+    casos que ficaram mais lentos que 'limite' vezes a base.
+    """
+    with open(arquivo_base) as f:
+        base = {(r['conjunto'], r['caso']): r for r in json.load(f)['resultados']}
+    with open(arquivo_novo) as f:
+        novo = json.load(f)['resultados']
+
+    regressoes = 0
+    print(f"{'Conjunto':<12}{'Caso':<32}{'Base (ms)':>12}{'Novo (ms)':>12}{'Razão':>9}")
+    for r in novo:
+        anterior = base.get((r['conjunto'], r['caso']))
+        if anterior is None:
+            continue
+        razao = r['mediana_s'] / anterior['mediana_s']
+        marca = ''
+        if razao > limite:
+            regressoes += 1
+            marca = '  <-- REGRESSÃO'
+        print(f"{r['conjunto']:<12}{r['caso']:<32}{anterior['mediana_s'] * 1000:>12.1f}{r['mediana_s'] * 1000:>12.1f}{razao:>8.2f}x{marca}")
+    return regressoes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos.")
+    parser.add_argument('--conjuntos', nargs='+', choices=['real', 'sintetico'], default=['real', 'sintetico'])
+    parser.add_argument('-k', dest='filtro', help="Executa apenas os casos cujo nome contém este texto.")
+    parser.add_argument('--usinas', type=int, default=4, help="Usinas no conjunto sintético.")
+    parser.add_argument('--anos', type=int, default=1, help="Anos de histórico no conjunto sintético.")
+    parser.add_argument('--saida', help="Arquivo JSON de resultados (padrão: benchmarks/resultados/<commit>-<data>.json).")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NOVO'), help="Compara dois arquivos de resultados.")
+    parser.add_argument('--limite', type=float, default=1.2, help="Razão acima da qual um caso é considerado regressão.")
+    args = parser.parse_args()
+
+    if args.comparar:
+        sys.exit(1 if comparar(*args.comparar, args.limite) else 0)
+
+    resultados = executar(args.conjuntos, args.filtro, args.usinas, args.anos)
+    commit = _commit_atual()
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"{commit or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w') as f:
+        json.dump({
+            'metadados': {
+                'commit': commit, 'data': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(), 'plataforma': platform.platform(),
+                'pandas': pd.__version__, 'usinas_sinteticas': args.usinas, 'anos_sinteticos': args.anos,
+            },
+            'resultados': resultados,
+        }, f, indent=2)
+    print(f"\nResultados gravados em '{saida}'.")
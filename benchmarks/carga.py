@@ -0,0 +1,301 @@
+# ======================================================================
+
+# Teste de Carga da API e do Dashboard
+# ------------------------------------------------------------------------------
+# Sobe a API Flask (create_app) e o servidor do Dash em threads locais e
+# simula operadores concorrentes, cada um repetindo operações sorteadas:
+# - api_dados_usina: consulta de um dia aleatório em /api/dados-usina;
+# - grafico_dashboard: clique num botão do gráfico principal (callback
+#   update_dashboard_unified via POST /_dash-update-component);
+# - pagina_relatorio_ia: abertura da página /ia-report (HTML, roteamento,
+#   calendário de alarmes e relatório de um dia aleatório).
+# Para cada nível de concorrência são reportadas a latência (p50/p95/p99)
+# de cada operação, a vazão e a taxa de erros, comparadas ao SLO de p95.
+#
+# Por padrão os servidores rodam no mesmo processo que os operadores e
+# disputam o GIL com eles: serve para um teste rápido, mas as latências
+# incluem essa disputa. Para medir uma implantação real (gunicorn com N
+# workers, backend SQLite, etc.), suba a API e o dashboard à parte e
+# informe os endereços com --url-api e --url-dash.
+#
+# python -m benchmarks.carga --concorrencia 1 4 16 --duracao 30
+# python -m benchmarks.carga --url-api http://127.0.0.1:5000 --url-dash http://127.0.0.1:8050
+# ======================================================================
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from werkzeug.serving import make_server
+
+from api import services
+from config.settings import USINA_PADRAO
+
+# Peso de cada operação na mistura de tráfego (proporção dos sorteios).
+MISTURA_PADRAO = {'api_dados_usina': 6, 'grafico_dashboard': 3, 'pagina_relatorio_ia': 1}
+BOTOES_GRAFICO = ['btn-geracao', 'btn-tensao', 'btn-corrente']
+TEMPO_LIMITE_S = 60
+
+# Globais do dashboard e nível de log do werkzeug antes de cada
+# preparar_servidores, restaurados por encerrar_servidores.
+_estado_anterior = []
+
+
+def iniciar_servidor(app_wsgi, porta=0):
+    """
+    Serve a aplicação WSGI em uma thread (uma thread por requisição) e
+    retorna (servidor, url_base). Com 'porta=0' o sistema escolhe uma porta livre.
+    """
+    servidor = make_server('127.0.0.1', porta, app_wsgi, threaded=True)
+    threading.Thread(target=servidor.serve_forever, name=f'servidor-{servidor.server_port}', daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def preparar_servidores(porta_api=0, porta_dash=0):
+    """
+    Carrega os dados e o modelo (uma única vez, compartilhados pelos dois
+    servidores) e sobe a API e o dashboard. Retorna (servidores, urls, dias);
+    encerre-os com encerrar_servidores, que também restaura o estado global.
+    """
+    import dashboard_app
+    from app import create_app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        services.carregar_dados_e_treinar_modelo()
+        flask_app = create_app()
+    if services.model_global is None:
+        raise RuntimeError("Modelo de IA indisponível: não é possível executar o teste de carga.")
+    werkzeug = logging.getLogger('werkzeug')
+    _estado_anterior.append((dashboard_app.backend_global, dashboard_app.model_global, werkzeug.level))
+    dashboard_app.backend_global, dashboard_app.model_global = services.backend_global, services.model_global
+    # O registro de cada requisição pelo werkzeug dominaria a saída (e o custo) do teste.
+    werkzeug.setLevel(logging.WARNING)
+
+    servidor_api, url_api = iniciar_servidor(flask_app, porta_api)
+    servidor_dash, url_dash = iniciar_servidor(dashboard_app.app.server, porta_dash)
+    inicio, fim = services.backend_global.intervalo_datas(USINA_PADRAO)
+    dias = pd.date_range(inicio.normalize(), fim.normalize(), freq='D').strftime('%Y-%m-%d').tolist()
+    return [servidor_api, servidor_dash], {'api': url_api, 'dash': url_dash}, dias
+
+
+def encerrar_servidores(servidores):
+    """Encerra os servidores de preparar_servidores e restaura o estado que ela alterou."""
+    import dashboard_app
+
+    for servidor in servidores:
+        servidor.shutdown()
+    if _estado_anterior:
+        backend, modelo, nivel = _estado_anterior.pop()
+        dashboard_app.backend_global, dashboard_app.model_global = backend, modelo
+        logging.getLogger('werkzeug').setLevel(nivel)
+
+
+def listar_dias(url_api, usina=USINA_PADRAO):
+    """Lista os dias com leituras da usina, consultando uma API já em execução."""
+    with urllib.request.urlopen(f"{url_api}/api/resumo-diario?usina={usina}", timeout=TEMPO_LIMITE_S) as resposta:
+        dias = [linha['dia'] for linha in json.load(resposta)['dias']]
+    if not dias:
+        raise RuntimeError(f"A API em {url_api} não tem leituras da usina {usina}.")
+    return dias
+
+
+def requisitar(url, corpo=None):
+    """Executa um GET (ou POST JSON, se houver 'corpo') e retorna o status HTTP (0 em falha de conexão)."""
+    dados, cabecalhos = None, {'Accept-Encoding': 'gzip'}
+    if corpo is not None:
+        dados, cabecalhos['Content-Type'] = json.dumps(corpo).encode('utf-8'), 'application/json'
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=dados, headers=cabecalhos),
+                                    timeout=TEMPO_LIMITE_S) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as erro:
+        return erro.code
+    except OSError:
+        return 0
+
+
+def corpo_callback(saidas, entradas, disparo):
+    """
+    Monta o corpo da requisição que o navegador envia ao Dash para executar
+    um callback: 'saidas' e 'entradas' são listas de (id, propriedade[, valor])
+    e 'disparo' é o 'id.propriedade' que mudou.
+    """
+    especificacao = [{'id': id_, 'property': prop} for id_, prop in saidas]
+    if len(especificacao) == 1:
+        chave, especificacao = f"{saidas[0][0]}.{saidas[0][1]}", especificacao[0]
+    else:
+        chave = '..' + '...'.join(f"{id_}.{prop}" for id_, prop in saidas) + '..'
+    return {
+        'output': chave,
+        'outputs': especificacao,
+        'inputs': [{'id': id_, 'property': prop, 'value': valor} for id_, prop, valor in entradas],
+        'changedPropIds': [disparo],
+        'state': [],
+    }
+
+
+def api_dados_usina(urls, dias, rng):
+    return [requisitar(f"{urls['api']}/api/dados-usina?data={rng.choice(dias)}&usina={USINA_PADRAO}")]
+
+
+def grafico_dashboard(urls, dias, rng):
+    botao = rng.choice(BOTOES_GRAFICO)
+    corpo = corpo_callback(
+        [('grafico-principal', 'figure'), ('cards-resumo-container', 'children')],
+        [('seletor-data-diario', 'date', rng.choice(dias))] + [(b, 'n_clicks', 1 if b == botao else None) for b in BOTOES_GRAFICO],
+        f"{botao}.n_clicks",
+    )
+    return [requisitar(f"{urls['dash']}/_dash-update-component", corpo)]
+
+
+def pagina_relatorio_ia(urls, dias, rng):
+    # Mesma sequência de requisições do navegador ao abrir a página.
+    url_callback = f"{urls['dash']}/_dash-update-component"
+    return [
+        requisitar(f"{urls['dash']}/ia-report"),
+        requisitar(url_callback, corpo_callback([('page-content', 'children')], [('url', 'pathname', '/ia-report')],
+                                                'url.pathname')),
+        requisitar(url_callback, corpo_callback([('calendario-alarmes', 'figure')], [('url', 'pathname', '/ia-report')],
+                                                'url.pathname')),
+        requisitar(url_callback, corpo_callback([('ai-report-container', 'children')],
+                                                [('ia-seletor-data', 'date', rng.choice(dias))], 'ia-seletor-data.date')),
+    ]
+
+
+OPERACOES = {'api_dados_usina': api_dados_usina, 'grafico_dashboard': grafico_dashboard,
+             'pagina_relatorio_ia': pagina_relatorio_ia}
+
+
+def executar_carga(urls, dias, concorrencia, duracao_s, mistura=None, semente=42):
+    """
+    Executa 'concorrencia' operadores simultâneos durante 'duracao_s'
+    segundos, sem pausa entre as operações. Retorna a duração real e, para
+    cada operação, a lista de (latência em segundos, requisições, sucesso).
+    Uma operação falha se alguma de suas requisições não retornar 2xx/304.
+    """
+    mistura = mistura or MISTURA_PADRAO
+    nomes, pesos = list(mistura), list(mistura.values())
+    amostras = {nome: [] for nome in nomes}
+    lock = threading.Lock()
+    inicio = time.perf_counter()
+    limite = inicio + duracao_s
+
+    def operador(indice):
+        rng = random.Random(semente + indice)
+        while time.perf_counter() < limite:
+            nome = rng.choices(nomes, pesos)[0]
+            t0 = time.perf_counter()
+            status = OPERACOES[nome](urls, dias, rng)
+            latencia = time.perf_counter() - t0
+            with lock:
+                amostras[nome].append((latencia, len(status), all(200 <= s < 300 or s == 304 for s in status)))
+
+    threads = [threading.Thread(target=operador, args=(i,), name=f'operador-{i}') for i in range(concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio, amostras
+
+
+def resumir(duracao_s, amostras, slo_p95_ms=None):
+    """Calcula percentis de latência, vazão e taxa de erros por operação e no total."""
+    linhas = {}
+    todas = [a for lista in amostras.values() for a in lista]
+    for nome, lista in [*amostras.items(), ('total', todas)]:
+        if not lista:
+            continue
+        latencias_ms = np.array([a[0] for a in lista]) * 1000
+        p50, p95, p99 = np.percentile(latencias_ms, [50, 95, 99])
+        erros = sum(1 for a in lista if not a[2])
+        linhas[nome] = {
+            'operacoes': len(lista), 'requisicoes': sum(a[1] for a in lista), 'erros': erros,
+            'taxa_erro': erros / len(lista), 'operacoes_por_s': len(lista) / duracao_s,
+            'requisicoes_por_s': sum(a[1] for a in lista) / duracao_s,
+            'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(latencias_ms.max()),
+            'dentro_slo': None if slo_p95_ms is None else bool(p95 <= slo_p95_ms),
+        }
+    return linhas
+
+
+def imprimir_resumo(concorrencia, resumo):
+    print(f"\n--- Concorrência {concorrencia} ---")
+    print(f"{'Operação':<22}{'Ops':>7}{'Ops/s':>9}{'Req/s':>9}{'Erros':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}  SLO")
+    for nome, r in resumo.items():
+        slo = '' if r['dentro_slo'] is None else ('ok' if r['dentro_slo'] else 'VIOLADO')
+        print(f"{nome:<22}{r['operacoes']:>7}{r['operacoes_por_s']:>9.1f}{r['requisicoes_por_s']:>9.1f}"
+              f"{r['taxa_erro']:>7.1%} {r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}  {slo}")
+
+
+def _ler_mistura(texto):
+    """Converte 'api_dados_usina=6,grafico_dashboard=3' em um dicionário de pesos."""
+    mistura = {}
+    for item in texto.split(','):
+        nome, _, peso = item.partition('=')
+        if nome not in OPERACOES:
+            raise argparse.ArgumentTypeError(f"Operação desconhecida: '{nome}'. Use: {', '.join(OPERACOES)}.")
+        mistura[nome] = float(peso or 1)
+    return mistura
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teste de carga da API e do dashboard.")
+    parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 4, 16],
+                        help="Operadores simultâneos (um teste por valor).")
+    parser.add_argument('--duracao', type=float, default=30, help="Duração de cada nível de concorrência (s).")
+    parser.add_argument('--aquecimento', type=float, default=5, help="Duração do aquecimento, não medido (s).")
+    parser.add_argument('--mistura', type=_ler_mistura, default=MISTURA_PADRAO,
+                        help="Pesos das operações, ex.: 'api_dados_usina=6,grafico_dashboard=3,pagina_relatorio_ia=1'.")
+    parser.add_argument('--slo-p95-ms', type=float, default=500, help="Latência p95 máxima aceitável por operação (ms).")
+    parser.add_argument('--url-api', help="Endereço de uma API já em execução (ex.: http://127.0.0.1:5000).")
+    parser.add_argument('--url-dash', help="Endereço de um dashboard já em execução (ex.: http://127.0.0.1:8050).")
+    parser.add_argument('--saida', help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+    if bool(args.url_api) != bool(args.url_dash):
+        parser.error("--url-api e --url-dash devem ser informados juntos.")
+
+    if args.url_api:
+        servidores, urls = [], {'api': args.url_api.rstrip('/'), 'dash': args.url_dash.rstrip('/')}
+        dias = listar_dias(urls['api'])
+    else:
+        print("Carregando dados e modelo e iniciando os servidores no processo...")
+        servidores, urls, dias = preparar_servidores()
+    print(f"API em {urls['api']}, dashboard em {urls['dash']} ({len(dias)} dias de dados).")
+    resultados = []
+    try:
+        if args.aquecimento > 0:
+            executar_carga(urls, dias, max(args.concorrencia), args.aquecimento, args.mistura)
+        for concorrencia in args.concorrencia:
+            duracao, amostras = executar_carga(urls, dias, concorrencia, args.duracao, args.mistura)
+            resumo = resumir(duracao, amostras, args.slo_p95_ms)
+            imprimir_resumo(concorrencia, resumo)
+            resultados.append({'concorrencia': concorrencia, 'duracao_s': duracao, 'operacoes': resumo})
+    finally:
+        encerrar_servidores(servidores)
+
+    if args.saida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+        with open(args.saida, 'w') as f:
+            json.dump({
+                'metadados': {'data': datetime.now().isoformat(timespec='seconds'), 'mistura': args.mistura,
+                              'servidores': 'externos' if args.url_api else 'no processo', 'urls': urls,
+                              'slo_p95_ms': args.slo_p95_ms, 'duracao_s': args.duracao},
+                'resultados': resultados,
+            }, f, indent=2)
+        print(f"\nResultados gravados em '{args.saida}'.")
+    # Código de saída 1 se algum nível violou o SLO ou teve erros, para uso em CI.
+    falhou = any(not r['dentro_slo'] or r['erros'] for nivel in resultados for r in nivel['operacoes'].values())
+    sys.exit(1 if falhou else 0)
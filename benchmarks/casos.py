@@ -0,0 +1,108 @@
+# ======================================================================
+
+# Casos de Benchmark
+# ------------------------------------------------------------------------------
+# Cada caso recebe o contexto do conjunto de dados e devolve a função
+# (sem argumentos) cujo tempo de execução será medido. A preparação fica
+# fora da medição.
+# ======================================================================
+
+import gzip
+
+from api import services
+from api.armazenamento import ler_csv_compacto
+
+# Lista de (nome, repetições, função de preparação), na ordem de execução.
+CASOS = []
+
+
+def caso(nome, repeticoes=5):
+    """Registra uma função de preparação como caso de benchmark."""
+    def registrar(preparar):
+        CASOS.append((nome, repeticoes, preparar))
+        return preparar
+    return registrar
+
+
+@caso("carregar_csv", repeticoes=3)
+def carregar_csv(ctx):
+    return lambda: ler_csv_compacto(ctx.arquivo_csv)
+
+
+@caso("classificacao", repeticoes=5)
+def classificacao(ctx):
+    df = ctx.backend.ler_intervalo(ctx.usina, colunas=services.feature_columns_global)
+    return lambda: services.classificar_tensoes(df)
+
+
+@caso("treino_rf", repeticoes=1)
+def treino_rf(ctx):
+    from sklearn.ensemble import RandomForestClassifier
+
+    df = ctx.backend.ler_intervalo(ctx.usina, colunas=services.feature_columns_global)
+    df = df[services.classificar_tensoes(df) != 'Inativo']
+    y = services.classificar_tensoes(df)
+    return lambda: RandomForestClassifier(n_estimators=100, random_state=42).fit(df, y)
+
+
+@caso("obter_dados_para_api_por_dia", repeticoes=3)
+def obter_dados_para_api_por_dia(ctx):
+    def executar():
+        for dia in ctx.dias:
+            services.obter_dados_para_api(dia, ctx.usina)
+    return executar
+
+
+@caso("codificacao_json", repeticoes=5)
+def codificacao_json(ctx):
+    payloads = [services.obter_dados_para_api(dia, ctx.usina) for dia in ctx.dias]
+
+    def executar():
+        for dados in payloads:
+            gzip.compress(ctx.flask_app.json.dumps(dados).encode('utf-8'), compresslevel=6)
+    return executar
+
+
+@caso("resposta_http_sem_cache", repeticoes=3)
+def resposta_http_sem_cache(ctx):
+    from api.routes import cache_respostas
+
+    cliente = ctx.flask_app.test_client()
+
+    def executar():
+        cache_respostas.limpar()
+        for dia in ctx.dias:
+            cliente.get(f"/api/dados-usina?data={dia}&usina={ctx.usina}", headers={'Accept-Encoding': 'gzip'})
+    return executar
+
+
+@caso("update_dashboard_unified", repeticoes=3)
+def update_dashboard_unified(ctx):
+    from .carga import BOTOES_GRAFICO, corpo_callback
+
+    # O clique é enviado ao servidor do Dash como o navegador faria, por um
+    # POST em '/_dash-update-component' (ver benchmarks/carga.py).
+    cliente = ctx.dashboard.app.server.test_client()
+
+    def executar():
+        for dia in ctx.dias:
+            for botao in BOTOES_GRAFICO:
+                corpo = corpo_callback(
+                    [('grafico-principal', 'figure'), ('cards-resumo-container', 'children')],
+                    [('seletor-data-diario', 'date', dia)] + [(b, 'n_clicks', 1 if b == botao else None) for b in BOTOES_GRAFICO],
+                    f"{botao}.n_clicks",
+                )
+                resposta = cliente.post('/_dash-update-component', json=corpo)
+                if resposta.status_code != 200:
+                    raise RuntimeError(f"Callback do dashboard respondeu {resposta.status_code}.")
+    return executar
+
+
+@caso("gerar_relatorio_ia", repeticoes=3)
+def gerar_relatorio_ia(ctx):
+    dashboard = ctx.dashboard
+
+    def executar():
+        for dia in ctx.dias:
+            dashboard.gerar_relatorio_ia(dia)
+    return executar
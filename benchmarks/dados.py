@@ -0,0 +1,34 @@
+# ======================================================================
+
+# Conjuntos de Dados dos Benchmarks
+# ------------------------------------------------------------------------------
+# O conjunto "real" é o próprio 'data/data.csv'. O "sintético" é produzido
+# pelo gerador de dados sintéticos ('gerar_dados_sinteticos.py') para
+# várias usinas e anos, para medir como os caminhos críticos escalam com
+# o volume de dados.
+# ======================================================================
+
+import os
+
+import pandas as pd
+
+from gerar_dados_sinteticos import gerar_usina, gravar_csv
+
+
+def preparar_dados_sinteticos(pasta, n_usinas=4, anos=1, semente=42):
+    """
+    Grava em 'pasta' um histórico de 'anos' anos para a usina principal
+    (arquivo 'principal.csv') e para 'n_usinas - 1' usinas adicionais
+    (em 'coleta/USINA-NNN.csv'), no formato de 'data/data.csv'.
+    Retorna (arquivo_principal, diretorio_coleta).
+    """
+    inicio = pd.Timestamp('2025-01-01')
+    fim = inicio + pd.DateOffset(years=anos)
+
+    diretorio = os.path.join(pasta, 'coleta')
+    os.makedirs(diretorio, exist_ok=True)
+    arquivo_principal = os.path.join(pasta, 'principal.csv')
+    for i in range(n_usinas):
+        caminho = arquivo_principal if i == 0 else os.path.join(diretorio, f"USINA-{i:03d}.csv")
+        gravar_csv(caminho, gerar_usina(f"USINA-{i:03d}", i, inicio, fim, semente))
+    return arquivo_principal, diretorio
@@ -0,0 +1,13 @@
+# ======================================================================
+
+# Pacote do Coletor de Dados dos Inversores Sungrow
+# ------------------------------------------------------------------------------
+# Consulta periodicamente a API Sungrow de várias usinas em paralelo e
+# entrega as leituras recebidas ao módulo de ingestão da API.
+# ======================================================================
+
+from .limitador import LimitadorTaxa
+from .cliente import ClienteSungrow, ErroColeta
+from .coletor import ColetorSungrow, ResultadoColeta
+
+__all__ = ['LimitadorTaxa', 'ClienteSungrow', 'ErroColeta', 'ColetorSungrow', 'ResultadoColeta']
@@ -0,0 +1,63 @@
+# ======================================================================
+
+# Execução do Coletor pela Linha de Comando
+# ------------------------------------------------------------------------------
+# python -m coletor                      -> coleta contínua das usinas configuradas
+# python -m coletor --mock --usinas 500  -> mede a vazão contra o servidor simulado
+#
+# Executado à parte, o coletor grava no armazenamento configurado, mas a
+# API só vê as leituras novas ao reiniciar (backend CSV) ou pelo banco
+# compartilhado (backend SQLite). O detector online roda então no processo
+# do coletor, e os seus alertas aparecem no log deste. Para que a API receba
+# as leituras e os alertas imediatamente, execute o coletor dentro dela com
+# TCC_COLETOR_NA_API=1.
+# ======================================================================
+
+import argparse
+
+from .cliente import ClienteSungrow
+from .coletor import ColetorSungrow
+from .limitador import LimitadorTaxa
+from .servidor_mock import iniciar_servidor_mock
+from api.registro_eventos import configurar_logging
+from config.settings import COLETOR_MAX_WORKERS
+
+
+def medir_vazao(n_usinas, max_workers, latencia_s, ciclos):
+    """
+    Mede a vazão do coletor (usinas/segundo) contra o servidor simulado.
+    As leituras são descartadas, para que apenas a coleta seja medida.
+    """
+    servidor, url = iniciar_servidor_mock(latencia_s=latencia_s)
+    try:
+        coletor = ColetorSungrow(
+            usinas=[f"USINA-{i:04d}" for i in range(n_usinas)],
+            cliente=ClienteSungrow(url_base=url, tamanho_pool=max_workers),
+            destino=lambda usina, leituras: len(leituras),
+            max_workers=max_workers,
+            # Sem limite de taxa efetivo: cada usina é consultada uma vez por ciclo.
+            limitador=LimitadorTaxa(taxa=1000, rajada=ciclos),
+        )
+        for ciclo in range(1, ciclos + 1):
+            resultado = coletor.coletar_uma_vez()
+            print(f"Ciclo {ciclo}: {resultado.usinas_consultadas} usinas em {resultado.duracao_s:.2f}s "
+                  f"-> {resultado.usinas_por_segundo:.1f} usinas/s ({len(resultado.falhas)} falhas)")
+        coletor.cliente.fechar()
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Coletor de leituras dos inversores Sungrow.")
+    parser.add_argument('--mock', action='store_true', help="Mede a vazão contra o servidor simulado local.")
+    parser.add_argument('--usinas', type=int, default=200, help="Número de usinas simuladas (com --mock).")
+    parser.add_argument('--workers', type=int, default=COLETOR_MAX_WORKERS, help="Usinas consultadas em paralelo.")
+    parser.add_argument('--latencia', type=float, default=0.02, help="Latência simulada por requisição (s).")
+    parser.add_argument('--ciclos', type=int, default=3, help="Ciclos de coleta a medir (com --mock).")
+    args = parser.parse_args()
+
+    if args.mock:
+        medir_vazao(args.usinas, args.workers, args.latencia, args.ciclos)
+    else:
+        configurar_logging()
+        ColetorSungrow(max_workers=args.workers).executar()
@@ -0,0 +1,68 @@
+# ======================================================================
+
+# Cliente HTTP da API Sungrow
+# ------------------------------------------------------------------------------
+# Encapsula as requisições à API de monitoramento dos inversores. Uma
+# única sessão HTTP é compartilhada por todas as threads do coletor, com
+# um pool de conexões persistentes (keep-alive) e novas tentativas com
+# espera exponencial para falhas temporárias.
+# ======================================================================
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (API_KEY, URL_BASE, COLETOR_MAX_WORKERS, COLETOR_TENTATIVAS,
+                             COLETOR_BACKOFF, COLETOR_TIMEOUT)
+
+
+class ErroColeta(Exception):
+    """Falha ao obter as leituras de uma usina."""
+
+
+class ClienteSungrow:
+    """
+    Cliente da API Sungrow. As leituras de uma usina são obtidas em
+    GET {url_base}/usinas/{usina}/leituras?desde=<ISO 8601>, autenticado
+    pelo cabeçalho 'X-API-Key'. A resposta traz a lista de leituras no
+    mesmo esquema de colunas de 'data/data.csv'.
+    """
+
+    def __init__(self, url_base=URL_BASE, api_key=API_KEY, tamanho_pool=COLETOR_MAX_WORKERS,
+                 tentativas=COLETOR_TENTATIVAS, backoff=COLETOR_BACKOFF, timeout=COLETOR_TIMEOUT):
+        self.url_base = url_base.rstrip('/')
+        self.timeout = timeout
+        self.sessao = requests.Session()
+        self.sessao.headers.update({'X-API-Key': api_key, 'Accept': 'application/json'})
+
+        # Novas tentativas automáticas, com espera exponencial (backoff) e
+        # respeito ao cabeçalho 'Retry-After' enviado nas respostas 429/503.
+        retry = Retry(
+            total=tentativas,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # O pool precisa ter ao menos uma conexão por thread de coleta,
+        # senão as conexões excedentes são abertas e descartadas a cada uso.
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool, max_retries=retry)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+
+    def obter_leituras(self, usina, desde=None):
+        """Retorna a lista de leituras da usina posteriores ao instante 'desde'."""
+        params = {'desde': desde.isoformat()} if desde is not None else {}
+        try:
+            resposta = self.sessao.get(f"{self.url_base}/usinas/{usina}/leituras", params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ErroColeta(f"Usina {usina}: falha de comunicação ({e})") from e
+
+        if resposta.status_code != 200:
+            raise ErroColeta(f"Usina {usina}: resposta HTTP {resposta.status_code}")
+        return resposta.json().get('leituras', [])
+
+    def fechar(self):
+        """Fecha as conexões mantidas no pool."""
+        self.sessao.close()
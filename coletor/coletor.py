@@ -0,0 +1,110 @@
+# ======================================================================
+
+# Coletor Concorrente de Leituras
+# ------------------------------------------------------------------------------
+# Consulta várias usinas em paralelo (pool de threads), respeitando o
+# limite de requisições de cada uma, e entrega as leituras recebidas à
+# ingestão. Cada ciclo produz um resultado com a vazão em usinas/segundo.
+# ======================================================================
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .cliente import ClienteSungrow, ErroColeta
+from .limitador import LimitadorTaxa
+from config.settings import (COLETOR_USINAS, COLETOR_MAX_WORKERS, COLETOR_REQUISICOES_POR_SEGUNDO,
+                             COLETOR_RAJADA, COLETOR_INTERVALO)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResultadoColeta:
+    """Resumo de um ciclo de coleta."""
+    usinas_consultadas: int = 0
+    leituras_ingeridas: int = 0
+    duracao_s: float = 0.0
+    falhas: dict = field(default_factory=dict)
+
+    @property
+    def usinas_por_segundo(self):
+        return self.usinas_consultadas / self.duracao_s if self.duracao_s > 0 else 0.0
+
+
+class ColetorSungrow:
+    """
+    Coleta as leituras de um conjunto de usinas. O instante da última
+    leitura recebida de cada usina é guardado, de forma que cada ciclo
+    pede apenas as leituras novas. Na primeira consulta de cada usina (por
+    exemplo, após um reinício), esse instante vem de 'ultima_armazenada',
+    que recebe a usina e retorna a última leitura já armazenada (ou None).
+
+    O 'destino' recebe (usina, leituras) e, por padrão, é a função de
+    ingestão da API, com a última leitura lida do armazenamento da API.
+    """
+
+    def __init__(self, usinas=None, cliente=None, destino=None, max_workers=COLETOR_MAX_WORKERS,
+                 limitador=None, ultima_armazenada=None):
+        self.usinas = list(usinas if usinas is not None else COLETOR_USINAS)
+        self.max_workers = max_workers
+        self.cliente = cliente or ClienteSungrow(tamanho_pool=max_workers)
+        self.limitador = limitador or LimitadorTaxa(COLETOR_REQUISICOES_POR_SEGUNDO, COLETOR_RAJADA)
+        if destino is None:
+            from api.ingestao import ingerir_leituras, ultima_leitura_armazenada
+            destino = ingerir_leituras
+            ultima_armazenada = ultima_armazenada or ultima_leitura_armazenada
+        self.destino = destino
+        self.ultima_armazenada = ultima_armazenada
+        self.ultima_leitura = {}
+        self._parar = threading.Event()
+
+    def _coletar_usina(self, usina):
+        """Consulta uma usina e entrega as leituras novas ao destino."""
+        self.limitador.aguardar(usina)
+        if usina not in self.ultima_leitura and self.ultima_armazenada is not None:
+            self.ultima_leitura[usina] = self.ultima_armazenada(usina)
+        leituras = self.cliente.obter_leituras(usina, desde=self.ultima_leitura.get(usina))
+        if not leituras:
+            return 0
+        ingeridas = self.destino(usina, leituras)
+        self.ultima_leitura[usina] = max(pd.to_datetime(l['DateTime']) for l in leituras)
+        return ingeridas
+
+    def coletar_uma_vez(self):
+        """Executa um ciclo de coleta sobre todas as usinas e retorna o resumo."""
+        resultado = ResultadoColeta(usinas_consultadas=len(self.usinas))
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='coletor') as executor:
+            futuros = {executor.submit(self._coletar_usina, usina): usina for usina in self.usinas}
+            for futuro, usina in futuros.items():
+                try:
+                    resultado.leituras_ingeridas += futuro.result()
+                except ErroColeta as e:
+                    resultado.falhas[usina] = str(e)
+                except Exception as e:
+                    resultado.falhas[usina] = f"Erro inesperado: {e}"
+        resultado.duracao_s = time.perf_counter() - inicio
+        return resultado
+
+    def executar(self, intervalo=COLETOR_INTERVALO):
+        """Executa ciclos de coleta continuamente até que 'parar' seja chamado."""
+        while not self._parar.is_set():
+            resultado = self.coletar_uma_vez()
+            logger.info("%d usinas, %d leituras, %d falhas, %.1f usinas/s", resultado.usinas_consultadas,
+                        resultado.leituras_ingeridas, len(resultado.falhas), resultado.usinas_por_segundo)
+            self._parar.wait(max(0.0, intervalo - resultado.duracao_s))
+
+    def iniciar(self, intervalo=COLETOR_INTERVALO):
+        """Executa a coleta contínua em uma thread em segundo plano e a retorna."""
+        thread = threading.Thread(target=self.executar, args=(intervalo,), name='coletor-ciclos', daemon=True)
+        thread.start()
+        return thread
+
+    def parar(self):
+        """Interrompe o laço de 'executar' ao final do ciclo corrente."""
+        self._parar.set()
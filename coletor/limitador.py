@@ -0,0 +1,47 @@
+# ======================================================================
+
+# Limitador de Taxa (Token Bucket)
+# ------------------------------------------------------------------------------
+# Garante que cada usina não seja consultada mais vezes por segundo do
+# que o permitido pela API, mesmo com várias threads de coleta.
+# ======================================================================
+
+import threading
+import time
+
+
+class LimitadorTaxa:
+    """
+    Implementa o algoritmo "token bucket": cada chave (usina) possui um
+    balde com até 'rajada' fichas, reabastecido a 'taxa' fichas por segundo.
+    Cada requisição consome uma ficha; sem fichas, a thread espera.
+    """
+
+    def __init__(self, taxa, rajada=1, relogio=time.monotonic, dormir=time.sleep):
+        if taxa <= 0:
+            raise ValueError("A taxa do limitador deve ser positiva.")
+        self.taxa = float(taxa)
+        self.rajada = max(1, int(rajada))
+        self._relogio = relogio
+        self._dormir = dormir
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def _reservar(self, chave):
+        """
+        Consome uma ficha do balde da chave e retorna quanto tempo (em
+        segundos) a thread precisa esperar até que essa ficha esteja disponível.
+        """
+        with self._lock:
+            agora = self._relogio()
+            fichas, ultimo = self._baldes.get(chave, (float(self.rajada), agora))
+            fichas = min(self.rajada, fichas + (agora - ultimo) * self.taxa) - 1
+            self._baldes[chave] = (fichas, agora)
+            return 0.0 if fichas >= 0 else -fichas / self.taxa
+
+    def aguardar(self, chave):
+        """Bloqueia até que uma requisição para a chave seja permitida."""
+        espera = self._reservar(chave)
+        if espera > 0:
+            self._dormir(espera)
+        return espera
@@ -0,0 +1,119 @@
+# ======================================================================
+
+# Servidor Local que Simula a API Sungrow
+# ------------------------------------------------------------------------------
+# Substituto local da API dos inversores, usado nos testes e nas medições
+# de vazão do coletor. Gera leituras determinísticas para qualquer usina,
+# com uma curva solar simples, e pode simular latência, limites de taxa
+# (HTTP 429) e falhas temporárias (HTTP 503).
+#
+# Uso: python -m coletor.servidor_mock --porta 8060
+# ======================================================================
+
+import argparse
+import math
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+INTERVALO_LEITURA = timedelta(minutes=5)
+
+
+def gerar_leitura(usina, instante):
+    """Gera uma leitura determinística da usina para o instante informado."""
+    semente = zlib.crc32(usina.encode('utf-8'))
+    capacidade = 20 + semente % 30
+    hora = instante.hour + instante.minute / 60
+    # Curva solar aproximada: meio seno entre 6h e 18h.
+    sol = max(0.0, math.sin(math.pi * (hora - 6) / 12)) if 6 <= hora <= 18 else 0.0
+    potencia = round(capacidade * sol, 1)
+    tensao = round(220 + 8 * sol + (semente % 7) - 3, 1) if sol > 0 else 0.0
+    corrente = round(potencia * 1000 / (3 * tensao), 1) if tensao else 0.0
+    return {
+        'DateTime': instante.isoformat(sep=' '),
+        'Dem_Ativa': potencia, 'Dem_Reat': 0.0,
+        'Tensao_L1': tensao, 'Tensao_L2': tensao, 'Tensao_L3': tensao,
+        'Corrente_L1': corrente, 'Corrente_L2': corrente, 'Corrente_L3': corrente,
+        'Fat_Pot': 1.0, 'Fat_Carga': round(100 * potencia / capacidade, 1),
+    }
+
+
+def create_mock_app(latencia_s=0.0, max_leituras=12, taxa_falhas=0, limite_por_usina=None, agora=None):
+    """
+    Cria a aplicação Flask do servidor simulado.
+
+    - latencia_s: atraso artificial de cada resposta.
+    - max_leituras: número máximo de leituras devolvidas por requisição.
+    - taxa_falhas: se N > 0, uma em cada N requisições responde 503.
+    - limite_por_usina: máximo de requisições por segundo por usina (responde 429 acima disso).
+    - agora: função que retorna o instante atual (permite um relógio fixo nos testes).
+    """
+    app = Flask(__name__)
+    agora = agora or datetime.now
+    estado = {'requisicoes': 0, 'por_usina': {}}
+    lock = threading.Lock()
+
+    @app.route('/usinas/<usina>/leituras', methods=['GET'])
+    def leituras_usina(usina):
+        with lock:
+            estado['requisicoes'] += 1
+            numero = estado['requisicoes']
+            segundo = int(time.monotonic())
+            ultimo_segundo, contagem = estado['por_usina'].get(usina, (segundo, 0))
+            contagem = contagem + 1 if ultimo_segundo == segundo else 1
+            estado['por_usina'][usina] = (segundo, contagem)
+
+        if latencia_s:
+            time.sleep(latencia_s)
+        if taxa_falhas and numero % taxa_falhas == 0:
+            return jsonify({'erro': 'Serviço temporariamente indisponível'}), 503
+        if limite_por_usina and contagem > limite_por_usina:
+            return jsonify({'erro': 'Limite de requisições excedido'}), 429, {'Retry-After': '1'}
+
+        # A última leitura disponível é a do último múltiplo de 5 minutos.
+        instante_final = agora().replace(second=0, microsecond=0)
+        instante_final -= timedelta(minutes=instante_final.minute % 5)
+        desde = request.args.get('desde')
+        inicio = datetime.fromisoformat(desde) + INTERVALO_LEITURA if desde else instante_final - INTERVALO_LEITURA * (max_leituras - 1)
+        inicio = max(inicio, instante_final - INTERVALO_LEITURA * (max_leituras - 1))
+
+        leituras = []
+        instante = inicio
+        while instante <= instante_final:
+            leituras.append(gerar_leitura(usina, instante))
+            instante += INTERVALO_LEITURA
+        return jsonify({'usina': usina, 'leituras': leituras})
+
+    app.config['ESTADO_MOCK'] = estado
+    return app
+
+
+class _HandlerSilencioso(WSGIRequestHandler):
+    """Não registra cada requisição no console (o coletor faz milhares delas)."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def iniciar_servidor_mock(porta=0, **opcoes):
+    """
+    Inicia o servidor simulado em uma thread em segundo plano.
+    Retorna (servidor, url_base); use servidor.shutdown() para encerrá-lo.
+    """
+    servidor = make_server('127.0.0.1', porta, create_mock_app(**opcoes), threaded=True,
+                           request_handler=_HandlerSilencioso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API Sungrow.")
+    parser.add_argument('--porta', type=int, default=8060)
+    parser.add_argument('--latencia', type=float, default=0.0, help="Atraso artificial por resposta (s).")
+    parser.add_argument('--taxa-falhas', type=int, default=0, help="Uma em cada N requisições responde 503.")
+    args = parser.parse_args()
+    create_mock_app(latencia_s=args.latencia, taxa_falhas=args.taxa_falhas).run(host='127.0.0.1', port=args.porta)
@@ -1,3 +1,100 @@
+import os
+
 DEBUG = True
-# API_KEY = "SUA_CHAVE_API"
-# URL_BASE = "https://api.sungrow.com/endpoint"
\ No newline at end of file
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- API Sungrow ---
+# A chave e o endereço podem ser sobrescritos por variáveis de ambiente,
+# evitando que credenciais reais fiquem gravadas no repositório.
+API_KEY = os.environ.get("SUNGROW_API_KEY", "SUA_CHAVE_API")
+URL_BASE = os.environ.get("SUNGROW_URL_BASE", "https://api.sungrow.com/endpoint")
+
+# --- Coletor de dados dos inversores ---
+# Identificador da usina cujos dados são servidos pela API e pelo dashboard.
+USINA_PADRAO = "IFG"
+# Usinas consultadas pelo coletor a cada ciclo.
+COLETOR_USINAS = [USINA_PADRAO]
+# Diretório onde o coletor grava as leituras recebidas (um CSV por usina).
+DIRETORIO_COLETA = os.path.join(PROJECT_ROOT, "data", "coleta")
+# Intervalo (em segundos) entre ciclos de coleta; os inversores medem a cada 5 minutos.
+COLETOR_INTERVALO = 300
+# Número de usinas consultadas em paralelo (e de conexões HTTP mantidas no pool).
+COLETOR_MAX_WORKERS = 16
+# Limite de requisições por segundo para cada usina e rajada máxima permitida.
+COLETOR_REQUISICOES_POR_SEGUNDO = 1.0
+COLETOR_RAJADA = 2
+# Novas tentativas em falhas temporárias (erros de rede, 429 e 5xx) e fator de espera exponencial.
+COLETOR_TENTATIVAS = 3
+COLETOR_BACKOFF = 0.5
+# Tempo máximo (em segundos) de espera por uma resposta da API.
+COLETOR_TIMEOUT = 10
+# Executa o coletor dentro do processo da API (iniciado por create_app). Assim
+# as leituras coletadas chegam diretamente ao armazenamento, ao índice de
+# alarmes e ao detector online que a API consulta.
+COLETOR_NA_API = os.environ.get("TCC_COLETOR_NA_API", "0") == "1"
+
+# --- Armazenamento das leituras ---
+# 'csv': lê 'data/data.csv' (e os CSVs do coletor) para a memória, como no formato original.
+# 'sqlite': banco embutido indexado por (usina, instante), com filtros e agregações no banco.
+# O padrão continua 'csv': em um único processo (API e coletor juntos) a
+# leitura de um dia custa o mesmo nos dois backends, o arquivo original
+# segue como a fonte dos dados e nada precisa ser importado na primeira
+# execução. O 'sqlite' é indicado quando API, dashboard e coletor rodam em
+# processos separados e precisam enxergar as mesmas leituras.
+BACKEND_ARMAZENAMENTO = os.environ.get("TCC_ARMAZENAMENTO", "csv")
+ARQUIVO_SQLITE = os.path.join(PROJECT_ROOT, "data", "usinas.sqlite3")
+
+# --- Cache HTTP dos relatórios diários ---
+# Número máximo de respostas (já serializadas e comprimidas) mantidas em memória.
+CACHE_RESPOSTAS_MAX_ITENS = 256
+# Tempo (em segundos) que navegadores e proxies podem reutilizar um dia já
+# fechado sem consultar o servidor. Depois disso a resposta é revalidada pela
+# ETag (um 304 sem corpo), pois o relatório muda quando o modelo é retreinado.
+CACHE_DIA_FECHADO_MAX_AGE = 3600
+# Respostas menores que este tamanho (em bytes) não compensam ser comprimidas.
+COMPRESSAO_MIN_BYTES = 1024
+
+# --- Registro de eventos (logging) ---
+# Nível mínimo das mensagens registradas: DEBUG, INFO, WARNING, ERROR.
+LOG_NIVEL = os.environ.get("TCC_LOG_NIVEL", "INFO")
+LOG_FORMATO = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+
+# --- Perfilamento de requisições ---
+# Permite pedir o perfil de uma requisição com o cabeçalho 'X-Perfil: 1' ou
+# o parâmetro '?perfil=1'. Desligado por padrão.
+PERFIL_HABILITADO = os.environ.get("TCC_PERFIL", "0") == "1"
+# Perfila automaticamente 1 a cada N requisições (0 desativa a amostragem).
+PERFIL_AMOSTRAGEM_N = int(os.environ.get("TCC_PERFIL_AMOSTRAGEM_N", "0"))
+# Intervalo (em segundos) entre amostras da pilha da thread perfilada.
+PERFIL_INTERVALO_S = 0.005
+# Duração máxima de um perfil e número máximo de arquivos mantidos no diretório.
+PERFIL_DURACAO_MAX_S = 30
+PERFIL_MAX_ARQUIVOS = 200
+DIRETORIO_PERFIS = os.environ.get("TCC_PERFIL_DIRETORIO", os.path.join(PROJECT_ROOT, "perfis"))
+
+# --- Cache do modelo de IA ---
+# Modelos treinados são gravados aqui, identificados pela versão dos dados e
+# dos hiperparâmetros; um processo novo reaproveita o modelo em vez de treinar.
+DIRETORIO_MODELOS = os.environ.get("TCC_DIRETORIO_MODELOS", os.path.join(PROJECT_ROOT, "data", "modelos"))
+# Número de modelos mantidos no diretório (o atual e os mais recentes). O
+# anterior é preservado para processos que ainda vão carregá-lo do disco.
+MODELOS_MANTIDOS = 2
+
+# --- Detector online de anomalias ---
+# Peso de cada nova leitura nas médias móveis exponenciais (0,1 ~ últimos 50 minutos).
+DETECTOR_ALFA = 0.1
+# Leituras necessárias antes de emitir alertas de desvio, e desvio (em
+# desvios-padrão) a partir do qual uma tensão é considerada anômala.
+DETECTOR_AQUECIMENTO = 12
+DETECTOR_Z_LIMITE = 4.0
+# Desvio-padrão mínimo (V) considerado, para que oscilações pequenas após
+# períodos muito estáveis não sejam tratadas como anomalias.
+DETECTOR_DESVIO_MIN = 1.0
+# Desequilíbrio máximo entre fases (maior desvio em relação à média / média).
+DETECTOR_DESEQUILIBRIO_TENSAO = 0.03
+DETECTOR_DESEQUILIBRIO_CORRENTE = 0.20
+# Corrente média mínima (A) para avaliar o desequilíbrio de corrente.
+DETECTOR_CORRENTE_MIN = 1.0
+# Número máximo de alertas mantidos em memória por usina.
+DETECTOR_ALERTAS_MAX = 100
@@ -16,15 +16,19 @@ from dash.dependencies import Input, Output, State
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import date
+import logging
 import os
-from sklearn.ensemble import RandomForestClassifier
-import traceback
+
+from api.perfil import perfilavel
+from api.registro_eventos import configurar_logging
+from api import indice_alarmes, services
+from config.settings import USINA_PADRAO
 
 # --- 1. Configuração e Inicialização do Ambiente ---
 # ---------------------------------------------------
 # Define o caminho do arquivo de dados e as variáveis globais que
-# irão persistir durante a vida do aplicativo, como o DataFrame
-# de dados e o modelo de IA. A inicialização global evita o
+# irão persistir durante a vida do aplicativo, como o backend de
+# armazenamento dos dados e o modelo de IA. A inicialização global evita o
 # reprocessamento a cada requisição, otimizando a performance.
 
 try:
@@ -37,8 +41,12 @@ except NameError:
 
 DATA_FILE_PATH = os.path.join(PROJECT_ROOT, "data", "data.csv")
 
-# Variáveis globais para armazenar os dados e o modelo de IA.
-df_usina_global = None
+logger = logging.getLogger(__name__)
+
+# Variáveis globais para o acesso aos dados e o modelo de IA. As leituras
+# são lidas do backend de armazenamento (ver api/armazenamento.py) um dia
+# por vez, conforme a data selecionada.
+backend_global = None
 model_global = None
 feature_columns_global = ['Dem_Ativa', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']
 
@@ -99,32 +107,20 @@ def adicionar_sugestao_detalhada(row):
 
 def carregar_e_treinar():
     """
-    Função de inicialização do aplicativo. Carrega os dados do arquivo CSV,
-    realiza o pré-processamento e treina o modelo de classificação.
+    Função de inicialização do aplicativo. Abre o backend de armazenamento e
+    obtém o modelo de classificação do serviço da API (ver api/services.py),
+    que reaproveita o modelo do cache em disco quando os dados não mudaram.
     Esta função é chamada uma única vez na inicialização do servidor.
     """
-    global df_usina_global, model_global
-    print(">>> INICIANDO APLICAÇÃO: Carregando dados e treinando modelo de IA...")
-    try:
-        # Leitura e processamento inicial dos dados.
-        df = pd.read_csv(DATA_FILE_PATH, sep=',', decimal='.', parse_dates=['DateTime'])
-        df = df.set_index('DateTime')
-        for col in feature_columns_global:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        df['Classe_Tensao'] = df.apply(classificar_tensao_trifasica, axis=1)
-
-        # Treinamento do modelo RandomForestClassifier.
-        df_treino = df[df['Classe_Tensao'] != 'Inativo'].copy()
-        X, y = df_treino[feature_columns_global], df_treino['Classe_Tensao']
-        model_rf = RandomForestClassifier(n_estimators=100, random_state=42)
-        model_rf.fit(X, y)
-
-        # Atribuição dos resultados às variáveis globais.
-        model_global, df_usina_global = model_rf, df
-        print(">>> INICIALIZAÇÃO COMPLETA: Modelo pronto e dados carregados.")
-    except Exception as e:
-        print(f"ERRO FATAL ao carregar/treinar: {e}")
-        df_usina_global, model_global = pd.DataFrame(), None
+    global backend_global, model_global
+    logger.info("Iniciando aplicação: carregando dados e treinando modelo de IA...")
+    services.carregar_dados_e_treinar_modelo()
+    if services.model_global is None:
+        logger.error("Falha ao carregar/treinar: modelo de IA indisponível.")
+        backend_global, model_global = None, None
+        return
+    model_global, backend_global = services.model_global, services.backend_global
+    logger.info("Inicialização completa: modelo pronto e dados carregados.")
 
 
 # --- 3. Inicialização e Layout do Aplicativo ---
@@ -177,6 +173,8 @@ ai_report_layout = html.Div(style={'backgroundColor': light_theme['background'],
     html.Div(className="container mt-4", children=[
         html.Div(className="d-flex align-items-center justify-content-center p-4 text-white", style={'backgroundColor': light_theme['header_bg']}, children=[html.H1("Relatório de Diagnóstico com IA")]),
         html.Div(className="p-3 text-center", children=[dcc.Link(html.Button("Voltar para o Dashboard", className="btn btn-secondary", style=button_style), href="/")]),
+        # Calendário com os alarmes de todo o histórico; um clique seleciona o dia.
+        dcc.Loading(id="loading-calendario-alarmes", children=[dcc.Graph(id='calendario-alarmes', config={'displayModeBar': False})]),
         html.Div(dcc.DatePickerSingle(id='ia-seletor-data', min_date_allowed=PRIMEIRO_DIA_DADOS_CSV, max_date_allowed=ULTIMO_DIA_DADOS_CSV, date=DATA_INICIAL_VISUALIZACAO.isoformat(), display_format='DD/MM/YYYY'), style={'textAlign': 'center', 'padding': '20px'}),
         dcc.Loading(id="loading-ai-report", children=[html.Div(id='ai-report-container')])
     ])
@@ -209,13 +207,14 @@ def display_page(pathname):
      Input('btn-tensao', 'n_clicks'),
      Input('btn-corrente', 'n_clicks')]
 )
+@perfilavel('dashboard_unificado')
 def update_dashboard_unified(data_selecionada_str, btn_g, btn_t, btn_c):
     """
     Callback unificado que atualiza o gráfico principal e os cards de resumo
     com base na data selecionada e no botão de visualização clicado.
     Ele determina qual gráfico mostrar com base no contexto do callback.
     """
-    if not data_selecionada_str or df_usina_global is None:
+    if not data_selecionada_str or backend_global is None:
         raise dash.exceptions.PreventUpdate
 
     try:
@@ -223,7 +222,7 @@ def update_dashboard_unified(data_selecionada_str, btn_g, btn_t, btn_c):
         button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered and ctx.triggered[0]['value'] else 'btn-geracao'
         
         dia_para_analise = pd.to_datetime(data_selecionada_str).date()
-        df_dia = df_usina_global[df_usina_global.index.date == dia_para_analise].copy()
+        df_dia = backend_global.ler_dia(USINA_PADRAO, dia_para_analise)
 
         if df_dia.empty:
             fig_vazia = go.Figure().update_layout(title_text=f"Nenhum dado para {dia_para_analise.strftime('%d/%m/%Y')}", template="plotly_white")
@@ -252,23 +251,73 @@ def update_dashboard_unified(data_selecionada_str, btn_g, btn_t, btn_c):
         return fig, cards
 
     except Exception as e:
-        print(f"ERRO CALLBACK DASHBOARD: {e}")
+        logger.exception("Erro no callback do dashboard")
         fig_vazia = go.Figure().update_layout(title_text=f"Erro ao carregar dados: {e}", template="plotly_white")
         cards_vazios = [html.Div(html.P(f"Erro: {e}"), style=card_style, className="col-md-4")]
         return fig_vazia, cards_vazios
 
+def construir_calendario_alarmes(indice):
+    """
+    Monta o mapa de calor em formato de calendário (uma coluna por semana e
+    uma linha por dia da semana) com o número de episódios de alarme de
+    cada dia do índice histórico.
+    """
+    dias = indice.index
+    semanas = dias - pd.to_timedelta(dias.weekday, unit='D')
+    total = (indice['criticos'] + indice['precarios']).to_numpy()
+    textos = [f"{dia:%d/%m/%Y}<br>Crítica: {c} | Precária: {p}<br>Fases: {', '.join(services.FASES_POR_MASCARA[m]) or '-'}"
+              for dia, c, p, m in zip(dias, indice['criticos'], indice['precarios'], indice['mascara_fases'])]
+    grade = pd.DataFrame({'semana': semanas, 'dia_semana': dias.weekday, 'total': total,
+                          'texto': textos, 'dia': dias.strftime('%Y-%m-%d')})
+    z, texto, dia = (grade.pivot(index='dia_semana', columns='semana', values=coluna).reindex(range(7))
+                     for coluna in ['total', 'texto', 'dia'])
+    fig = go.Figure(go.Heatmap(
+        x=z.columns, y=['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom'], z=z.to_numpy(),
+        text=texto.to_numpy(), customdata=dia.to_numpy(), hoverinfo='text', xgap=3, ygap=3,
+        colorscale=[[0, '#ebedf0'], [0.5, light_theme['precarious_color']], [1, light_theme['critical_color']]],
+        colorbar={'title': 'Episódios'},
+    ))
+    fig.update_layout(title="Alarmes previstos pela IA por dia (clique para ver o relatório)", template="plotly_white",
+                      height=300, yaxis={'autorange': 'reversed'}, margin={'t': 50, 'b': 30})
+    return fig
+
+@app.callback(Output('calendario-alarmes', 'figure'), [Input('url', 'pathname')])
+def atualizar_calendario_alarmes(pathname):
+    """
+    Exibe o calendário de alarmes da usina a partir do índice histórico
+    (ver api/indice_alarmes.py), sem executar o modelo dia a dia.
+    """
+    if pathname != '/ia-report' or backend_global is None or model_global is None:
+        raise dash.exceptions.PreventUpdate
+    try:
+        indice = indice_alarmes.obter_indice(USINA_PADRAO)
+        if indice is None or indice.empty:
+            return go.Figure().update_layout(title_text="Nenhum dado para o calendário de alarmes", template="plotly_white")
+        return construir_calendario_alarmes(indice)
+    except Exception as e:
+        logger.exception("Erro no callback do calendário de alarmes")
+        return go.Figure().update_layout(title_text=f"Erro ao carregar o calendário: {e}", template="plotly_white")
+
+@app.callback(Output('ia-seletor-data', 'date'), [Input('calendario-alarmes', 'clickData')], prevent_initial_call=True)
+def selecionar_dia_do_calendario(click_data):
+    """Seleciona no relatório de IA o dia clicado no calendário de alarmes."""
+    if not click_data or not click_data['points'][0].get('customdata'):
+        raise dash.exceptions.PreventUpdate
+    return click_data['points'][0]['customdata']
+
 @app.callback(Output('ai-report-container', 'children'), [Input('ia-seletor-data', 'date')])
+@perfilavel('relatorio_ia')
 def gerar_relatorio_ia(data_selecionada_str):
     """
     Callback responsável por gerar o relatório de diagnóstico da IA.
     Ele processa os dados do dia selecionado, utiliza o modelo de IA
     treinado e renderiza os alertas visuais com sugestões.
     """
-    if not data_selecionada_str or df_usina_global is None or model_global is None:
+    if not data_selecionada_str or backend_global is None or model_global is None:
         return html.P("Selecione uma data para a análise.")
     try:
         dia_para_analise = pd.to_datetime(data_selecionada_str).date()
-        df_dia = df_usina_global[df_usina_global.index.date == dia_para_analise].copy()
+        df_dia = backend_global.ler_dia(USINA_PADRAO, dia_para_analise)
         
         if df_dia.empty:
             return html.P(f"Nenhum dado para {dia_para_analise.strftime('%d/%m/%Y')}.")
@@ -284,26 +333,28 @@ def gerar_relatorio_ia(data_selecionada_str):
         if df_risco.empty:
             return html.Div([html.H5("Sistema Estável"), html.P("Nenhuma ocorrência de risco foi prevista pela IA.")], style={'textAlign': 'center', 'padding': '20px'})
 
-        df_risco['Sugestao'] = df_risco.apply(adicionar_sugestao_detalhada, axis=1)
-        df_risco['Horario'] = df_risco.index.strftime('%H:%M:%S')
+        # Agrupa as leituras de risco consecutivas em episódios (um card por episódio).
+        episodios = services.construir_episodios(df_risco, sugestao=adicionar_sugestao_detalhada)
 
-        # Cria os blocos de alerta dinamicamente com base nos dados.
+        # Cria os blocos de alerta dinamicamente com base nos episódios.
         alarm_blocks = [
             html.Div(className="col-12 col-md-6 col-lg-4 d-flex", children=[
                 html.Div(
-                    style={**alarm_block_style, 'backgroundColor': light_theme['critical_color'] if row['Previsao_Classe_Tensao'] == 'Crítica' else light_theme['precarious_color'], 'flexGrow': 1},
+                    style={**alarm_block_style, 'backgroundColor': light_theme['critical_color'] if ep['Previsao_Classe_Tensao'] == 'Crítica' else light_theme['precarious_color'], 'flexGrow': 1},
                     children=[
-                        html.H5(f"Alerta: {row['Previsao_Classe_Tensao']} ({row['Horario']})", style={'fontWeight': 'bold'}),
-                        html.P(row['Sugestao'], style={'whiteSpace': 'pre-wrap'})
+                        html.H5(f"Alerta: {ep['Previsao_Classe_Tensao']} ({ep['Inicio']} – {ep['Fim']}, {ep['Duracao_min']} min)", style={'fontWeight': 'bold'}),
+                        html.P(f"Fases afetadas: {', '.join(ep['Fases']) or '-'}. Pior tensão: {ep['Pior_Tensao']:.1f}V "
+                               f"({ep['Fase_Pior_Tensao']} às {ep['Horario_Pior_Tensao']})."),
+                        html.P(ep['Sugestao'], style={'whiteSpace': 'pre-wrap'})
                     ]
                 )
             ])
-            for index, row in df_risco.iterrows()
+            for ep in episodios.to_dict('records')
         ]
         return html.Div(className="row justify-content-center", children=alarm_blocks)
 
     except Exception as e:
-        print(f"ERRO CALLBACK RELATORIO IA: {e}")
+        logger.exception("Erro no callback do relatório de IA")
         return html.P(f"Erro ao gerar relatório: {e}", style={'color': 'red'})
 
 
@@ -313,6 +364,7 @@ if __name__ == '__main__':
     # Inicia o aplicativo e o servidor web.
     # A função de carregamento e treinamento é chamada antes de o servidor ser
     # executado, garantindo que tudo esteja pronto.
+    configurar_logging()
     carregar_e_treinar()
     app.run(debug=True, port=8050)
 
@@ -0,0 +1,221 @@
+# ======================================================================
+
+# Gerador de Dados Sintéticos de Usinas
+# ------------------------------------------------------------------------------
+# Produz leituras realistas a cada 5 minutos, no mesmo esquema de colunas
+# de 'data/data.csv', para N usinas ao longo de Y anos. Serve para testar
+# os limites de escala dos carregadores, do armazenamento e do modelo.
+#
+# O modelo de cada usina inclui:
+# - curva solar diária com duração do dia variando ao longo do ano e
+#   nebulosidade aleatória;
+# - tensão que sobe com a potência injetada, com desequilíbrio entre fases;
+# - episódios injetados de sobretensão e subtensão (Crítica/Precária);
+# - interrupções (leituras zeradas) de algumas horas a dois dias.
+#
+# A geração é feita mês a mês e gravada em blocos, de modo que conjuntos
+# de vários GB sejam produzidos com memória constante. A mesma semente
+# produz sempre os mesmos dados.
+#
+# Uso:
+#   python gerar_dados_sinteticos.py --usinas 50 --anos 3 --saida dados_sinteticos/
+#   python gerar_dados_sinteticos.py --usinas 10 --anos 1 --destino sqlite --saida teste.sqlite3
+# ======================================================================
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.armazenamento import COLUNAS_CSV, COLUNAS_MEDICAO, BackendSQLite, normalizar_leituras
+
+INTERVALO = pd.Timedelta(minutes=5)
+LEITURAS_POR_DIA = 288
+
+# Frequência média (por mês) e duração (em minutos) dos eventos injetados.
+EPISODIOS_SOBRETENSAO_MES = 2.0
+EPISODIOS_SUBTENSAO_MES = 1.0
+INTERRUPCOES_MES = 0.5
+DURACAO_EPISODIO_MIN = (15, 180)
+DURACAO_INTERRUPCAO_MIN = (60, 48 * 60)
+
+
+def _gerador(semente, usina_idx, *extra):
+    """Gerador aleatório independente para cada usina (e bloco), derivado da semente."""
+    return np.random.default_rng([semente, usina_idx, *extra])
+
+
+def parametros_usina(semente, usina_idx):
+    """Sorteia as características fixas de uma usina."""
+    rng = _gerador(semente, usina_idx)
+    return {
+        'capacidade_kw': rng.uniform(15, 60),
+        'tensao_base_v': rng.normal(214, 3),
+        'desvio_fases_v': rng.normal(0, 1.5, size=3),
+    }
+
+
+def _sortear_eventos(rng, inicio, fim, por_mes, duracao_min, diurno):
+    """Sorteia os intervalos [início, fim) dos eventos de um tipo ao longo do período."""
+    meses = (fim - inicio) / pd.Timedelta(days=30)
+    n = rng.poisson(por_mes * meses)
+    dias = rng.integers(0, max(1, (fim - inicio).days), size=n)
+    # Episódios de tensão acontecem com o sistema gerando (entre 8h e 16h).
+    minutos = rng.integers(8 * 60, 16 * 60, size=n) if diurno else rng.integers(0, 24 * 60, size=n)
+    inicios = inicio + pd.to_timedelta(dias, unit='D') + pd.to_timedelta(minutos, unit='min')
+    duracoes = pd.to_timedelta(rng.integers(*duracao_min, size=n), unit='min')
+    return pd.DatetimeIndex(inicios), pd.DatetimeIndex(inicios + duracoes)
+
+
+def sortear_eventos_usina(semente, usina_idx, inicio, fim):
+    """
+    Agenda todos os eventos da usina para o período inteiro. O agendamento é
+    pequeno (alguns eventos por mês) e é consultado por cada bloco gerado.
+    """
+    rng = _gerador(semente, usina_idx, 1)
+    eventos = {}
+    for nome, por_mes, duracao, diurno in [
+        ('sobretensao', EPISODIOS_SOBRETENSAO_MES, DURACAO_EPISODIO_MIN, True),
+        ('subtensao', EPISODIOS_SUBTENSAO_MES, DURACAO_EPISODIO_MIN, True),
+        ('interrupcao', INTERRUPCOES_MES, DURACAO_INTERRUPCAO_MIN, False),
+    ]:
+        inicios, fins = _sortear_eventos(rng, inicio, fim, por_mes, duracao, diurno)
+        # Intensidade (V) e fases afetadas de cada episódio.
+        intensidade = rng.uniform(10, 22, size=len(inicios))
+        fases = rng.random((len(inicios), 3)) < 0.6
+        fases[np.arange(len(inicios)), rng.integers(0, 3, size=len(inicios))] = True
+        eventos[nome] = (inicios, fins, intensidade, fases)
+    return eventos
+
+
+def _mascara_eventos(indice, inicios, fins):
+    """Retorna, para cada instante, o índice do evento ativo (ou -1)."""
+    ativo = np.full(len(indice), -1)
+    for k, (ini, fim) in enumerate(zip(inicios, fins)):
+        a, b = indice.searchsorted(ini), indice.searchsorted(fim)
+        ativo[a:b] = k
+    return ativo
+
+
+def gerar_bloco(semente, usina_idx, parametros, eventos, inicio, fim, bloco_idx):
+    """Gera (de forma vetorizada) as leituras da usina no intervalo [inicio, fim)."""
+    rng = _gerador(semente, usina_idx, 2, bloco_idx)
+    indice = pd.date_range(inicio, fim, freq=INTERVALO, inclusive='left', name='DateTime')
+    n = len(indice)
+    if n == 0:
+        return pd.DataFrame(columns=COLUNAS_MEDICAO, index=indice)
+
+    # Curva solar: o dia é mais longo em dezembro (hemisfério sul).
+    dia_ano = indice.dayofyear.to_numpy()
+    duracao_dia = 12 + 1.0 * np.cos(2 * np.pi * (dia_ano - 355) / 365)
+    nascer = 12 - duracao_dia / 2
+    hora = (indice.hour + indice.minute / 60).to_numpy()
+    fase_sol = np.clip((hora - nascer) / duracao_dia, 0, 1)
+    sol = np.sin(np.pi * fase_sol) ** 1.2
+
+    # Nebulosidade: um nível por dia, com oscilações de curto prazo.
+    dias = (indice.normalize() - indice[0].normalize()).days.to_numpy()
+    nebulosidade_dia = rng.beta(2, 5, size=dias.max() + 1)[dias]
+    oscilacao = np.clip(rng.normal(0, 0.08, size=n).cumsum() * 0.1, -0.3, 0.3)
+    irradiancia = np.clip(sol * (1 - 0.8 * nebulosidade_dia + oscilacao), 0, 1)
+
+    potencia = parametros['capacidade_kw'] * irradiancia
+    ativo = potencia > 0.05
+
+    # Tensão: sobe com a injeção de potência; cada fase tem um desvio próprio.
+    tensao = (parametros['tensao_base_v'] + 12 * irradiancia)[:, None] + parametros['desvio_fases_v'][None, :]
+    tensao = tensao + rng.normal(0, 1.2, size=(n, 3))
+
+    for nome, sinal in [('sobretensao', 1), ('subtensao', -1)]:
+        inicios, fins, intensidade, fases = eventos[nome]
+        evento = _mascara_eventos(indice, inicios, fins)
+        afetados = evento >= 0
+        tensao[afetados] += sinal * intensidade[evento[afetados], None] * fases[evento[afetados]]
+
+    inicios, fins, _, _ = eventos['interrupcao']
+    ativo &= _mascara_eventos(indice, inicios, fins) < 0
+
+    potencia = np.where(ativo, potencia, 0.0)
+    tensao = np.where(ativo[:, None], tensao, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corrente = np.where(tensao > 0, potencia[:, None] * 1000 / (3 * tensao), 0.0)
+    corrente = np.clip(corrente * rng.normal(1, 0.01, size=(n, 3)), 0, None)
+
+    return pd.DataFrame({
+        'Dem_Ativa': potencia, 'Dem_Reat': 0.0,
+        'Tensao_L1': tensao[:, 0], 'Tensao_L2': tensao[:, 1], 'Tensao_L3': tensao[:, 2],
+        'Corrente_L1': corrente[:, 0], 'Corrente_L2': corrente[:, 1], 'Corrente_L3': corrente[:, 2],
+        'Fat_Pot': 1.0, 'Fat_Carga': 100 * potencia / parametros['capacidade_kw'],
+    }, index=indice).round(1)
+
+
+def gerar_usina(usina, usina_idx, inicio, fim, semente=42):
+    """Gera as leituras de uma usina mês a mês (um DataFrame por bloco)."""
+    parametros = parametros_usina(semente, usina_idx)
+    eventos = sortear_eventos_usina(semente, usina_idx, inicio, fim)
+    limites = list(pd.date_range(inicio, fim, freq='MS'))
+    limites = [inicio] + [l for l in limites if inicio < l < fim] + [fim]
+    for bloco_idx, (a, b) in enumerate(zip(limites[:-1], limites[1:])):
+        yield gerar_bloco(semente, usina_idx, parametros, eventos, a, b, bloco_idx)
+
+
+def gravar_csv(caminho, blocos):
+    """Grava os blocos em sequência num CSV no formato de 'data/data.csv'."""
+    linhas = 0
+    with open(caminho, 'w', newline='') as f:
+        for i, bloco in enumerate(blocos):
+            bloco = bloco.copy()
+            bloco.insert(0, 'Data', bloco.index.strftime('%d/%m/%Y'))
+            bloco.insert(1, 'Hora', bloco.index.strftime('%H:%M'))
+            bloco.reset_index()[COLUNAS_CSV].to_csv(f, header=(i == 0), index=False, float_format='%.1f')
+            linhas += len(bloco)
+    return linhas
+
+
+def gerar(saida, n_usinas, anos, semente=42, inicio='2025-01-01', destino='csv', prefixo='USINA'):
+    """
+    Gera o conjunto completo. Com destino 'csv', 'saida' é um diretório e
+    cada usina é gravada em '<prefixo>-NNN.csv' (o mesmo layout do diretório
+    de coleta); com destino 'sqlite', 'saida' é o arquivo do banco.
+    Retorna o número total de leituras geradas.
+    """
+    inicio = pd.Timestamp(inicio)
+    fim = inicio + pd.DateOffset(years=anos)
+    backend = BackendSQLite(saida) if destino == 'sqlite' else None
+    if backend is None:
+        os.makedirs(saida, exist_ok=True)
+
+    total = 0
+    for i in range(n_usinas):
+        usina = f"{prefixo}-{i:03d}"
+        blocos = gerar_usina(usina, i, inicio, fim, semente)
+        if backend is not None:
+            for bloco in blocos:
+                backend.inserir(usina, normalizar_leituras(bloco))
+                total += len(bloco)
+        else:
+            total += gravar_csv(os.path.join(saida, f"{usina}.csv"), blocos)
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera leituras sintéticas de usinas fotovoltaicas.")
+    parser.add_argument('--usinas', type=int, default=10)
+    parser.add_argument('--anos', type=int, default=1)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--inicio', default='2025-01-01', help="Primeiro dia gerado (AAAA-MM-DD).")
+    parser.add_argument('--destino', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--saida', default='dados_sinteticos', help="Diretório (csv) ou arquivo do banco (sqlite).")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    total = gerar(args.saida, args.usinas, args.anos, args.semente, args.inicio, args.destino)
+    duracao = time.perf_counter() - t0
+    if os.path.isdir(args.saida):
+        tamanho = sum(os.path.getsize(os.path.join(args.saida, f)) for f in os.listdir(args.saida))
+    else:
+        tamanho = os.path.getsize(args.saida)
+    print(f"{total} leituras ({tamanho / 1024 ** 2:.1f} MB) geradas em {duracao:.1f}s "
+          f"({total / duracao:,.0f} leituras/s) em '{args.saida}'.")
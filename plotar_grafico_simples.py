@@ -1,6 +1,10 @@
+import argparse
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import plotly.express as px
-import os
 
 # --- PASSO 1: CONFIGURAÇÃO DE CAMINHOS ---
 # O script espera que o ficheiro CSV esteja numa subpasta chamada 'data'.
@@ -12,100 +16,188 @@ except NameError:
 
 # ATENÇÃO: Verifique se o nome do seu novo CSV é realmente "dados.csv"
 caminho_do_csv = os.path.join(BASE_DIR, "data", "data.csv")
-print(f"A tentar ler o ficheiro em: {caminho_do_csv}")
 
-# --- PASSO 2: LEITURA E VALIDAÇÃO DO FICHEIRO CSV ---
-try:
-    df = pd.read_csv(
-        caminho_do_csv,
-        sep=',',
-        # IMPORTANTE: Se o seu CSV usa vírgula como decimal (ex: 220,5), mude para decimal=','
-        decimal='.', 
-        parse_dates=['DateTime'],
-        index_col='DateTime'
-    )
-    print("Ficheiro CSV lido com sucesso.")
-except FileNotFoundError:
-    print(f"\nERRO CRÍTICO: O ficheiro não foi encontrado. Verifique o caminho: '{caminho_do_csv}'")
-    exit()
-except Exception as e:
-    print(f"\nERRO CRÍTICO ao ler o ficheiro CSV: {e}")
-    exit()
-
-# --- PASSO 3: LIMPEZA DOS DADOS (VERSÃO ATUALIZADA) ---
 # Lista de todas as colunas que devem ser numéricas
 cols_numericas = [
-    'Dem_Ativa', 'Dem_Reat', 
+    'Dem_Ativa', 'Dem_Reat',
     'Tensao_L1', 'Tensao_L2', 'Tensao_L3',
     'Corrente_L1', 'Corrente_L2', 'Corrente_L3',
     'Fat_Pot', 'Fat_Carga'
 ]
 
-# Itera sobre a lista e converte cada coluna, tratando erros
-for col in cols_numericas:
-    # Verifica se a coluna existe antes de tentar converter
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    else:
-        print(f"AVISO: A coluna '{col}' não foi encontrada no seu CSV.")
-
-df.fillna(0, inplace=True)
-print("Limpeza e conversão de dados concluída.")
+# Colunas usadas pelos três gráficos; são as únicas lidas no modo em lote.
+cols_graficos = ['Dem_Ativa', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3']
 
-# --- PASSO 4: LOOP INTERATIVO PARA SELECIONAR O DIA ---
-while True:
-    print("\n------------------------------------------------------------")
-    data_min = df.index.date.min().strftime('%Y-%m-%d')
-    data_max = df.index.date.max().strftime('%Y-%m-%d')
-    print(f"As datas disponíveis vão de {data_min} a {data_max}.")
 
-    data_selecionada_str = input("Digite a data que você quer ver (formato AAAA-MM-DD) ou 'sair' para fechar: ")
+# --- PASSO 2: LEITURA E VALIDAÇÃO DO FICHEIRO CSV ---
+def carregar_csv(caminho):
+    """Lê o ficheiro CSV e converte as colunas numéricas (modo interativo)."""
+    print(f"A tentar ler o ficheiro em: {caminho}")
+    try:
+        df = pd.read_csv(
+            caminho,
+            sep=',',
+            # IMPORTANTE: Se o seu CSV usa vírgula como decimal (ex: 220,5), mude para decimal=','
+            decimal='.',
+            parse_dates=['DateTime'],
+            index_col='DateTime'
+        )
+        print("Ficheiro CSV lido com sucesso.")
+    except FileNotFoundError:
+        print(f"\nERRO CRÍTICO: O ficheiro não foi encontrado. Verifique o caminho: '{caminho}'")
+        exit()
+    except Exception as e:
+        print(f"\nERRO CRÍTICO ao ler o ficheiro CSV: {e}")
+        exit()
+
+    # --- PASSO 3: LIMPEZA DOS DADOS (VERSÃO ATUALIZADA) ---
+    # Itera sobre a lista e converte cada coluna, tratando erros
+    for col in cols_numericas:
+        # Verifica se a coluna existe antes de tentar converter
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            print(f"AVISO: A coluna '{col}' não foi encontrada no seu CSV.")
+
+    df.fillna(0, inplace=True)
+    print("Limpeza e conversão de dados concluída.")
+    return df.sort_index()
+
+
+def gerar_figuras(df_dia, data_str):
+    """Cria os gráficos de geração, tensão e corrente de um dia."""
+    # Gráfico de Geração Ativa (Sem alterações)
+    fig_geracao = px.area(
+        df_dia,
+        x=df_dia.index,
+        y="Dem_Ativa",
+        title=f"Geração de Energia Ativa para o dia {data_str}",
+        labels={"index": "Hora do Dia", "Dem_Ativa": "Geração Ativa (kW)"}
+    )
 
-    if data_selecionada_str.lower() == 'sair':
-        print("A encerrar o programa.")
-        break
+    # Gráfico de Tensão (ATUALIZADO PARA 3 FASES)
+    fig_tensao = px.line(
+        df_dia,
+        x=df_dia.index,
+        y=["Tensao_L1", "Tensao_L2", "Tensao_L3"], # Plota as 3 fases
+        title=f"Tensão CA por Fase para o dia {data_str}",
+        labels={"index": "Hora do Dia", "value": "Tensão (V)", "variable": "Fase"}
+    )
 
-    try:
-        data_selecionada = pd.to_datetime(data_selecionada_str).date()
-        df_dia = df[df.index.date == data_selecionada].copy()
-
-        if not df_dia.empty:
-            print(f"\nA mostrar gráficos para o dia {data_selecionada_str}...")
-
-            # Gráfico de Geração Ativa (Sem alterações)
-            fig_geracao = px.area(
-                df_dia,
-                x=df_dia.index,
-                y="Dem_Ativa",
-                title=f"Geração de Energia Ativa para o dia {data_selecionada_str}",
-                labels={"index": "Hora do Dia", "Dem_Ativa": "Geração Ativa (kW)"}
-            )
-            fig_geracao.show()
-
-            # Gráfico de Tensão (ATUALIZADO PARA 3 FASES)
-            fig_tensao = px.line(
-                df_dia,
-                x=df_dia.index,
-                y=["Tensao_L1", "Tensao_L2", "Tensao_L3"], # Plota as 3 fases
-                title=f"Tensão CA por Fase para o dia {data_selecionada_str}",
-                labels={"index": "Hora do Dia", "value": "Tensão (V)", "variable": "Fase"}
-            )
-            fig_tensao.show()
-
-            # NOVO GRÁFICO DE CORRENTE (ADICIONADO)
-            fig_corrente = px.line(
-                df_dia,
-                x=df_dia.index,
-                y=["Corrente_L1", "Corrente_L2", "Corrente_L3"], # Plota as 3 fases
-                title=f"Corrente CA por Fase para o dia {data_selecionada_str}",
-                labels={"index": "Hora do Dia", "value": "Corrente (A)", "variable": "Fase"}
-            )
-            fig_corrente.show()
+    # NOVO GRÁFICO DE CORRENTE (ADICIONADO)
+    fig_corrente = px.line(
+        df_dia,
+        x=df_dia.index,
+        y=["Corrente_L1", "Corrente_L2", "Corrente_L3"], # Plota as 3 fases
+        title=f"Corrente CA por Fase para o dia {data_str}",
+        labels={"index": "Hora do Dia", "value": "Corrente (A)", "variable": "Fase"}
+    )
+    return {"geracao": fig_geracao, "tensao": fig_tensao, "corrente": fig_corrente}
 
-        else:
-            print(f"AVISO: Nenhum dado foi encontrado para o dia {data_selecionada_str}. Por favor, tente outra data.")
 
-    except ValueError:
-        print(f"ERRO: '{data_selecionada_str}' não é uma data válida. Por favor, use o formato AAAA-MM-DD.")
-    except Exception as e:
-        print(f"Ocorreu um erro inesperado ao gerar os gráficos: {e}")
+# --- PASSO 4: LOOP INTERATIVO PARA SELECIONAR O DIA ---
+def modo_interativo(df):
+    """Pergunta uma data ao utilizador e abre os três gráficos no navegador."""
+    while True:
+        print("\n------------------------------------------------------------")
+        data_min = df.index.min().strftime('%Y-%m-%d')
+        data_max = df.index.max().strftime('%Y-%m-%d')
+        print(f"As datas disponíveis vão de {data_min} a {data_max}.")
+
+        data_selecionada_str = input("Digite a data que você quer ver (formato AAAA-MM-DD) ou 'sair' para fechar: ")
+
+        if data_selecionada_str.lower() == 'sair':
+            print("A encerrar o programa.")
+            break
+
+        try:
+            data_selecionada = pd.to_datetime(data_selecionada_str).date()
+            # Recorte pelo índice ordenado, sem comparar todas as datas do histórico.
+            df_dia = df.loc[data_selecionada.isoformat():data_selecionada.isoformat()]
+
+            if not df_dia.empty:
+                print(f"\nA mostrar gráficos para o dia {data_selecionada_str}...")
+                for fig in gerar_figuras(df_dia, data_selecionada_str).values():
+                    fig.show()
+            else:
+                print(f"AVISO: Nenhum dado foi encontrado para o dia {data_selecionada_str}. Por favor, tente outra data.")
+
+        except ValueError:
+            print(f"ERRO: '{data_selecionada_str}' não é uma data válida. Por favor, use o formato AAAA-MM-DD.")
+        except Exception as e:
+            print(f"Ocorreu um erro inesperado ao gerar os gráficos: {e}")
+
+
+# --- PASSO 5: EXPORTAÇÃO EM LOTE ---
+def exportar_dia(usina, data_str, df_dia, pasta_saida, formatos):
+    """
+    Gera e grava os três gráficos de um dia. Executada nos processos do
+    pool; retorna a lista de ficheiros criados.
+    """
+    pasta = os.path.join(pasta_saida, usina)
+    os.makedirs(pasta, exist_ok=True)
+    ficheiros = []
+    for nome, fig in gerar_figuras(df_dia, data_str).items():
+        base = os.path.join(pasta, f"{data_str}_{nome}")
+        if 'html' in formatos:
+            # O plotly.js é carregado da CDN, em vez de ser embutido (~3 MB) em cada ficheiro.
+            fig.write_html(f"{base}.html", include_plotlyjs='cdn')
+            ficheiros.append(f"{base}.html")
+        if 'png' in formatos:
+            # Requer o pacote 'kaleido' (verificado antes de iniciar o lote).
+            fig.write_image(f"{base}.png")
+            ficheiros.append(f"{base}.png")
+    return ficheiros
+
+
+def exportar_lote(inicio, fim, usinas, pasta_saida, formatos=('html',), processos=None):
+    """
+    Gera os gráficos de todos os dias do intervalo [inicio, fim] para cada
+    usina. As leituras de cada usina são lidas uma única vez e separadas por
+    dia num só agrupamento; os dias são renderizados em paralelo.
+    """
+    from api.armazenamento import criar_backend
+
+    backend = criar_backend()
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim) + pd.Timedelta(days=1)
+    total = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = []
+        for usina in usinas:
+            df = backend.ler_intervalo(usina, inicio, fim, colunas=cols_graficos)
+            if df.empty:
+                print(f"AVISO: Nenhum dado para a usina {usina} no intervalo pedido.")
+                continue
+            for dia, df_dia in df.groupby(df.index.normalize()):
+                futuros.append(executor.submit(exportar_dia, usina, dia.strftime('%Y-%m-%d'), df_dia, pasta_saida, formatos))
+
+        for futuro in as_completed(futuros):
+            try:
+                total += len(futuro.result())
+            except Exception as e:
+                print(f"ERRO ao exportar gráficos: {e}")
+    print(f"{total} gráficos gravados em '{pasta_saida}' ({len(futuros)} dias).")
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gráficos diários de geração, tensão e corrente.")
+    parser.add_argument('--lote', action='store_true', help="Exporta os gráficos de um intervalo de datas, sem interação.")
+    parser.add_argument('--inicio', help="Primeiro dia do intervalo (AAAA-MM-DD).")
+    parser.add_argument('--fim', help="Último dia do intervalo (AAAA-MM-DD).")
+    parser.add_argument('--usinas', nargs='+', help="Usinas a exportar (padrão: a usina configurada).")
+    parser.add_argument('--saida', default=os.path.join(BASE_DIR, "graficos"), help="Pasta de destino dos ficheiros.")
+    parser.add_argument('--formato', nargs='+', choices=['html', 'png'], default=['html'])
+    parser.add_argument('--processos', type=int, default=None, help="Número de processos (padrão: número de CPUs).")
+    args = parser.parse_args()
+
+    if args.lote:
+        from config.settings import USINA_PADRAO
+        if not args.inicio or not args.fim:
+            parser.error("--lote requer --inicio e --fim.")
+        # Sem o kaleido, cada dia falharia dentro do pool com um erro pouco claro.
+        if 'png' in args.formato and importlib.util.find_spec('kaleido') is None:
+            parser.error("--formato png requer o pacote 'kaleido' (pip install kaleido).")
+        exportar_lote(args.inicio, args.fim, args.usinas or [USINA_PADRAO], args.saida, args.formato, args.processos)
+    else:
+        modo_interativo(carregar_csv(caminho_do_csv))
@@ -0,0 +1,69 @@
+# ======================================================================
+
+# Relatório de Uso de Memória do Conjunto de Dados
+# ------------------------------------------------------------------------------
+# Compara quantos bytes cada leitura ocupa em memória no layout original
+# (float64, colunas 'Data'/'Hora' em texto e 'Classe_Tensao' como strings
+# Python) e no layout compacto usado pelo
+# backend de armazenamento (float32, sem colunas de texto redundantes e
+# classe de tensão categórica com códigos int8).
+#
+# Uso: python relatorio_memoria.py [--arquivo data/data.csv]
+# ======================================================================
+
+import argparse
+
+import pandas as pd
+
+from api.armazenamento import DATA_FILE_PATH, ler_csv_compacto
+from api.services import classificar_tensao_trifasica, classificar_tensoes
+
+
+def _bytes(df):
+    """Memória total ocupada por um DataFrame, incluindo índice e objetos Python."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def medir_layout_original(caminho):
+    """Reproduz o carregamento original e retorna os bytes ocupados."""
+    df = pd.read_csv(caminho, sep=',', decimal='.', parse_dates=['DateTime'])
+    df = df.set_index('DateTime')
+    numeric_cols = ['Dem_Ativa', 'Corrente_L1', 'Corrente_L2', 'Corrente_L3', 'Tensao_L1', 'Tensao_L2', 'Tensao_L3']
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df['Classe_Tensao'] = df.apply(classificar_tensao_trifasica, axis=1).astype(object)
+    # O carregador original guardava uma cópia deste DataFrame na variável
+    # global e descartava o original: apenas um DataFrame permanecia em memória.
+    return len(df), _bytes(df)
+
+
+def medir_layout_compacto(caminho):
+    """Carrega os dados no layout compacto e retorna os bytes ocupados."""
+    df = ler_csv_compacto(caminho)
+    df['Classe_Tensao'] = classificar_tensoes(df)
+    return len(df), _bytes(df)
+
+
+def _formatar(n_bytes):
+    for unidade in ['B', 'KB', 'MB', 'GB']:
+        if n_bytes < 1024 or unidade == 'GB':
+            return f"{n_bytes:.1f} {unidade}"
+        n_bytes /= 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compara o uso de memória dos layouts de dados.")
+    parser.add_argument('--arquivo', default=DATA_FILE_PATH, help="CSV no formato de 'data/data.csv'.")
+    args = parser.parse_args()
+
+    linhas, antes = medir_layout_original(args.arquivo)
+    _, depois = medir_layout_compacto(args.arquivo)
+
+    # Leituras por GB: uma usina gera 288 leituras por dia (uma a cada 5 minutos).
+    leituras_ano = 288 * 365
+    print(f"\n--- Relatório de Memória ({linhas} leituras de '{args.arquivo}') ---\n")
+    print(f"{'Layout':<12}{'Total':>12}{'Bytes/leitura':>16}{'Usina-anos/GB':>16}")
+    for nome, total in [('Original', antes), ('Compacto', depois)]:
+        por_leitura = total / linhas
+        print(f"{nome:<12}{_formatar(total):>12}{por_leitura:>16.1f}{(1024 ** 3 / por_leitura) / leituras_ano:>16.1f}")
+    print(f"\nRedução: {antes / depois:.1f}x menos memória por leitura.")
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from analise_energia import (avaliar_com_validacao_cruzada, carregar_e_preparar_dados, classificar_tensao_trifasica,
+                             classificar_tensoes, gravar_relatorio_avaliacao)
+
+CAMINHO_DADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'data.csv')
+
+
+class TestAvaliacaoModelo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        df = carregar_e_preparar_dados(CAMINHO_DADOS)
+        # As duas últimas semanas de leituras bastam para exercitar a validação cruzada.
+        cls.df = df.loc[df.index[-1] - pd.Timedelta(days=14):]
+
+    def test_classificacao_vetorizada_igual_a_por_linha(self):
+        esperado = self.df.apply(classificar_tensao_trifasica, axis=1)
+        self.assertTrue(classificar_tensoes(self.df).equals(esperado))
+
+    def test_avaliacao_paralela_usa_cache_e_grava_relatorios(self):
+        grade = {'n_estimators': [5, 10], 'max_depth': [None]}
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, 'cache')
+            relatorio = avaliar_com_validacao_cruzada(self.df, grade, k=2, n_jobs=2, diretorio_cache=cache)
+            self.assertEqual(relatorio['metadados']['dobras_treinadas'], 4)
+            self.assertEqual(len(os.listdir(cache)), 4)
+            self.assertEqual(len(relatorio['resultados']), 2)
+            melhor = relatorio['resultados'][0]
+            self.assertGreater(melhor['f1_macro_media'], 0)
+            self.assertGreater(melhor['tamanho_modelo_mb'], 0)
+            self.assertGreaterEqual(melhor['f1_macro_media'], relatorio['resultados'][1]['f1_macro_media'])
+
+            # Mesmos dados, dobras e hiperparâmetros: tudo vem do cache, com os mesmos resultados.
+            repetido = avaliar_com_validacao_cruzada(self.df, grade, k=2, n_jobs=2, diretorio_cache=cache)
+            self.assertEqual(repetido['metadados']['dobras_treinadas'], 0)
+            self.assertEqual(repetido['resultados'][0]['dobras_em_cache'], 2)
+            self.assertEqual(repetido['resultados'][0]['f1_macro_media'], melhor['f1_macro_media'])
+
+            # Outra versão do scikit-learn não reaproveita as métricas guardadas.
+            atualizado = {'scikit-learn': '99.0', 'joblib': relatorio['metadados']['bibliotecas']['joblib']}
+            with mock.patch('analise_energia.versoes_bibliotecas', return_value=atualizado):
+                retreinado = avaliar_com_validacao_cruzada(self.df, grade, k=2, n_jobs=1, diretorio_cache=cache)
+            self.assertEqual(retreinado['metadados']['dobras_treinadas'], 4)
+
+            with open(gravar_relatorio_avaliacao(relatorio, os.path.join(tmp, 'avaliacao.json'))) as f:
+                self.assertEqual(json.load(f)['metadados']['combinacoes'], 2)
+            with open(gravar_relatorio_avaliacao(relatorio, os.path.join(tmp, 'avaliacao.md'))) as f:
+                self.assertIn('| n_estimators=10, max_depth=None |', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
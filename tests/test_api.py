@@ -1,15 +1,159 @@
+import gzip
+import json
+import tempfile
 import unittest
-from app import app
+from datetime import timedelta
+from unittest import mock
+
+from app import create_app
+from api import routes, services
+from api.armazenamento import BackendCSV, normalizar_leituras
+from api.routes import cache_respostas
+
+app = create_app()
 
 class TestAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Carrega os dados e treina o modelo uma única vez para todos os testes.
+        if services.model_global is None:
+            services.carregar_dados_e_treinar_modelo()
+
     def setUp(self):
         self.client = app.test_client()
         app.testing = True
+        cache_respostas.limpar()
 
     def test_obter_dados(self):
         # Testa a rota passando um parâmetro via query string
         response = self.client.get("/api/dados-usina?usina=Teste")
         self.assertEqual(response.status_code, 200)
 
+    def test_dia_fechado_tem_etag_e_cache_com_revalidacao(self):
+        response = self.client.get("/api/dados-usina?data=2025-03-10")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers.get("ETag"))
+        self.assertEqual(response.cache_control.max_age, 3600)
+        self.assertTrue(response.cache_control.must_revalidate)
+        self.assertNotIn("immutable", response.headers["Cache-Control"])
+        self.assertIsNotNone(response.headers.get("Last-Modified"))
+
+    def test_dia_sem_leituras_nao_e_fechado(self):
+        # Anterior ao início dos dados: ainda pode receber leituras importadas.
+        response = self.client.get("/api/dados-usina?data=2024-12-01")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+    def test_modelo_retreinado_invalida_if_modified_since(self):
+        primeira = self.client.get("/api/dados-usina?data=2025-03-10")
+        ultima = primeira.last_modified
+        repetida = self.client.get("/api/dados-usina?data=2025-03-10",
+                                   headers={"If-Modified-Since": primeira.headers["Last-Modified"]})
+        self.assertEqual(repetida.status_code, 304)
+        with mock.patch.object(services, "modelo_treinado_em", ultima + timedelta(hours=1)):
+            retreinado = self.client.get("/api/dados-usina?data=2025-03-10",
+                                         headers={"If-Modified-Since": primeira.headers["Last-Modified"]})
+        self.assertEqual(retreinado.status_code, 200)
+        self.assertGreater(retreinado.last_modified, ultima)
+
+    def test_ultimo_dia_precisa_revalidar(self):
+        response = self.client.get("/api/dados-usina?data=2025-05-20")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+    def test_if_none_match_retorna_304(self):
+        primeira = self.client.get("/api/dados-usina?data=2025-03-10")
+        etag = primeira.headers["ETag"]
+        segunda = self.client.get("/api/dados-usina?data=2025-03-10", headers={"If-None-Match": etag})
+        self.assertEqual(segunda.status_code, 304)
+        self.assertEqual(segunda.data, b"")
+        self.assertEqual(segunda.headers["ETag"], etag)
+
+    def test_etag_por_codificacao_e_comparacao_fraca(self):
+        identidade = self.client.get("/api/dados-usina?data=2025-03-10")
+        comprimida = self.client.get("/api/dados-usina?data=2025-03-10", headers={"Accept-Encoding": "gzip"})
+        etag = identidade.headers["ETag"]
+        self.assertEqual(comprimida.headers["ETag"], etag[:-1] + '-gzip"')
+        # Qualquer variante da mesma versão, forte ou fraca, evita o reenvio do corpo.
+        for cabecalho in (comprimida.headers["ETag"], "W/" + etag):
+            with self.subTest(if_none_match=cabecalho):
+                repetida = self.client.get("/api/dados-usina?data=2025-03-10", headers={"If-None-Match": cabecalho})
+                self.assertEqual(repetida.status_code, 304)
+
+    def test_leituras_de_outro_dia_nao_mudam_a_etag_de_dia_fechado(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = BackendCSV(diretorio=tmp)
+            with mock.patch.object(services, "backend_global", backend):
+                antes = self.client.get("/api/dados-usina?data=2025-03-10")
+                aberto_antes = self.client.get("/api/dados-usina")
+                acertos = cache_respostas.acertos
+                ultimo = backend.intervalo_datas("IFG")[1]
+                backend.inserir("IFG", normalizar_leituras([{"DateTime": ultimo - timedelta(hours=1), "Tensao_L1": 221.0}]))
+                depois = self.client.get("/api/dados-usina?data=2025-03-10")
+                aberto_depois = self.client.get("/api/dados-usina")
+        self.assertEqual(depois.headers["ETag"], antes.headers["ETag"])
+        self.assertEqual(cache_respostas.acertos, acertos + 1)
+        # O dia corrente, que recebeu a leitura, muda de versão.
+        self.assertNotEqual(aberto_depois.headers["ETag"], aberto_antes.headers["ETag"])
+
+    def test_revalidacao_nao_le_as_medicoes_do_dia(self):
+        etag = self.client.get("/api/dados-usina?data=2025-03-10").headers["ETag"]
+        backend = services.backend_global
+        with mock.patch.object(backend, "ler_intervalo", wraps=backend.ler_intervalo) as ler_intervalo:
+            repetida = self.client.get("/api/dados-usina?data=2025-03-10", headers={"If-None-Match": etag})
+        self.assertEqual(repetida.status_code, 304)
+        self.assertTrue(repetida.cache_control.max_age)
+        ler_intervalo.assert_not_called()
+
+    def test_resposta_comprimida_com_gzip(self):
+        response = self.client.get("/api/dados-usina?data=2025-03-10", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        dados = json.loads(gzip.decompress(response.data))
+        self.assertIn("leituras_dia_selecionado", dados)
+
+    def test_requisicao_repetida_usa_cache(self):
+        self.client.get("/api/dados-usina?data=2025-03-10", headers={"Accept-Encoding": "gzip"})
+        acertos = cache_respostas.acertos
+        self.client.get("/api/dados-usina?data=2025-03-10", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(cache_respostas.acertos, acertos + 1)
+
+    def test_taxa_de_acerto_conta_uma_consulta_por_requisicao(self):
+        # Corpo abaixo do limite de compressão: servido sempre sem compressão.
+        with mock.patch.object(routes, "COMPRESSAO_MIN_BYTES", 10 ** 9):
+            for _ in range(4):
+                response = self.client.get("/api/dados-usina?data=2025-03-10", headers={"Accept-Encoding": "gzip"})
+                self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual((cache_respostas.acertos, cache_respostas.falhas), (3, 1))
+        texto = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn("tcc_cache_respostas_taxa_acerto 0.75", texto)
+
+    def test_relatorio_por_episodio_ou_por_leitura(self):
+        episodios = self.client.get("/api/dados-usina?data=2025-03-10")
+        leituras = self.client.get("/api/dados-usina?data=2025-03-10&relatorio=leituras")
+        self.assertNotEqual(episodios.headers["ETag"], leituras.headers["ETag"])
+        relatorio_episodios = episodios.get_json()["relatorio_ia"]
+        relatorio_leituras = leituras.get_json()["relatorio_ia"]
+        self.assertIn("Duracao_min", relatorio_episodios[0])
+        self.assertIn("Horario", relatorio_leituras[0])
+        self.assertEqual(sum(ep["N_Leituras"] for ep in relatorio_episodios), len(relatorio_leituras))
+        invalido = self.client.get("/api/dados-usina?data=2025-03-10&relatorio=xyz")
+        self.assertEqual(invalido.status_code, 400)
+
+    def test_metricas_no_formato_prometheus(self):
+        self.client.get("/api/dados-usina?data=2025-03-10")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        texto = response.get_data(as_text=True)
+        self.assertIn('tcc_http_requisicao_duracao_segundos_bucket{endpoint="main_bp.endpoint_dados_usina",metodo="GET",le="+Inf"}', texto)
+        self.assertIn('tcc_etapa_duracao_segundos_count{etapa="prever"}', texto)
+        self.assertIn("tcc_cache_respostas_taxa_acerto", texto)
+        self.assertIn(f'tcc_modelo_info{{versao="{services.versao_modelo_global}"}} 1.0', texto)
+        self.assertIn('tcc_etapa_duracao_segundos_count{etapa="serializar_relatorio"}', texto)
+
+    def test_metricas_registram_excecao_nao_tratada(self):
+        with mock.patch("api.routes.obter_dados_para_api", side_effect=RuntimeError("falha simulada")):
+            with self.assertRaises(RuntimeError):
+                self.client.get("/api/dados-usina?data=2025-03-11")
+        texto = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('tcc_http_requisicoes_total{endpoint="main_bp.endpoint_dados_usina",status="500"}', texto)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,102 @@
+import itertools
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+
+from api.armazenamento import (BackendArmazenamento, BackendCSV, BackendSQLite, COLUNAS_CSV, DATA_FILE_PATH,
+                               normalizar_leituras, ler_csv_compacto)
+from api.services import classificar_tensao_trifasica, classificar_tensoes
+
+class TestArmazenamento(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.csv = BackendCSV(diretorio=os.path.join(cls.tmp.name, 'coleta'))
+        cls.sqlite = BackendSQLite(os.path.join(cls.tmp.name, 'usinas.sqlite3'))
+        cls.sqlite.importar_csv(DATA_FILE_PATH, 'IFG')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_backends_retornam_o_mesmo_dia(self):
+        dia_csv = self.csv.ler_dia('IFG', date(2025, 3, 10))
+        dia_sqlite = self.sqlite.ler_dia('IFG', date(2025, 3, 10))
+        self.assertEqual(len(dia_csv), 288)
+        pd.testing.assert_frame_equal(dia_csv, dia_sqlite, check_dtype=False, check_index_type=False)
+
+    def test_agregacao_diaria_no_banco(self):
+        resumo_csv = self.csv.agregar_diario('IFG', pd.Timestamp('2025-03-01'), pd.Timestamp('2025-03-08'))
+        resumo_sqlite = self.sqlite.agregar_diario('IFG', pd.Timestamp('2025-03-01'), pd.Timestamp('2025-03-08'))
+        self.assertEqual(len(resumo_sqlite), 7)
+        pd.testing.assert_frame_equal(resumo_csv, resumo_sqlite, check_dtype=False, check_index_type=False)
+
+    def test_insercao_atualiza_versao_e_intervalo(self):
+        versao_antes, _ = self.sqlite.obter_versao()
+        novas = normalizar_leituras([{'DateTime': '2030-01-01 12:00:00', 'Tensao_L1': 220.0}])
+        self.sqlite.inserir('NOVA', novas)
+        self.assertNotEqual(self.sqlite.obter_versao()[0], versao_antes)
+        self.assertIn('NOVA', self.sqlite.usinas())
+        self.assertEqual(self.sqlite.intervalo_datas('NOVA')[0], pd.Timestamp('2030-01-01 12:00:00'))
+
+    def test_versao_por_usina_muda_apenas_com_a_propria_usina(self):
+        novas = normalizar_leituras([{'DateTime': '2030-01-02 12:00:00', 'Tensao_L1': 220.0}])
+        for backend in (self.sqlite, BackendCSV(diretorio=os.path.join(self.tmp.name, 'versoes'))):
+            with self.subTest(backend=type(backend).__name__):
+                versao_ifg = backend.versao_usina('IFG')
+                versao_outra = backend.versao_usina('OUTRA')
+                backend.inserir('OUTRA', novas)
+                self.assertEqual(backend.versao_usina('IFG'), versao_ifg)
+                self.assertNotEqual(backend.versao_usina('OUTRA'), versao_outra)
+
+    def test_importar_o_mesmo_csv_duas_vezes_nao_duplica(self):
+        diretorio = os.path.join(self.tmp.name, 'reimportacao')
+        backend = BackendCSV(arquivo_principal=os.path.join(diretorio, 'inexistente.csv'), diretorio=diretorio)
+        origem = os.path.join(self.tmp.name, 'origem.csv')
+        leituras = self.sqlite.ler_intervalo('IFG', '2025-03-10', '2025-03-12')
+        leituras.reset_index()[COLUNAS_CSV].to_csv(origem, index=False)
+        backend.importar_csv(origem, 'X')
+        versao = backend.obter_versao()[0]
+        backend.importar_csv(origem, 'X')
+        self.assertEqual(backend.obter_versao()[0], versao)
+        arquivo = os.path.join(diretorio, 'X.csv')
+        self.assertEqual(len(pd.read_csv(arquivo)), len(leituras))
+
+        # Um novo valor para um instante existente substitui o anterior, também no arquivo.
+        novas = normalizar_leituras([{'DateTime': '2025-03-10 12:00:00', 'Tensao_L1': 999.0}])
+        backend.inserir('X', novas)
+        self.assertEqual(len(pd.read_csv(arquivo)), len(leituras))
+        for b in (backend, BackendCSV(arquivo_principal=os.path.join(diretorio, 'inexistente.csv'), diretorio=diretorio)):
+            self.assertEqual(b.ler_intervalo('X', '2025-03-10 12:00', '2025-03-10 12:05')['Tensao_L1'].iloc[0], 999.0)
+
+    def test_interface_abstrata(self):
+        with self.assertRaises(TypeError):
+            BackendArmazenamento()
+
+    def test_exportar_csv_preserva_o_formato(self):
+        caminho = os.path.join(self.tmp.name, 'exportado.csv')
+        self.sqlite.exportar_csv(caminho, 'IFG')
+        with open(caminho) as exportado, open(DATA_FILE_PATH) as original:
+            self.assertEqual(exportado.readline(), original.readline())
+
+class TestLayoutCompacto(unittest.TestCase):
+    def test_medicoes_em_float32_sem_colunas_de_texto(self):
+        df = ler_csv_compacto(DATA_FILE_PATH)
+        self.assertNotIn('Data', df.columns)
+        self.assertTrue((df.dtypes == 'float32').all())
+
+    def test_classificacao_vetorizada_igual_a_por_linha(self):
+        fases = ['Tensao_L1', 'Tensao_L2', 'Tensao_L3']
+        # Todas as leituras do arquivo e todas as combinações de valores nos
+        # limites das faixas (191/202/231/233 V) e do sistema inativo (< 5 V).
+        limites = [0.0, 4.9, 5.0, 190.9, 191.0, 191.1, 201.9, 202.0, 202.1, 230.9, 231.0, 231.1, 232.9, 233.0, 233.1]
+        bordas = pd.DataFrame(list(itertools.product(limites, repeat=3)), columns=fases, dtype='float32')
+        df = pd.concat([ler_csv_compacto(DATA_FILE_PATH)[fases], bordas], ignore_index=True)
+        esperado = df.apply(classificar_tensao_trifasica, axis=1).tolist()
+        self.assertEqual(list(classificar_tensoes(df)), esperado)
+
+if __name__ == '__main__':
+    unittest.main()
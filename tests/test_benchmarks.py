@@ -0,0 +1,27 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.__main__ import comparar, medir
+
+class TestBenchmarks(unittest.TestCase):
+    def test_medir_executa_aquecimento_e_repeticoes(self):
+        chamadas = []
+        tempos = medir(lambda: chamadas.append(1), repeticoes=3)
+        self.assertEqual(len(tempos), 3)
+        self.assertEqual(len(chamadas), 4)
+
+    def test_comparar_detecta_regressao(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            arquivos = []
+            for nome, mediana in [('base', 0.10), ('novo', 0.15)]:
+                caminho = os.path.join(tmp, f"{nome}.json")
+                with open(caminho, 'w') as f:
+                    json.dump({'resultados': [{'conjunto': 'real', 'caso': 'x', 'mediana_s': mediana}]}, f)
+                arquivos.append(caminho)
+            self.assertEqual(comparar(*arquivos, limite=1.2), 1)
+            self.assertEqual(comparar(*arquivos, limite=2.0), 0)
+
+if __name__ == '__main__':
+    unittest.main()
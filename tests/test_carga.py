@@ -0,0 +1,66 @@
+import os
+import random
+import unittest
+
+from api import services
+from benchmarks.carga import (OPERACOES, corpo_callback, encerrar_servidores, executar_carga, grafico_dashboard,
+                              iniciar_servidor, listar_dias, preparar_servidores, resumir)
+
+# O teste de carga sobe servidores HTTP reais e leva alguns segundos: só é
+# executado quando habilitado explicitamente (TCC_TESTES_CARGA=1).
+TESTES_CARGA = os.environ.get("TCC_TESTES_CARGA", "0") == "1"
+
+
+class TestCarga(unittest.TestCase):
+    def test_corpo_callback_usa_as_chaves_do_dash(self):
+        import dashboard_app
+
+        unico = corpo_callback([('page-content', 'children')], [('url', 'pathname', '/ia-report')], 'url.pathname')
+        multiplo = corpo_callback([('grafico-principal', 'figure'), ('cards-resumo-container', 'children')],
+                                  [('seletor-data-diario', 'date', '2025-03-10')], 'btn-tensao.n_clicks')
+        for corpo in (unico, multiplo):
+            self.assertIn(corpo['output'], dashboard_app.app.callback_map)
+        self.assertEqual(unico['outputs'], {'id': 'page-content', 'property': 'children'})
+
+    def test_resumir_calcula_percentis_vazao_e_erros(self):
+        amostras = {'a': [(i / 1000, 1, i != 100) for i in range(1, 101)], 'b': []}
+        resumo = resumir(10.0, amostras, slo_p95_ms=90)
+        self.assertNotIn('b', resumo)
+        self.assertAlmostEqual(resumo['a']['p50_ms'], 50.5)
+        self.assertAlmostEqual(resumo['a']['operacoes_por_s'], 10.0)
+        self.assertEqual((resumo['a']['erros'], resumo['a']['dentro_slo']), (1, False))
+        self.assertEqual(resumo['total']['operacoes'], 100)
+
+    def test_lista_os_dias_de_uma_api_externa(self):
+        from app import create_app
+
+        if services.model_global is None:
+            services.carregar_dados_e_treinar_modelo()
+        servidor, url = iniciar_servidor(create_app())
+        try:
+            dias = listar_dias(url)
+        finally:
+            servidor.shutdown()
+        inicio, fim = services.backend_global.intervalo_datas('IFG')
+        self.assertEqual((dias[0], dias[-1]), (inicio.date().isoformat(), fim.date().isoformat()))
+
+    @unittest.skipUnless(TESTES_CARGA, "defina TCC_TESTES_CARGA=1 para executar o teste de carga")
+    def test_carga_curta_sem_erros(self):
+        import dashboard_app
+
+        anteriores = (dashboard_app.backend_global, dashboard_app.model_global)
+        servidores, urls, dias = preparar_servidores()
+        try:
+            self.assertEqual(grafico_dashboard(urls, dias, random.Random(0)), [200])
+            _, amostras = executar_carga(urls, dias, concorrencia=2, duracao_s=2)
+        finally:
+            encerrar_servidores(servidores)
+        self.assertEqual((dashboard_app.backend_global, dashboard_app.model_global), anteriores)
+        self.assertEqual(set(amostras), set(OPERACOES))
+        self.assertGreater(sum(len(lista) for lista in amostras.values()), 0)
+        for nome, lista in amostras.items():
+            self.assertTrue(all(sucesso for _, _, sucesso in lista), nome)
+
+
+if __name__ == '__main__':
+    unittest.main()
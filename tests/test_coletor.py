@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from coletor import ClienteSungrow, ColetorSungrow, LimitadorTaxa
+from coletor.servidor_mock import iniciar_servidor_mock
+from api import ingestao, services
+from api.armazenamento import COLUNAS_CSV, BackendCSV
+
+AGORA_FIXO = datetime(2025, 3, 10, 12, 0)
+
+class TestColetor(unittest.TestCase):
+    def setUp(self):
+        self.servidor, self.url = iniciar_servidor_mock(agora=lambda: AGORA_FIXO, taxa_falhas=3)
+        self.recebidas = {}
+        self.coletor = ColetorSungrow(
+            usinas=['A', 'B', 'C'],
+            cliente=ClienteSungrow(url_base=self.url, backoff=0),
+            destino=lambda usina, leituras: self.recebidas.setdefault(usina, []).extend(leituras) or len(leituras),
+            max_workers=3,
+            limitador=LimitadorTaxa(taxa=100, rajada=10),
+        )
+
+    def tearDown(self):
+        self.coletor.cliente.fechar()
+        self.servidor.shutdown()
+
+    def test_coleta_todas_as_usinas_mesmo_com_falhas_temporarias(self):
+        # Uma em cada três requisições falha com 503; as novas tentativas devem cobrir isso.
+        resultado = self.coletor.coletar_uma_vez()
+        self.assertEqual(resultado.falhas, {})
+        self.assertEqual(sorted(self.recebidas), ['A', 'B', 'C'])
+        self.assertEqual(resultado.leituras_ingeridas, 36)
+        self.assertGreater(resultado.usinas_por_segundo, 0)
+
+    def test_segundo_ciclo_pede_apenas_leituras_novas(self):
+        self.coletor.coletar_uma_vez()
+        resultado = self.coletor.coletar_uma_vez()
+        self.assertEqual(resultado.leituras_ingeridas, 0)
+
+    def test_reinicio_parte_da_ultima_leitura_armazenada(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = BackendCSV(arquivo_principal=os.path.join(tmp, 'inexistente.csv'), diretorio=tmp)
+            with mock.patch.object(services, 'backend_global', backend):
+                def novo_coletor():
+                    # Destino padrão: a ingestão da API, gravando no backend acima.
+                    return ColetorSungrow(usinas=['A'], cliente=ClienteSungrow(url_base=self.url, backoff=0),
+                                          max_workers=1, limitador=LimitadorTaxa(taxa=100, rajada=10))
+                primeiro = novo_coletor()
+                self.assertEqual(primeiro.coletar_uma_vez().leituras_ingeridas, 12)
+                primeiro.cliente.fechar()
+
+                # Um novo processo (sem estado em memória) não busca de novo as mesmas leituras.
+                reiniciado = novo_coletor()
+                self.assertEqual(reiniciado.coletar_uma_vez().leituras_ingeridas, 0)
+                self.assertEqual(reiniciado.ultima_leitura['A'], pd.Timestamp(AGORA_FIXO))
+                reiniciado.cliente.fechar()
+            self.assertEqual(len(BackendCSV(diretorio=tmp).ler_intervalo('A')), 12)
+
+class TestLimitadorTaxa(unittest.TestCase):
+    def test_espera_quando_rajada_se_esgota(self):
+        instante = [0.0]
+        limitador = LimitadorTaxa(taxa=2, rajada=2, relogio=lambda: instante[0], dormir=lambda s: None)
+        self.assertEqual(limitador.aguardar('A'), 0)
+        self.assertEqual(limitador.aguardar('A'), 0)
+        self.assertAlmostEqual(limitador.aguardar('A'), 0.5)
+        # Outras usinas têm seu próprio balde.
+        self.assertEqual(limitador.aguardar('B'), 0)
+
+class TestIngestao(unittest.TestCase):
+    def test_normaliza_para_o_esquema_do_csv(self):
+        df = ingestao.normalizar_leituras([{'DateTime': '2025-03-10 12:00:00', 'Tensao_L1': '220.5'}])
+        self.assertEqual(list(df.columns), COLUNAS_CSV[1:])
+        self.assertEqual(df['Hora'].iloc[0], '12:00')
+        self.assertEqual(df['Tensao_L2'].iloc[0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import app as aplicacao
+from api import detector_online, ingestao, services
+from api.armazenamento import BackendCSV
+from api.detector_online import DetectorOnline, processar_leituras, razao_desequilibrio
+from coletor import ClienteSungrow, LimitadorTaxa
+from coletor.servidor_mock import iniciar_servidor_mock
+from config.settings import PROJECT_ROOT
+
+
+def _leituras(n, inicio='2025-03-10 10:00', tensao=(220.0, 220.0, 220.0), corrente=(10.0, 10.0, 10.0), semente=0):
+    rng = np.random.default_rng(semente)
+    indice = pd.date_range(inicio, periods=n, freq='5min', name='DateTime')
+    dados = {f'Tensao_L{i + 1}': tensao[i] + rng.normal(0, 0.5, n) for i in range(3)}
+    dados.update({f'Corrente_L{i + 1}': corrente[i] + rng.normal(0, 0.1, n) for i in range(3)})
+    return pd.DataFrame(dados, index=indice)
+
+
+class TestDetectorOnline(unittest.TestCase):
+    def test_leituras_estaveis_nao_geram_alertas(self):
+        detector = DetectorOnline()
+        self.assertEqual(detector.processar('A', _leituras(200)), [])
+        estado = detector.obter_estado('A')
+        self.assertEqual(estado['leituras'], 200)
+        self.assertAlmostEqual(estado['media']['Tensao_L1'], 220.0, delta=1.0)
+
+    def test_salto_de_tensao_gera_um_alerta_de_desvio(self):
+        detector = DetectorOnline()
+        detector.processar('A', _leituras(50))
+        salto = _leituras(5, inicio='2025-03-10 14:10', tensao=(240.0, 220.0, 220.0), semente=1)
+        alertas = detector.processar('A', salto)
+        desvios = [a for a in alertas if a['tipo'] == 'desvio']
+        # Apenas o início da condição gera alerta, não cada leitura em que ela persiste.
+        self.assertEqual([(a['grandeza'], a['instante']) for a in desvios], [('Tensao_L1', '2025-03-10T14:10:00')])
+        self.assertIn('desequilibrio_tensao', {a['tipo'] for a in alertas})
+
+    def test_desequilibrio_de_corrente(self):
+        detector = DetectorOnline()
+        alertas = detector.processar('A', _leituras(3, corrente=(10.0, 10.0, 4.0)))
+        self.assertEqual([a['tipo'] for a in alertas], ['desequilibrio_corrente'])
+        self.assertAlmostEqual(razao_desequilibrio(np.array([10.0, 10.0, 4.0])), 0.5)
+
+    def test_memoria_constante_e_leituras_repetidas_ignoradas(self):
+        detector = DetectorOnline(max_alertas=2)
+        leituras = _leituras(20, corrente=(10.0, 10.0, 4.0))
+        leituras.iloc[::2, leituras.columns.get_loc('Corrente_L3')] = 10.0
+        detector.processar('A', leituras)
+        detector.processar('A', leituras)
+        estado = detector.obter_estado('A')
+        self.assertEqual(estado['leituras'], 20)
+        self.assertEqual(len(estado['alertas']), 2)
+
+    def test_registrado_como_observador_da_ingestao(self):
+        self.assertIn(processar_leituras, ingestao._observadores)
+
+    def test_usinas_processadas_em_paralelo(self):
+        detector = DetectorOnline()
+        lotes = {usina: _leituras(100, semente=i) for i, usina in enumerate('ABCD')}
+        threads = [threading.Thread(target=detector.processar, args=item) for item in lotes.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual({usina: detector.obter_estado(usina)['leituras'] for usina in lotes},
+                         dict.fromkeys(lotes, 100))
+
+
+class TestDetectorNoColetor(unittest.TestCase):
+    def test_coletor_a_parte_alimenta_o_detector(self):
+        # Processo novo, como 'python -m coletor': nada importa api.routes.
+        codigo = '''
+import os, sys, tempfile
+from datetime import datetime
+from api import services
+from api.armazenamento import BackendCSV
+from coletor import ClienteSungrow, ColetorSungrow, LimitadorTaxa
+from coletor.servidor_mock import iniciar_servidor_mock
+servidor, url = iniciar_servidor_mock(agora=lambda: datetime(2025, 3, 10, 12, 0))
+with tempfile.TemporaryDirectory() as tmp:
+    services.backend_global = BackendCSV(arquivo_principal=os.path.join(tmp, 'inexistente.csv'), diretorio=tmp)
+    ColetorSungrow(usinas=['A'], cliente=ClienteSungrow(url_base=url, backoff=0), max_workers=1,
+                   limitador=LimitadorTaxa(taxa=100, rajada=10)).coletar_uma_vez()
+servidor.shutdown()
+assert 'api.routes' not in sys.modules
+from api import detector_online
+print(detector_online.detector.obter_estado('A')['leituras'])
+'''
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        self.assertEqual(resultado.stdout.strip(), "12")
+
+
+class TestDetectorNaAPI(unittest.TestCase):
+    def test_coletor_na_api_alimenta_os_alertas_online(self):
+        servidor, url = iniciar_servidor_mock(agora=lambda: datetime(2025, 3, 10, 12, 0))
+        self.addCleanup(servidor.shutdown)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        backend = BackendCSV(arquivo_principal=os.path.join(tmp.name, 'inexistente.csv'), diretorio=tmp.name)
+        for patcher in (mock.patch.object(services, 'backend_global', backend),
+                        mock.patch.object(detector_online, 'detector', DetectorOnline()),
+                        mock.patch.object(aplicacao, 'coletor_global', None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        cliente = aplicacao.create_app().test_client()
+        self.assertEqual(cliente.get("/api/alertas-online?usina=A").get_json()["leituras"], 0)
+        # Coletor real, com o destino padrão (a ingestão da API), consultando o servidor simulado.
+        coletor = aplicacao.iniciar_coletor(usinas=['A'], cliente=ClienteSungrow(url_base=url, backoff=0),
+                                            max_workers=1, limitador=LimitadorTaxa(taxa=100, rajada=10))
+        self.addCleanup(coletor.cliente.fechar)
+        self.addCleanup(coletor.parar)
+
+        prazo = time.monotonic() + 10
+        while time.monotonic() < prazo:
+            estado = cliente.get("/api/alertas-online?usina=A").get_json()
+            if estado["leituras"] > 0:
+                break
+            time.sleep(0.05)
+        self.assertEqual(estado["leituras"], 12)
+        self.assertEqual(estado["ultimo_instante"], "2025-03-10T12:00:00")
+
+if __name__ == '__main__':
+    unittest.main()
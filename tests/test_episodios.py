@@ -0,0 +1,49 @@
+import unittest
+
+import pandas as pd
+
+from api.services import construir_episodios
+
+
+def _leituras(instantes, classes, tensoes):
+    indice = pd.DatetimeIndex(pd.to_datetime(instantes), name='DateTime')
+    df = pd.DataFrame(tensoes, columns=['Tensao_L1', 'Tensao_L2', 'Tensao_L3'], index=indice)
+    df['Previsao_Classe_Tensao'] = classes
+    return df
+
+
+class TestEpisodios(unittest.TestCase):
+    def test_leituras_consecutivas_formam_um_episodio(self):
+        df = _leituras(
+            ['2025-03-10 13:00', '2025-03-10 13:05', '2025-03-10 13:10'],
+            ['Crítica'] * 3,
+            [[234.0, 220, 220], [236.5, 221, 220], [235.0, 220, 219]],
+        )
+        episodios = construir_episodios(df)
+        self.assertEqual(len(episodios), 1)
+        ep = episodios.iloc[0]
+        self.assertEqual((ep['Inicio'], ep['Fim']), ('13:00:00', '13:10:00'))
+        self.assertEqual((ep['N_Leituras'], ep['Duracao_min']), (3, 15))
+        self.assertEqual(ep['Fases'], ['L1'])
+        self.assertEqual((ep['Pior_Tensao'], ep['Fase_Pior_Tensao'], ep['Horario_Pior_Tensao']), (236.5, 'L1', '13:05:00'))
+        self.assertIn('236.5V', ep['Sugestao'])
+
+    def test_lacuna_classe_ou_fases_diferentes_separam_episodios(self):
+        df = _leituras(
+            ['2025-03-10 13:00', '2025-03-10 13:05',   # episódio 1
+             '2025-03-10 13:20',                        # lacuna de tempo
+             '2025-03-10 13:25',                        # outra classe
+             '2025-03-10 13:30'],                       # outras fases
+            ['Crítica', 'Crítica', 'Crítica', 'Precária', 'Precária'],
+            [[234.0, 220, 220], [234.0, 220, 220], [234.0, 220, 220], [232.0, 220, 220], [232.0, 232.0, 220]],
+        )
+        episodios = construir_episodios(df)
+        self.assertEqual(episodios['N_Leituras'].tolist(), [2, 1, 1, 1])
+        self.assertEqual(episodios['Previsao_Classe_Tensao'].tolist(), ['Crítica', 'Crítica', 'Precária', 'Precária'])
+        self.assertEqual(episodios['Fases'].tolist(), [['L1'], ['L1'], ['L1'], ['L1', 'L2']])
+
+    def test_sem_leituras_de_risco(self):
+        self.assertTrue(construir_episodios(_leituras([], [], [])).empty)
+
+if __name__ == '__main__':
+    unittest.main()
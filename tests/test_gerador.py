@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from api.armazenamento import COLUNAS_CSV, ler_csv_compacto
+from api.services import classificar_tensoes
+from gerar_dados_sinteticos import gerar, gerar_usina
+
+class TestGeradorSintetico(unittest.TestCase):
+    def test_gera_csv_no_esquema_original(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            total = gerar(tmp, n_usinas=2, anos=1, inicio='2025-01-01')
+            self.assertEqual(total, 2 * 365 * 288)
+            self.assertEqual(sorted(os.listdir(tmp)), ['USINA-000.csv', 'USINA-001.csv'])
+            with open(os.path.join(tmp, 'USINA-000.csv')) as f:
+                self.assertEqual(f.readline().strip().split(','), COLUNAS_CSV)
+
+            df = ler_csv_compacto(os.path.join(tmp, 'USINA-001.csv'))
+            classes = pd.Series(classificar_tensoes(df[df['Tensao_L1'] > 0])).value_counts()
+            # A maior parte das leituras é adequada, com episódios injetados de risco.
+            self.assertGreater(classes['Adequada'], classes['Precária'] + classes['Crítica'])
+            self.assertGreater(classes['Crítica'], 0)
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        inicio, fim = pd.Timestamp('2025-03-01'), pd.Timestamp('2025-04-15')
+        a = pd.concat(gerar_usina('A', 0, inicio, fim, semente=7))
+        b = pd.concat(gerar_usina('A', 0, inicio, fim, semente=7))
+        pd.testing.assert_frame_equal(a, b)
+        self.assertEqual(len(a), 45 * 288)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from api.armazenamento import BackendCSV
+from plotar_grafico_simples import cols_graficos, exportar_dia, exportar_lote
+
+class TestExportacaoGraficos(unittest.TestCase):
+    def test_exporta_os_tres_graficos_do_dia(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            df_dia = BackendCSV(diretorio=os.path.join(tmp, 'coleta')).ler_dia('IFG', '2025-03-10', cols_graficos)
+            ficheiros = exportar_dia('IFG', '2025-03-10', df_dia, tmp, ['html'])
+            self.assertEqual(sorted(os.path.basename(f) for f in ficheiros),
+                             ['2025-03-10_corrente.html', '2025-03-10_geracao.html', '2025-03-10_tensao.html'])
+            self.assertTrue(all(os.path.getsize(f) > 0 for f in ficheiros))
+
+    def _exportar_dois_dias(self, formato):
+        with tempfile.TemporaryDirectory() as tmp:
+            total = exportar_lote('2025-03-10', '2025-03-11', ['IFG'], tmp, (formato,), processos=1)
+            pasta = os.path.join(tmp, 'IFG')
+            esperados = sorted(f"{dia}_{nome}.{formato}" for dia in ('2025-03-10', '2025-03-11')
+                               for nome in ('corrente', 'geracao', 'tensao'))
+            self.assertEqual(total, 6)
+            self.assertEqual(sorted(os.listdir(pasta)), esperados)
+            self.assertTrue(all(os.path.getsize(os.path.join(pasta, f)) > 0 for f in esperados))
+
+    def test_lote_exporta_cada_dia_em_html(self):
+        self._exportar_dois_dias('html')
+
+    @unittest.skipUnless(importlib.util.find_spec('kaleido'), "requer o pacote 'kaleido'")
+    def test_lote_exporta_cada_dia_em_png(self):
+        self._exportar_dois_dias('png')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from api import services
+from config.settings import PROJECT_ROOT
+
+# Orçamento (em segundos) do tempo de importação de cada módulo de entrada.
+ORCAMENTO_IMPORTACAO_S = {"app": 1.0, "api.services": 1.0, "analise_energia": 1.0}
+BIBLIOTECAS_PESADAS = ("sklearn", "matplotlib", "seaborn")
+
+
+def _tempos_importacao(codigo, env=None):
+    """
+    Executa 'codigo' com 'python -X importtime' e retorna a saída padrão e
+    o tempo acumulado (em segundos) de cada módulo importado.
+    """
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True, env=env)
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        # Formato: "import time: <próprio> | <acumulado> | <módulo>"
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, modulo = linha.split("|")
+        tempos[modulo.strip()] = int(acumulado) / 1e6
+    return resultado.stdout, tempos
+
+
+class TestImportacao(unittest.TestCase):
+    def test_modulos_nao_importam_bibliotecas_pesadas(self):
+        for modulo, orcamento in ORCAMENTO_IMPORTACAO_S.items():
+            with self.subTest(modulo=modulo):
+                _, tempos = _tempos_importacao(f"import {modulo}")
+                pesadas = [m for m in tempos if m.split(".")[0] in BIBLIOTECAS_PESADAS]
+                self.assertEqual(pesadas, [])
+                self.assertLess(tempos[modulo], orcamento)
+
+    def test_inicializacao_com_modelo_em_cache_nao_treina(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Treina uma vez, gravando o modelo no cache temporário.
+            with mock.patch.object(services, "DIRETORIO_MODELOS", tmp), \
+                 mock.patch.object(services, "model_global", None), \
+                 mock.patch.object(services, "versao_modelo_global", None), \
+                 mock.patch.object(services, "modelo_treinado_em", None), \
+                 mock.patch.object(services, "feature_columns_global", None):
+                services.carregar_dados_e_treinar_modelo()
+                versao = services.versao_modelo_global
+            self.assertEqual(os.listdir(tmp), [f"modelo-{versao}.pkl"])
+
+            # Um processo novo encontra o modelo e não importa o scikit-learn.
+            codigo = ("import sys; from api import services; services.carregar_dados_e_treinar_modelo(); "
+                      "assert 'sklearn' not in sys.modules; print(services.versao_modelo_global)")
+            env = {**os.environ, "TCC_DIRETORIO_MODELOS": tmp}
+            saida, tempos = _tempos_importacao(codigo, env)
+            self.assertNotIn("sklearn", tempos)
+            self.assertEqual(saida.strip(), versao)
+
+    def test_gravar_modelo_remove_versoes_antigas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, versao in enumerate(["a", "b", "c"]):
+                caminho = os.path.join(tmp, f"modelo-{versao}.pkl")
+                with open(caminho, "wb") as f:
+                    f.write(b"antigo")
+                os.utime(caminho, (1000 + i, 1000 + i))
+            with open(os.path.join(tmp, "outro.txt"), "w") as f:
+                f.write("fora do cache")
+
+            services._gravar_modelo({"modelo": "novo"}, os.path.join(tmp, "modelo-d.pkl"))
+            self.assertEqual(sorted(os.listdir(tmp)), ["modelo-c.pkl", "modelo-d.pkl", "outro.txt"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from api import indice_alarmes, services
+from api.armazenamento import BackendCSV
+from api.ingestao import ingerir_leituras
+from app import create_app
+
+
+class TestIndiceAlarmes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if services.model_global is None:
+            services.carregar_dados_e_treinar_modelo()
+
+    def setUp(self):
+        # Backend próprio, para que a ingestão não altere os dados do projeto.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.backend = BackendCSV(diretorio=os.path.join(tmp.name, 'coleta'))
+        for patcher in (mock.patch.object(services, 'backend_global', self.backend),
+                        mock.patch.dict(indice_alarmes._indices, clear=True),
+                        mock.patch.dict(indice_alarmes._versoes_dados, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_indice_confere_com_relatorio_do_dia(self):
+        indice = indice_alarmes.obter_indice(inicio=pd.Timestamp('2025-03-09'), fim=pd.Timestamp('2025-03-11'))
+        self.assertEqual(len(indice), 3)
+        for dia, linha in indice.iterrows():
+            episodios = services.obter_dados_para_api(dia.date().isoformat())['relatorio_ia']
+            self.assertEqual(linha['criticos'], sum(ep['Previsao_Classe_Tensao'] == 'Crítica' for ep in episodios))
+            self.assertEqual(linha['precarios'], sum(ep['Previsao_Classe_Tensao'] == 'Precária' for ep in episodios))
+            self.assertEqual(linha['leituras_risco'], sum(ep['N_Leituras'] for ep in episodios))
+
+    def test_ingestao_atualiza_apenas_os_dias_novos(self):
+        antes = indice_alarmes.obter_indice()
+        # Simula uma tarde de sobretensão no último dia do histórico.
+        ingerir_leituras('IFG', self._sobretensao_no_ultimo_dia(antes))
+
+        depois = indice_alarmes.obter_indice()
+        pd.testing.assert_frame_equal(depois.iloc[:-1], antes.iloc[:-1])
+        self.assertNotEqual(depois.iloc[-1]['leituras_risco'], antes.iloc[-1]['leituras_risco'])
+        # O resultado incremental é igual ao de uma reconstrução completa.
+        pd.testing.assert_frame_equal(depois, indice_alarmes.construir_indice('IFG'))
+
+    def _sobretensao_no_ultimo_dia(self, indice):
+        ultimo_dia = indice.index[-1]
+        novas = self.backend.ler_intervalo('IFG', ultimo_dia + pd.Timedelta(hours=12), ultimo_dia + pd.Timedelta(hours=15))
+        novas[['Tensao_L1', 'Tensao_L2', 'Tensao_L3']] = 245.0
+        return novas
+
+    def test_dados_alterados_fora_da_ingestao_reconstroem_o_indice(self):
+        antes = indice_alarmes.obter_indice()
+        # Inserção direta no backend, sem passar pelos observadores da ingestão.
+        self.backend.inserir('IFG', self._sobretensao_no_ultimo_dia(antes))
+        depois = indice_alarmes.obter_indice()
+        self.assertNotEqual(depois.iloc[-1]['leituras_risco'], antes.iloc[-1]['leituras_risco'])
+
+    def test_ingestao_de_outra_usina_nao_reconstroi_o_indice(self):
+        antes = indice_alarmes.obter_indice('IFG')
+        novas = self.backend.ler_intervalo('IFG', antes.index[-1], antes.index[-1] + pd.Timedelta(hours=1))
+        ingerir_leituras('B', novas)
+        self.assertIn('B', self.backend.usinas())
+        with mock.patch.object(indice_alarmes, 'construir_indice', wraps=indice_alarmes.construir_indice) as construir:
+            depois = indice_alarmes.obter_indice('IFG')
+        construir.assert_not_called()
+        pd.testing.assert_frame_equal(depois, antes)
+
+    def test_lote_ingerido_durante_a_construcao_nao_se_perde(self):
+        novas = self._sobretensao_no_ultimo_dia(indice_alarmes.construir_indice('IFG'))
+        indice_alarmes._indices.clear()
+        lido, continuar = threading.Event(), threading.Event()
+        ler_intervalo = self.backend.ler_intervalo
+
+        def ler_e_esperar(*args, **kwargs):
+            df = ler_intervalo(*args, **kwargs)
+            if not lido.is_set():
+                lido.set()
+                continuar.wait(5)
+            return df
+
+        with mock.patch.object(self.backend, 'ler_intervalo', side_effect=ler_e_esperar):
+            construcao = threading.Thread(target=indice_alarmes.construir_indice, args=('IFG',))
+            construcao.start()
+            self.assertTrue(lido.wait(5))
+            versao = self.backend.versao_usina('IFG')
+            ingestao = threading.Thread(target=ingerir_leituras, args=('IFG', novas))
+            ingestao.start()
+            while self.backend.versao_usina('IFG') == versao:
+                threading.Event().wait(0.01)
+            continuar.set()
+            construcao.join(5)
+            ingestao.join(5)
+
+        # O lote é aplicado ao índice publicado, que fica igual a uma reconstrução completa.
+        incremental = indice_alarmes._indices['IFG']
+        pd.testing.assert_frame_equal(incremental, indice_alarmes.construir_indice('IFG'))
+
+    def test_endpoint_indice_alarmes(self):
+        cliente = create_app().test_client()
+        response = cliente.get("/api/indice-alarmes?inicio=2025-03-01&fim=2025-03-31")
+        self.assertEqual(response.status_code, 200)
+        dias = response.get_json()["dias"]
+        self.assertEqual(dias[0]["dia"], "2025-03-01")
+        self.assertEqual(set(dias[0]), {"dia", "criticos", "precarios", "leituras_risco", "fases"})
+        repetida = cliente.get("/api/indice-alarmes?inicio=2025-03-01&fim=2025-03-31",
+                               headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(repetida.status_code, 304)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from api import perfil
+from api import services
+from app import create_app
+
+
+def _trabalho_lento():
+    fim = time.perf_counter() + 0.1
+    while time.perf_counter() < fim:
+        sum(range(1000))
+
+
+class TestPerfil(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_perfilar_grava_pilhas_colapsadas(self):
+        with perfil.perfilar("teste", diretorio=self.tmp.name) as amostrador:
+            _trabalho_lento()
+        perfil.aguardar_gravacoes()
+        self.assertTrue(os.path.exists(amostrador.arquivo))
+        with open(amostrador.arquivo, encoding="utf-8") as f:
+            linhas = f.read().splitlines()
+        self.assertTrue(linhas)
+        self.assertTrue(any("_trabalho_lento" in linha for linha in linhas))
+        pilha, contagem = linhas[0].rsplit(" ", 1)
+        self.assertGreater(int(contagem), 0)
+
+    def test_gravacao_fora_da_thread_perfilada(self):
+        threads = []
+        gravar = perfil.AmostradorPilhas.gravar_colapsado
+
+        def gravar_registrando(amostrador, caminho):
+            threads.append(threading.current_thread().name)
+            return gravar(amostrador, caminho)
+
+        with mock.patch.object(perfil.AmostradorPilhas, "gravar_colapsado", gravar_registrando):
+            with perfil.perfilar("teste", diretorio=self.tmp.name):
+                _trabalho_lento()
+            perfil.aguardar_gravacoes()
+        self.assertEqual(threads, ["perfil-gravacao"])
+
+    def test_amostragem_um_a_cada_n(self):
+        with mock.patch.object(perfil, "PERFIL_HABILITADO", False), \
+             mock.patch.object(perfil, "PERFIL_AMOSTRAGEM_N", 5):
+            decisoes = [perfil.deve_perfilar() for _ in range(20)]
+        self.assertEqual(sum(decisoes), 4)
+
+    def test_cabecalho_exige_configuracao(self):
+        if services.model_global is None:
+            services.carregar_dados_e_treinar_modelo()
+        cliente = create_app().test_client()
+        with mock.patch.object(perfil, "DIRETORIO_PERFIS", self.tmp.name), \
+             mock.patch.object(perfil, "PERFIL_AMOSTRAGEM_N", 0):
+            with mock.patch.object(perfil, "PERFIL_HABILITADO", False):
+                cliente.get("/api/dados-usina?data=2025-03-11", headers={"X-Perfil": "1"})
+            self.assertEqual(os.listdir(self.tmp.name), [])
+            with mock.patch.object(perfil, "PERFIL_HABILITADO", True):
+                cliente.get("/api/dados-usina?data=2025-03-12", headers={"X-Perfil": "1"})
+            perfil.aguardar_gravacoes()
+            self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+
+if __name__ == '__main__':
+    unittest.main()